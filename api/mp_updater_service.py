@@ -13,8 +13,10 @@ scripts_dir = Path(__file__).parent.parent / "scripts"
 sys.path.append(str(scripts_dir))
 
 from automated_mp_updater import AutomatedMPUpdater
+import json_io
 
 app = Flask(__name__)
+json_io.init_app(app)
 updater = AutomatedMPUpdater()
 
 @app.route('/api/mp/lookup', methods=['GET'])
@@ -51,8 +53,8 @@ def update_mp():
 
     mp_info = updater.get_mp_details(constituency)
     if mp_info:
-        updater.database["constituencies"][constituency] = mp_info
-        updater.save_database()
+        updater.store.upsert_constituency(constituency, mp_info)
+        updater.store.touch()
         return jsonify({"success": True, "mp": mp_info})
     return jsonify({"error": "Could not update MP information"}), 500
 
@@ -66,11 +68,11 @@ def update_all():
 def get_status():
     """Get the current status of the MP database"""
     return jsonify({
-        "version": updater.database.get("version"),
-        "last_updated": updater.database.get("last_updated"),
-        "constituency_count": len(updater.database.get("constituencies", {})),
-        "pattern_count": len(updater.database.get("postcode_patterns", {})),
-        "update_status": updater.database.get("update_status", {})
+        "version": updater.store.get_meta("version"),
+        "last_updated": updater.store.get_meta("last_updated"),
+        "constituency_count": updater.store.constituency_count(),
+        "pattern_count": updater.store.pattern_count(),
+        "update_status": updater.store.get_status()
     })
 
 if __name__ == "__main__":
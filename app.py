@@ -1,19 +1,24 @@
 import re
-import json
-import requests
+import http_client
+import json_io
 from datetime import datetime
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, Response, request, jsonify, render_template, stream_with_context
 from flask_cors import CORS
 from mp_service import mp_service
 from contact_handler import handle_contact_form
 from scripts.automated_mp_updater import AutomatedMPUpdater
+from batch_postcode_lookup import BatchPostcodeLookup, MAX_BATCH, postcodes_from_csv
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
+json_io.init_app(app)
 
 # Initialize automated MP updater
 mp_updater = AutomatedMPUpdater()
 
+# Bulk lookups share the compiled resolver and postcode cache with single lookups
+batch_lookup = BatchPostcodeLookup(mp_service.resolver, mp_service.postcode_cache)
+
 # Configuration
 BASE_URL = "https://www.theyworkforyou.com/api"
 API_KEY = "your_api_key_here"  # Replace with your actual API key
@@ -217,6 +222,38 @@ def mp_lookup_path(postcode):
             "found": False
         }), 500
 
+def read_batch_postcodes(req):
+    """Postcodes from a JSON array/{"postcodes": [...]} body, a CSV upload or a text/csv body"""
+    upload = req.files.get("file")
+    if upload is not None:
+        return postcodes_from_csv(upload.read().decode("utf-8-sig", errors="replace"))
+    if req.mimetype == "text/csv":
+        return postcodes_from_csv(req.get_data(as_text=True))
+
+    data = req.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get("postcodes")
+    if isinstance(data, list):
+        return [str(postcode) for postcode in data]
+    return None
+
+@app.route("/api/mp/batch", methods=["POST"])
+def mp_batch_lookup():
+    """Bulk MP lookup streamed back as NDJSON, one result per unique postcode"""
+    postcodes = read_batch_postcodes(request)
+    if postcodes is None:
+        return jsonify({"error": "Send a JSON array of postcodes or a CSV upload", "found": False}), 400
+    if len(postcodes) > MAX_BATCH:
+        return jsonify({"error": f"At most {MAX_BATCH} postcodes per request", "found": False}), 413
+
+    def generate():
+        stats = {"requested": len(postcodes)}
+        for result in batch_lookup.resolve(postcodes, stats):
+            yield json_io.dumps(result) + "\n"
+        yield json_io.dumps({"summary": stats}) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
 @app.route("/api/health")
 def health_check():
     """Health check endpoint"""
@@ -254,7 +291,8 @@ def mp_lookup_live():
 
     # Step 1: Get constituency from postcodes.io
     try:
-        pc_resp = requests.get(f'https://api.postcodes.io/postcodes/{postcode}')
+        pc_resp = http_client.get(f'https://api.postcodes.io/postcodes/{postcode}',
+                                  retries=1, deadline=http_client.INTERACTIVE_DEADLINE)
         pc_data = pc_resp.json()
         if pc_resp.status_code != 200 or 'result' not in pc_data or not pc_data['result']:
             return jsonify({'error': 'Invalid postcode or not found'}), 404
@@ -268,7 +306,7 @@ def mp_lookup_live():
     try:
         # Search for current MPs in this constituency
         url = f'https://members-api.parliament.uk/api/Location/Constituency/Search?searchText={constituency}'
-        resp = requests.get(url)
+        resp = http_client.get(url, retries=1, deadline=http_client.INTERACTIVE_DEADLINE)
         data = resp.json()
         if not data.get('items'):
             return jsonify({'error': 'No MP found for this constituency'}), 404
@@ -276,7 +314,7 @@ def mp_lookup_live():
         constituency_id = data['items'][0]['value']['id']
         # Get MP for this constituency
         mp_url = f'https://members-api.parliament.uk/api/Location/Constituency/{constituency_id}/Representatives'
-        mp_resp = requests.get(mp_url)
+        mp_resp = http_client.get(mp_url, retries=1, deadline=http_client.INTERACTIVE_DEADLINE)
         mp_data = mp_resp.json()
         if not mp_data.get('value') or not mp_data['value']:
             return jsonify({'error': 'No MP found for this constituency'}), 404
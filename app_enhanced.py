@@ -5,12 +5,15 @@ Integrates MP lookup, news fetching, and contact functionality
 from flask import Flask, jsonify, request
 from enhanced_contact_handler import contact_handler
 from news_service import news_service
-from mp_lookup_service import MPLookupService
+from mp_service import mp_service
+from mp_pipeline import MPLookupPipeline
+import json_io
 import logging
 from datetime import datetime
 import os
 
 app = Flask(__name__)
+json_io.init_app(app)
 
 # Configure logging
 logging.basicConfig(
@@ -18,31 +21,23 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
+# Constituency, MP details and news are fetched concurrently per request
+mp_pipeline = MPLookupPipeline(resolver=mp_service.resolver, news=news_service)
+
 @app.route('/api/mp-lookup', methods=['GET'])
-async def mp_lookup():
+def mp_lookup():
     """Handle MP lookup requests"""
     try:
         postcode = request.args.get('postcode')
         if not postcode:
             return jsonify({"success": False, "error": "No postcode provided"}), 400
 
-        # Get MP info
-        mp_service = MPLookupService()
-        result = await mp_service.lookup_mp(postcode)
+        # Get MP info and news in one concurrent pipeline
+        result = mp_pipeline.lookup_sync(postcode)
         
         if not result['found']:
             return jsonify({"success": False, "error": result['error']}), 404
 
-        # Get news articles
-        mp_news = await news_service.fetch_guardian_news(f"{result['mp']['name']} {result['constituency']}")
-        bbc_news = await news_service.fetch_bbc_news(f"{result['mp']['name']} {result['constituency']}")
-
-        # Combine results
-        result['mp']['news'] = {
-            'guardian': mp_news,
-            'bbc': bbc_news
-        }
-
         return jsonify({"success": True, "data": result}), 200
 
     except Exception as e:
@@ -59,14 +54,14 @@ def handle_contact():
     return jsonify(result), status_code
 
 @app.route('/api/news/guardian', methods=['GET'])
-async def get_guardian_news():
+def get_guardian_news():
     """Handle Guardian news requests"""
     try:
         query = request.args.get('q')
         if not query:
             return jsonify({"success": False, "error": "No search query provided"}), 400
 
-        articles = await news_service.fetch_guardian_news(query)
+        articles = mp_pipeline.run(lambda session: news_service.fetch_guardian_news(query, session=session))
         return jsonify({"success": True, "articles": articles}), 200
 
     except Exception as e:
@@ -77,14 +72,14 @@ async def get_guardian_news():
         }), 500
 
 @app.route('/api/news/bbc', methods=['GET'])
-async def get_bbc_news():
+def get_bbc_news():
     """Handle BBC news requests"""
     try:
         query = request.args.get('q')
         if not query:
             return jsonify({"success": False, "error": "No search query provided"}), 400
 
-        articles = await news_service.fetch_bbc_news(query)
+        articles = mp_pipeline.run(lambda session: news_service.fetch_bbc_news(query, session=session))
         return jsonify({"success": True, "articles": articles}), 200
 
     except Exception as e:
@@ -2,6 +2,7 @@ from flask import Flask, request, jsonify, render_template, send_from_directory
 from flask_cors import CORS
 from datetime import datetime
 import os
+import json_io
 from mp_service import mp_service
 
 app = Flask(__name__, 
@@ -9,6 +10,7 @@ app = Flask(__name__,
     template_folder=os.path.abspath(".")
 )
 CORS(app)  # Enable CORS for all routes
+json_io.init_app(app)
 
 # API Routes
 @app.route("/")
@@ -48,10 +50,14 @@ def get_constituencies():
     
     try:
         if query:
-            constituencies = mp_service.search_constituencies(query)
-        else:
-            constituencies = mp_service.get_all_constituencies()
-        return jsonify({"constituencies": constituencies})
+            # Every match unless the caller asks for a limit (autocomplete does)
+            limit = request.args.get("limit", type=int)
+            results = mp_service.search(query, limit)
+            return jsonify({
+                "constituencies": [result["constituency"] for result in results],
+                "results": results
+            })
+        return jsonify({"constituencies": mp_service.get_all_constituencies()})
     except Exception as e:
         return jsonify({
             "error": "An error occurred while fetching constituencies",
@@ -0,0 +1,283 @@
+"""
+SQLite-backed store of every news article the fetchers have seen.
+Articles are keyed by a hash of their normalised URL (or feed GUID), so
+each run merges only what is new. A syndicated copy of an article already
+held from another source (same story: the same headline words, or a
+close headline over a near-identical summary) is recorded
+against the original instead of being stored twice. The frontend's
+latest_news.json is materialised from the store, so history and AI
+summaries survive between runs.
+"""
+import os
+import re
+import json
+import hashlib
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import json_io
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    title TEXT NOT NULL,
+    title_key TEXT NOT NULL,
+    source TEXT,
+    source_key TEXT,
+    category TEXT,
+    published TEXT,
+    published_at REAL NOT NULL,
+    original_summary TEXT,
+    ai_summary TEXT,
+    also_reported_by TEXT NOT NULL DEFAULT '[]',
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_articles_published ON articles (published_at);
+CREATE TABLE IF NOT EXISTS article_aliases (
+    alias TEXT PRIMARY KEY,
+    article_id TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS article_mps (
+    article_id TEXT NOT NULL,
+    mp_name TEXT NOT NULL,
+    relevance TEXT,
+    PRIMARY KEY (article_id, mp_name)
+);
+"""
+
+# Query parameters that only track the click and do not identify the article
+TRACKING_PARAMS = re.compile(r'^(utm_.*|at_.*|cmp|ito|ns_.*|ocid|fbclid|gclid)$', re.IGNORECASE)
+
+# Headlines whose word sets overlap at least this much are the same story. Word
+# overlap, unlike character similarity, does not let one changed word ("Labour"
+# vs "Reform wins ...") pass as a copy.
+TITLE_SIMILARITY = 0.9
+# A retitled copy also counts when its summary is near-identical to the original's
+RETITLED_SIMILARITY = 0.6
+SUMMARY_SIMILARITY = 0.8
+# Syndicated copies are only looked for among articles published this close together
+DUPLICATE_WINDOW = timedelta(days=3)
+
+def normalise_url(url: str) -> str:
+    """Canonical form of an article URL: https, no www., tracking parameters or fragment"""
+    parts = urlsplit((url or '').strip())
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    query = urlencode(sorted((key, value) for key, value in parse_qsl(parts.query)
+                             if not TRACKING_PARAMS.match(key)))
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit(('https' if parts.scheme in ('http', 'https') else parts.scheme, host, path, query, ''))
+
+def article_id(article: Dict) -> str:
+    """Stable id from the article's normalised URL, or its feed GUID when it has no link"""
+    identity = normalise_url(article['link']) if article.get('link') else f"guid:{article.get('id', '')}"
+    return hashlib.sha256(identity.encode('utf-8')).hexdigest()[:20]
+
+def title_key(title: str) -> str:
+    """Lower-case title without punctuation, for similarity checks"""
+    return ' '.join(re.findall(r'[a-z0-9]+', (title or '').lower()))
+
+def word_similarity(a: str, b: str) -> float:
+    """Jaccard overlap of the two texts' word sets"""
+    words_a, words_b = set(title_key(a).split()), set(title_key(b).split())
+    if not words_a or not words_b:
+        return 0.0
+    return len(words_a & words_b) / len(words_a | words_b)
+
+def summary_similarity(a: Optional[str], b: Optional[str]) -> float:
+    """Word overlap of two feed summaries, ignoring their markup"""
+    return word_similarity(re.sub(r'<[^>]+>', ' ', a or ''), re.sub(r'<[^>]+>', ' ', b or ''))
+
+def published_timestamp(published: Optional[str]) -> Optional[float]:
+    """Parse an RSS (RFC 822) or Atom (ISO 8601) date into a UTC timestamp"""
+    if not published:
+        return None
+    try:
+        parsed = parsedate_to_datetime(published)
+    except (TypeError, ValueError):
+        try:
+            parsed = datetime.fromisoformat(published.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+class ArticleStore:
+    def __init__(self, db_path: str = "data/articles.db"):
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # sqlite3 connections must stay on the thread that created them
+        self._local = threading.local()
+        self.conn.executescript(SCHEMA)
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Immediate write transaction"""
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.conn
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def _resolve(self, conn: sqlite3.Connection, key: str) -> Optional[sqlite3.Row]:
+        """The stored article for an id, following a duplicate's alias"""
+        row = conn.execute("SELECT * FROM articles WHERE id = ?", (key,)).fetchone()
+        if row is None:
+            alias = conn.execute("SELECT article_id FROM article_aliases WHERE alias = ?", (key,)).fetchone()
+            if alias:
+                row = conn.execute("SELECT * FROM articles WHERE id = ?", (alias[0],)).fetchone()
+        return row
+
+    def get(self, article: Dict) -> Optional[Dict]:
+        """The stored record for a fetched article (or the original it duplicates), if any"""
+        row = self._resolve(self.conn, article_id(article))
+        return self._to_article(row) if row else None
+
+    def _find_duplicate(self, conn: sqlite3.Connection, key: str, summary: Optional[str],
+                        source_key: str, published_at: float) -> Optional[sqlite3.Row]:
+        """A stored article from another source reporting the same story within the time window"""
+        window = DUPLICATE_WINDOW.total_seconds()
+        best, best_score = None, 0.0
+        for row in conn.execute(
+                "SELECT * FROM articles WHERE published_at BETWEEN ? AND ? AND source_key IS NOT ?",
+                (published_at - window, published_at + window, source_key)):
+            score = word_similarity(key, row["title_key"])
+            if score < RETITLED_SIMILARITY or score <= best_score:
+                continue
+            if score >= TITLE_SIMILARITY or \
+                    summary_similarity(summary, row["original_summary"]) >= SUMMARY_SIMILARITY:
+                best, best_score = row, score
+        return best
+
+    def merge(self, articles: Iterable[Dict], mp_name: Optional[str] = None) -> Dict[str, int]:
+        """Merge fetched articles into the store.
+
+        New articles are added; ones already stored only refresh last_seen and
+        their AI summary (the summary cache makes that cheap); syndicated copies are recorded
+        on the original. With mp_name the articles are also tagged with that
+        MP and their relevance. Returns counts of added, seen and duplicate.
+        """
+        counts = {"added": 0, "seen": 0, "duplicate": 0}
+        now = datetime.now()
+        with self.transaction() as conn:
+            for article in articles:
+                key = article_id(article)
+                row = self._resolve(conn, key)
+                if row is None:
+                    published_at = published_timestamp(article.get('published')) or now.timestamp()
+                    row = self._find_duplicate(conn, title_key(article.get('title')),
+                                               article.get('original_summary'), article.get('source_key'),
+                                               published_at)
+                    if row is not None:
+                        conn.execute("INSERT OR IGNORE INTO article_aliases (alias, article_id) VALUES (?, ?)",
+                                     (key, row["id"]))
+                        also = json.loads(row["also_reported_by"])
+                        also.append({"source": article.get('source'), "link": article.get('link')})
+                        conn.execute("UPDATE articles SET also_reported_by = ?, last_seen = ? WHERE id = ?",
+                                     (json.dumps(also, ensure_ascii=False), now.isoformat(), row["id"]))
+                        counts["duplicate"] += 1
+                        stored_id = row["id"]
+                    else:
+                        conn.execute(
+                            "INSERT INTO articles (id, url, title, title_key, source, source_key, category, "
+                            "published, published_at, original_summary, ai_summary, first_seen, last_seen) "
+                            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                            (key, article.get('link', ''), article.get('title', ''),
+                             title_key(article.get('title')), article.get('source'), article.get('source_key'),
+                             article.get('category'), article.get('published'), published_at,
+                             article.get('original_summary'), article.get('ai_summary'),
+                             now.isoformat(), now.isoformat()))
+                        counts["added"] += 1
+                        stored_id = key
+                else:
+                    conn.execute("UPDATE articles SET last_seen = ?, ai_summary = COALESCE(?, ai_summary) "
+                                 "WHERE id = ?", (now.isoformat(), article.get('ai_summary'), row["id"]))
+                    counts["seen"] += 1
+                    stored_id = row["id"]
+
+                if mp_name:
+                    conn.execute("INSERT OR REPLACE INTO article_mps (article_id, mp_name, relevance) "
+                                 "VALUES (?, ?, ?)", (stored_id, mp_name, article.get('relevance')))
+        logging.info(f"Merged articles: {counts['added']} added, {counts['seen']} already stored, "
+                     f"{counts['duplicate']} syndicated duplicates")
+        return counts
+
+    def _to_article(self, row: sqlite3.Row) -> Dict:
+        """A stored row in the article format the fetchers and frontend use"""
+        article = {
+            'title': row["title"],
+            'link': row["url"],
+            'original_summary': row["original_summary"] or '',
+            'published': row["published"],
+            'source': row["source"],
+            'source_key': row["source_key"],
+            'category': row["category"],
+            'ai_summary': row["ai_summary"]
+        }
+        also = json.loads(row["also_reported_by"])
+        if also:
+            article['also_reported_by'] = also
+        return article
+
+    def latest(self, limit: int = 50) -> List[Dict]:
+        """Most recently published articles, newest first"""
+        rows = self.conn.execute("SELECT * FROM articles ORDER BY published_at DESC LIMIT ?", (limit,))
+        return [self._to_article(row) for row in rows]
+
+    def articles_for_mp(self, mp_name: str, limit: int = 5) -> List[Dict]:
+        """Articles tagged with an MP, direct mentions first, then newest first"""
+        rows = self.conn.execute(
+            "SELECT articles.*, article_mps.relevance FROM articles "
+            "JOIN article_mps ON article_mps.article_id = articles.id WHERE article_mps.mp_name = ? "
+            "ORDER BY article_mps.relevance = 'direct' DESC, articles.published_at DESC LIMIT ?",
+            (mp_name, limit))
+        return [dict(self._to_article(row), relevance=row["relevance"]) for row in rows]
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def export_json(self, path: str, limit: int = 50) -> Dict:
+        """Write the latest articles as the frontend's news JSON and return it"""
+        articles = self.latest(limit)
+        output = {
+            "last_updated": datetime.now().isoformat(),
+            "total_articles": len(articles),
+            "stored_articles": self.count(),
+            "articles": articles
+        }
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        json_io.dump_file(path, output, indent=True)
+        return output
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -0,0 +1,160 @@
+"""
+Batch postcode to constituency/MP resolution.
+Postcodes are normalised and de-duplicated, answered from the local
+resolver (and postcode cache) in one pass, and only the misses are sent to
+postcodes.io's bulk endpoint, 100 postcodes per request.
+"""
+import io
+import re
+import csv
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import http_client
+from postcode_resolver import normalise_postcode
+
+BULK_URL = "https://api.postcodes.io/postcodes"
+BULK_SIZE = 100
+MAX_BATCH = 10000
+
+POSTCODE_RE = re.compile(r'^[A-Z]{1,2}[0-9R][0-9A-Z]?[0-9][A-Z]{2}$')
+
+def format_postcode(compact: str) -> str:
+    """Insert the space before the inward code (SW1A1AA -> SW1A 1AA)"""
+    return f"{compact[:-3]} {compact[-3:]}" if len(compact) > 3 else compact
+
+def is_valid_postcode(compact: str) -> bool:
+    return bool(POSTCODE_RE.match(compact))
+
+def dedupe_postcodes(postcodes: Iterable[str]) -> List[str]:
+    """Normalise postcodes, dropping blanks and repeats but keeping first-seen order"""
+    seen = set()
+    unique = []
+    for postcode in postcodes:
+        compact = normalise_postcode(str(postcode))
+        if compact and compact not in seen:
+            seen.add(compact)
+            unique.append(compact)
+    return unique
+
+def postcodes_from_csv(text: str) -> List[str]:
+    """Read the postcode column of a CSV (a "postcode" header, else the first column)"""
+    rows = csv.reader(io.StringIO(text))
+    first = next(rows, None)
+    if first is None:
+        return []
+
+    header = [cell.strip().lower() for cell in first]
+    column = next((i for i, name in enumerate(header) if "postcode" in name), None)
+    postcodes = []
+    if column is None:
+        # No header: the first column holds the postcodes, starting on the first row
+        column = 0
+        postcodes.append(first[0] if first else "")
+    for row in rows:
+        if len(row) > column:
+            postcodes.append(row[column])
+    return postcodes
+
+class BatchPostcodeLookup:
+    def __init__(self, resolver=None, cache=None, bulk_size: int = BULK_SIZE, retries: int = 2,
+                 remote: bool = True):
+        self.resolver = resolver
+        self.remote = remote
+        # Optional postcode -> {"constituency", "timestamp"} mapping shared with the single lookups
+        self.cache = cache
+        self.bulk_size = bulk_size
+        self.retries = retries
+
+    def _result(self, compact: str, constituency: Optional[str], source: str) -> Dict:
+        result = {"postcode": format_postcode(compact), "found": bool(constituency)}
+        if constituency:
+            result["constituency"] = constituency
+            result["source"] = source
+            mp = self.resolver.get_mp(constituency) if self.resolver is not None else None
+            if mp:
+                result["mp"] = mp
+        else:
+            result["error"] = "Postcode not found"
+        return result
+
+    def resolve_local(self, compact: str) -> Optional[str]:
+        if self.resolver is not None:
+            constituency = self.resolver.resolve(compact)
+            if constituency:
+                return constituency
+        if self.cache is not None:
+            # mp_service keys its cache by the postcode as entered, spaced or not
+            cached = self.cache.get(format_postcode(compact)) or self.cache.get(compact)
+            if cached:
+                return cached.get("constituency")
+        return None
+
+    def lookup_remote(self, postcodes: List[str]) -> Dict[str, Optional[Dict]]:
+        """Resolve up to bulk_size postcodes with one postcodes.io bulk request"""
+        response = http_client.post(BULK_URL, json={"postcodes": postcodes}, retries=self.retries)
+        response.raise_for_status()
+
+        results = {}
+        for item in response.json().get("result", []):
+            query = normalise_postcode(item.get("query", ""))
+            results[query] = item.get("result")
+        return results
+
+    def resolve(self, postcodes: Iterable[str], stats: Optional[Dict] = None) -> Iterator[Dict]:
+        """Yield one result per unique postcode: local hits first, then remote batches.
+
+        stats, if given, is filled with counts as results are produced.
+        """
+        stats = stats if stats is not None else {}
+        stats.update({"unique": 0, "found": 0, "local": 0, "remote": 0, "invalid": 0, "errors": 0})
+        misses = []
+
+        for compact in dedupe_postcodes(postcodes):
+            stats["unique"] += 1
+            if not is_valid_postcode(compact):
+                stats["invalid"] += 1
+                yield {"postcode": compact, "found": False, "error": "Invalid postcode format"}
+                continue
+            constituency = self.resolve_local(compact)
+            if constituency:
+                stats["found"] += 1
+                stats["local"] += 1
+                yield self._result(compact, constituency, "local")
+            else:
+                misses.append(compact)
+
+        if not self.remote:
+            for compact in misses:
+                yield self._result(compact, None, "local")
+            return
+
+        for start in range(0, len(misses), self.bulk_size):
+            group = misses[start:start + self.bulk_size]
+            try:
+                remote = self.lookup_remote(group)
+            except Exception as e:
+                logging.error(f"Bulk postcode lookup failed for {len(group)} postcodes: {e}")
+                stats["errors"] += len(group)
+                for compact in group:
+                    yield {"postcode": format_postcode(compact), "found": False, "error": "Lookup service unavailable"}
+                continue
+
+            for compact in group:
+                data = remote.get(compact) or {}
+                constituency = data.get("parliamentary_constituency")
+                if constituency:
+                    stats["found"] += 1
+                    stats["remote"] += 1
+                    if self.cache is not None:
+                        self.cache[format_postcode(compact)] = {
+                            "constituency": constituency,
+                            "timestamp": datetime.now().isoformat()
+                        }
+                yield self._result(compact, constituency, "postcodes.io")
+
+    def resolve_all(self, postcodes: Iterable[str]) -> Tuple[List[Dict], Dict]:
+        stats: Dict = {}
+        results = list(self.resolve(postcodes, stats))
+        return results, stats
@@ -1,16 +1,36 @@
 """
 Batch postcode district processor that expands and validates the postcode mapping database
 """
+import argparse
 import json
 import os
+import sys
 import requests
 import time
-from typing import Dict, List, Set, Tuple
+from contextlib import redirect_stdout
+from typing import Dict, List, Optional, Set, Tuple
 from datetime import datetime
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import http_client
+import json_io
+from batch_postcode_lookup import BULK_SIZE, BatchPostcodeLookup
+from rate_limiter import HostRateLimiter
+from scripts.build_mp_dataset import rebuild_beside
+from write_behind_cache import WriteBehindCache
+
+OUTCODE_URL = "https://api.postcodes.io/outcodes/"
+SAMPLE_INWARD_CODES = ("1AA", "1AB", "1AD")
+
+# Exit codes for the command-line interface
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_INCOMPLETE = 3  # finished, but districts failed or mappings are invalid
+EXIT_INTERRUPTED = 130
 
 class PostcodeDistrictProcessor:
-    def __init__(self, database_path: str = None):
+    def __init__(self, database_path: str = None, workers: int = 8, rate: float = 10.0):
         if database_path is None:
             script_dir = os.path.dirname(os.path.abspath(__file__))
             self.database_path = os.path.join(script_dir, "data", "mp_database.json")
@@ -19,6 +39,8 @@ class PostcodeDistrictProcessor:
         
         # Load state file path
         self.state_path = os.path.join(os.path.dirname(self.database_path), "processing_state.json")
+        # Parallel mode appends each resolved district here until the sweep is saved
+        self.results_path = os.path.join(os.path.dirname(self.database_path), "district_results.json")
             
         self.load_database()
         self.session = requests.Session()
@@ -28,6 +50,12 @@ class PostcodeDistrictProcessor:
         self.max_retries = 3
         self.min_request_interval = 0.5  # Minimum time between requests
         self.last_request_time = 0  # Last request timestamp
+
+        # Parallel mode: one limiter shared by every worker keeps the pool inside postcodes.io's limits
+        self.workers = workers
+        self.limiter = HostRateLimiter(rate=rate, max_concurrent=workers)
+        self.bulk_lookup = BatchPostcodeLookup(retries=self.max_retries)
+        self.interrupted = False
         
     def load_database(self):
         """Load the existing MP database and processing state"""
@@ -60,13 +88,14 @@ class PostcodeDistrictProcessor:
     def save_database(self):
         """Save the updated database"""
         self.database["last_updated"] = datetime.now().strftime("%Y-%m-%d")
-        with open(self.database_path, 'w', encoding='utf-8') as f:
-            json.dump(self.database, f, indent=2, ensure_ascii=False)
+        # Kept indented: the database is checked in and reviewed as a diff
+        json_io.dump_file(self.database_path, self.database, indent=True)
+        # Keep the compiled dataset (if there is one) in step, or workers fall back to JSON
+        rebuild_beside(self.database_path)
     
     def save_state(self):
         """Save the current processing state"""
-        with open(self.state_path, 'w', encoding='utf-8') as f:
-            json.dump(self.state, f, indent=2, ensure_ascii=False)
+        json_io.dump_file(self.state_path, self.state)
             
     def wait_for_rate_limit(self):
         """Ensure we don't exceed rate limits"""
@@ -128,14 +157,60 @@ class PostcodeDistrictProcessor:
         
         return sorted(list(set(districts)))  # Remove duplicates and sort
     
+    def lookup_outcode(self, district: str) -> Optional[Set[str]]:
+        """Get every constituency a district touches from the postcodes.io outcode endpoint"""
+        try:
+            self.wait_for_rate_limit()
+            response = self.session.get(f"https://api.postcodes.io/outcodes/{district}", timeout=5)
+            self.state["total_requests"] += 1
+            if response.status_code == 200:
+                result = response.json().get('result') or {}
+                constituencies = {c for c in result.get('parliamentary_constituency') or [] if c}
+                if constituencies:
+                    self.state["success_count"] += 1
+                    return constituencies
+        except Exception as e:
+            print(f"Error looking up outcode {district}: {e}")
+            self.state["error_count"] += 1
+        return None
+
+    def record_split_district(self, district: str, constituencies: Set[str],
+                              sectors: Optional[Dict[str, Set[str]]] = None):
+        """Mark a district as split so lookups never answer it from postcode_map"""
+        split_districts = self.database.setdefault("split_districts", [])
+        if district not in split_districts:
+            split_districts.append(district)
+        self.database["postcode_map"].pop(district, None)
+
+        sector_map = self.database.setdefault("postcode_sector_map", {})
+        for sector, sector_constituencies in (sectors or {}).items():
+            if len(sector_constituencies) == 1:
+                sector_map[sector] = next(iter(sector_constituencies))
+        print(f"⚠ {district} is split between {len(constituencies)} constituencies: {', '.join(sorted(constituencies))}")
+
     def lookup_district(self, district: str, max_retries: int = 3) -> Tuple[bool, str, str]:
-        """Look up constituency for a district using postcodes.io API"""
+        """Look up constituency for a district using postcodes.io API.
+
+        Returns an empty constituency for districts split between constituencies;
+        those are recorded in split_districts (and postcode_sector_map where known).
+        """
         # Skip if we already have this district
         if district in self.database["postcode_map"]:
             return True, district, self.database["postcode_map"][district]
-        
-        # Generate a sample postcode for this district
+        if district in self.database.get("split_districts", []):
+            return True, district, ""
+
+        # The outcode endpoint lists every constituency in the district in one call
+        constituencies = self.lookup_outcode(district)
+        if constituencies:
+            if len(constituencies) == 1:
+                return True, district, next(iter(constituencies))
+            self.record_split_district(district, constituencies)
+            return True, district, ""
+
+        # Fall back to sampling postcodes; check them all rather than stopping at the first hit
         test_postcodes = [f"{district} 1AA", f"{district} 1AB", f"{district} 1AD"]
+        sectors: Dict[str, Set[str]] = defaultdict(set)
         
         for attempt in range(max_retries):
             for test_postcode in test_postcodes:
@@ -150,7 +225,7 @@ class PostcodeDistrictProcessor:
                         if 'result' in data and 'parliamentary_constituency' in data['result']:
                             constituency = data['result']['parliamentary_constituency']
                             self.state["success_count"] += 1
-                            return True, district, constituency
+                            sectors[test_postcode[:-2]].add(constituency)
                     
                     elif response.status_code == 429:  # Rate limit
                         delay = self.retry_delay * (attempt + 1)
@@ -162,6 +237,13 @@ class PostcodeDistrictProcessor:
                     print(f"Error looking up {test_postcode}: {e}")
                     self.state["error_count"] += 1
                     time.sleep(self.retry_delay)
+
+            if sectors:
+                found = set().union(*sectors.values())
+                if len(found) == 1:
+                    return True, district, next(iter(found))
+                self.record_split_district(district, found, sectors)
+                return True, district, ""
             
             time.sleep(self.retry_delay)
         
@@ -199,6 +281,8 @@ class PostcodeDistrictProcessor:
                         district_constituencies[dist].add(constituency)
                         # Update database immediately
                         self.database["postcode_map"][dist] = constituency
+                    elif success:
+                        print(f"↔ {dist} (split district, resolved per sector or remotely)")
                     else:
                         print(f"✗ {dist} (no valid constituency found)")
                 
@@ -216,6 +300,7 @@ class PostcodeDistrictProcessor:
                 time.sleep(2)  # Base delay between batches
                 
         except KeyboardInterrupt:
+            self.interrupted = True
             print("\nProcessing interrupted! Progress has been saved.")
             print("Run again to resume from where we left off.")
             self.save_state()
@@ -223,6 +308,186 @@ class PostcodeDistrictProcessor:
         
         return district_constituencies
     
+    def fetch_outcode(self, district: str) -> Set[str]:
+        """Constituencies a district touches (thread-safe; leaves the counters to the caller)"""
+        url = OUTCODE_URL + district
+        with self.limiter.slot(url):
+            response = http_client.get(url, retries=self.max_retries)
+        if response.status_code == 404:
+            return set()
+        response.raise_for_status()
+        result = response.json().get('result') or {}
+        return {c for c in result.get('parliamentary_constituency') or [] if c}
+
+    def fetch_sample_sectors(self, districts: List[str]) -> Dict[str, Dict[str, Set[str]]]:
+        """Probe sample postcodes for several districts with one bulk request"""
+        samples = [f"{district}{inward}" for district in districts for inward in SAMPLE_INWARD_CODES]
+        with self.limiter.slot(OUTCODE_URL):
+            results = self.bulk_lookup.lookup_remote(samples)
+
+        sectors: Dict[str, Dict[str, Set[str]]] = {district: defaultdict(set) for district in districts}
+        for district in districts:
+            for inward in SAMPLE_INWARD_CODES:
+                constituency = (results.get(f"{district}{inward}") or {}).get('parliamentary_constituency')
+                if constituency:
+                    sectors[district][f"{district} {inward[0]}"].add(constituency)
+        return sectors
+
+    def open_results_log(self) -> WriteBehindCache:
+        return WriteBehindCache(self.results_path, flush_interval=2.0, flush_size=50,
+                                compact_threshold=1000)
+
+    def apply_district_result(self, district: str, result: Dict):
+        """Fold one logged district result into the database"""
+        constituencies = set(result["constituencies"])
+        if len(constituencies) == 1:
+            constituency = next(iter(constituencies))
+            self.database["postcode_map"][district] = constituency
+            print(f"✓ {district} → {constituency}")
+        else:
+            sectors = {sector: set(names) for sector, names in result.get("sectors", {}).items()}
+            self.record_split_district(district, constituencies, sectors)
+
+    def remove_results_log(self, results_log: WriteBehindCache):
+        results_log.close()
+        for path in (results_log.snapshot_path, results_log.log_path, results_log.lock_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def process_districts_parallel(self, districts: List[str]) -> Dict[str, Set[str]]:
+        """Resolve districts with a worker pool, logging each result as it arrives.
+
+        Districts go to the outcode endpoint first; any it can't answer are probed
+        with sample postcodes, many districts per bulk request. Results are appended
+        to the district results log, so an interrupted sweep resumes where it
+        stopped, and the database and state are saved once at the end.
+        """
+        results_log = self.open_results_log()
+        split_districts = set(self.database.get("split_districts", []))
+        pending = [d for d in dict.fromkeys(districts)
+                   if d not in self.database["postcode_map"] and d not in split_districts and d not in results_log]
+        if len(results_log):
+            print(f"Resuming: {len(results_log)} districts already resolved in {results_log.log_path}")
+        print(f"\nProcessing {len(pending)} districts with {self.workers} workers...")
+
+        def log_result(district: str, constituencies: Set[str], sectors: Optional[Dict[str, Set[str]]] = None):
+            results_log[district] = {
+                "constituencies": sorted(constituencies),
+                "sectors": {sector: sorted(names) for sector, names in (sectors or {}).items() if names}
+            }
+
+        start = time.time()
+        unresolved = []
+        failed = []
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            futures = {executor.submit(self.fetch_outcode, district): district for district in pending}
+            for done, future in enumerate(as_completed(futures), 1):
+                district = futures[future]
+                self.state["total_requests"] += 1
+                try:
+                    constituencies = future.result()
+                except Exception as e:
+                    print(f"Error looking up outcode {district}: {e}")
+                    self.state["error_count"] += 1
+                    constituencies = set()
+                if constituencies:
+                    self.state["success_count"] += 1
+                    log_result(district, constituencies)
+                else:
+                    unresolved.append(district)
+                if done % 100 == 0:
+                    print(f"{done}/{len(pending)} outcodes checked ({time.time() - start:.0f}s)")
+
+            # Districts the outcode endpoint doesn't know: sample postcodes in bulk
+            group_size = max(1, BULK_SIZE // len(SAMPLE_INWARD_CODES))
+            groups = [unresolved[i:i + group_size] for i in range(0, len(unresolved), group_size)]
+            futures = {executor.submit(self.fetch_sample_sectors, group): group for group in groups}
+            for future in as_completed(futures):
+                group = futures[future]
+                self.state["total_requests"] += 1
+                try:
+                    group_sectors = future.result()
+                except Exception as e:
+                    print(f"Error probing {len(group)} districts in bulk: {e}")
+                    self.state["error_count"] += 1
+                    failed.extend(group)
+                    continue
+                self.state["success_count"] += 1
+                for district in group:
+                    sectors = group_sectors[district]
+                    if sectors:
+                        log_result(district, set().union(*sectors.values()), sectors)
+                    else:
+                        failed.append(district)
+
+        except KeyboardInterrupt:
+            executor.shutdown(wait=False, cancel_futures=True)
+            results_log.close()
+            self.save_state()
+            self.interrupted = True
+            print("\nProcessing interrupted! Resolved districts are in the results log.")
+            print("Run again to resume from where we left off.")
+            return {}
+        executor.shutdown()
+
+        district_constituencies: Dict[str, Set[str]] = {}
+        for district, result in results_log.items():
+            self.apply_district_result(district, result)
+            district_constituencies[district] = set(result["constituencies"])
+        # Districts that failed on an earlier run but resolved this time are no longer failures
+        self.state["failed_districts"] = [district for district in self.state["failed_districts"]
+                                          if district not in district_constituencies]
+        for district in failed:
+            print(f"✗ {district} (no valid constituency found)")
+            if district not in self.state["failed_districts"]:
+                self.state["failed_districts"].append(district)
+
+        self.save_database()
+        self.save_state()
+        # Everything logged is now in the database, so the next sweep starts clean
+        self.remove_results_log(results_log)
+        print(f"\nResolved {len(district_constituencies)} districts in {time.time() - start:.1f}s "
+              f"({len(failed)} failed)")
+        return district_constituencies
+
+    def retry_failed(self, parallel: bool = True, batch_size: int = 10) -> Dict[str, Set[str]]:
+        """Clear the failed list and look those districts up again"""
+        failed = self.state["failed_districts"]
+        self.state["failed_districts"] = []
+        self.save_state()
+        if parallel:
+            return self.process_districts_parallel(failed)
+        return self.process_districts_batch(failed, min(batch_size, len(failed)))
+
+    def reset_state(self):
+        """Start over: clear the processing state and any parallel results log left by an interrupted sweep"""
+        self.remove_results_log(self.open_results_log())
+        self.state = {
+            "last_processed_index": 0,
+            "failed_districts": [],
+            "total_requests": 0,
+            "success_count": 0,
+            "error_count": 0,
+            "start_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+        self.save_state()
+
+    def get_statistics(self) -> Dict:
+        """Database and processing statistics"""
+        return {
+            "total_mps": len(self.database["constituencies"]),
+            "total_districts": len(self.database["postcode_map"]),
+            "split_districts": len(self.database.get("split_districts", [])),
+            "last_updated": self.database.get("last_updated"),
+            "version": self.database.get("version"),
+            "started": self.state.get("start_time"),
+            "total_requests": self.state["total_requests"],
+            "successful_requests": self.state["success_count"],
+            "failed_requests": self.state["error_count"],
+            "failed_districts": list(self.state["failed_districts"])
+        }
+
     def validate_mappings(self) -> Tuple[int, int, List[str]]:
         """Validate existing mappings and return statistics"""
         total_districts = len(self.database["postcode_map"])
@@ -237,10 +502,8 @@ class PostcodeDistrictProcessor:
         
         return total_districts, valid_districts, invalid_mappings
 
-def main():
-    """Main function to process and validate postcode districts"""
-    processor = PostcodeDistrictProcessor()
-    
+def interactive_menu(processor: PostcodeDistrictProcessor):
+    """Menu-driven mode for working through districts by hand"""
     while True:
         print("\n=== Postcode District Processor ===")
         print("1. Process new districts")
@@ -256,6 +519,12 @@ def main():
             districts = processor.generate_districts()
             print(f"\nGenerated {len(districts)} potential districts")
             
+            parallel = input("Use parallel bulk lookups? (Y/n): ").lower().strip()
+            if parallel != 'n':
+                processor.process_districts_parallel(districts)
+                print("\nProcessing complete!")
+                continue
+
             batch_size = input("Enter batch size (default 10): ").strip()
             batch_size = int(batch_size) if batch_size.isdigit() else 10
             
@@ -317,26 +586,13 @@ def main():
                 continue
                 
             print(f"\nRetrying {len(processor.state['failed_districts'])} failed districts...")
-            failed = processor.state["failed_districts"]
-            processor.state["failed_districts"] = []  # Clear the list before retrying
-            processor.save_state()
-            
-            batch_size = min(10, len(failed))  # Use smaller batch size for retries
-            processor.process_districts_batch(failed, batch_size)
+            processor.retry_failed(parallel=False)
             print("\nRetry complete!")
             
         elif choice == '5':
             confirm = input("Are you sure you want to clear all processing state? (yes/no): ").lower().strip()
             if confirm == 'yes':
-                processor.state = {
-                    "last_processed_index": 0,
-                    "failed_districts": [],
-                    "total_requests": 0,
-                    "success_count": 0,
-                    "error_count": 0,
-                    "start_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                }
-                processor.save_state()
+                processor.reset_state()
                 print("Processing state cleared!")
             else:
                 print("Operation cancelled.")
@@ -348,5 +604,96 @@ def main():
         else:
             print("Invalid choice. Please try again.")
 
+def emit(payload: Dict):
+    """Write the command's JSON result to stdout"""
+    print(json.dumps(payload, indent=2, ensure_ascii=False))
+
+def sweep_result(processor: PostcodeDistrictProcessor, command: str, results: Dict[str, Set[str]],
+                 start: float) -> Tuple[Dict, int]:
+    failed = processor.state["failed_districts"]
+    if processor.interrupted:
+        exit_code = EXIT_INTERRUPTED
+    elif failed:
+        exit_code = EXIT_INCOMPLETE
+    else:
+        exit_code = EXIT_OK
+    return {
+        "command": command,
+        "status": {EXIT_OK: "ok", EXIT_INCOMPLETE: "incomplete", EXIT_INTERRUPTED: "interrupted"}[exit_code],
+        "resolved": len(results),
+        "failed_districts": failed,
+        "total_districts": len(processor.database["postcode_map"]),
+        "split_districts": len(processor.database.get("split_districts", [])),
+        "duration_seconds": round(time.time() - start, 1)
+    }, exit_code
+
+def run_command(args) -> int:
+    # Loading the database can print warnings; stdout carries only the JSON result
+    with redirect_stdout(sys.stderr):
+        processor = PostcodeDistrictProcessor(args.database, workers=args.workers, rate=args.rate)
+    start = time.time()
+
+    if args.command == "validate":
+        total, valid, invalid = processor.validate_mappings()
+        emit({
+            "command": "validate",
+            "status": "ok" if not invalid else "invalid",
+            "total_districts": total,
+            "valid_mappings": valid,
+            "invalid_mappings": {district: processor.database["postcode_map"][district] for district in invalid}
+        })
+        return EXIT_OK if not invalid else EXIT_INCOMPLETE
+
+    if args.command == "stats":
+        emit(dict(processor.get_statistics(), command="stats", status="ok"))
+        return EXIT_OK
+
+    # Progress lines go to stderr so stdout carries only the JSON result
+    with redirect_stdout(sys.stderr):
+        if args.command == "process":
+            districts = processor.generate_districts()
+            if args.restart:
+                processor.reset_state()
+            if args.sequential:
+                results = processor.process_districts_batch(districts, args.batch_size)
+            else:
+                results = processor.process_districts_parallel(districts)
+        else:
+            results = processor.retry_failed(parallel=not args.sequential, batch_size=args.batch_size)
+
+    payload, exit_code = sweep_result(processor, args.command, results, start)
+    emit(payload)
+    return exit_code
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Process and validate postcode districts; with no command, open the interactive menu"""
+    parser = argparse.ArgumentParser(description="Expand and validate the postcode district mapping")
+    parser.add_argument("--database", help="Path to mp_database.json (default: data/mp_database.json)")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent lookups in parallel mode")
+    parser.add_argument("--rate", type=float, default=10.0, help="Maximum postcodes.io requests per second")
+    subparsers = parser.add_subparsers(dest="command")
+
+    for name, help_text in (("process", "Look up every generated district not yet mapped"),
+                            ("retry-failed", "Look up the districts that failed last time")):
+        command = subparsers.add_parser(name, help=help_text)
+        command.add_argument("--sequential", action="store_true",
+                             help="Use the one-district-at-a-time lookups instead of the parallel sweep")
+        command.add_argument("--batch-size", type=int, default=10, help="Districts per batch in sequential mode")
+    subparsers.choices["process"].add_argument("--restart", action="store_true",
+                                               help="Clear the processing state before starting")
+    subparsers.add_parser("validate", help="Check every mapping points at a known constituency")
+    subparsers.add_parser("stats", help="Print database and processing statistics")
+
+    args = parser.parse_args(argv)
+    if args.command is None:
+        interactive_menu(PostcodeDistrictProcessor(args.database, workers=args.workers, rate=args.rate))
+        return EXIT_OK
+
+    try:
+        return run_command(args)
+    except Exception as e:
+        emit({"command": args.command, "status": "error", "error": str(e)})
+        return EXIT_ERROR
+
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
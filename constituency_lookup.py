@@ -6,38 +6,24 @@ Integrated with MP lookup for comprehensive political information
 """
 
 import requests
-import json
+import http_client
 import time
 import sys
 from datetime import datetime
+from lookup_cache import DEFAULT_CACHE_DB, make_cache
 
 class ConstituencyLookup:
     def __init__(self):
         self.base_url = "https://mapit.mysociety.org"
-        self.cache = {}
-        self.cache_file = "data/constituency_cache.json"
-        self.load_cache()
+        # Postcode -> constituency, kept on disk so later runs reuse them
+        self.cache = make_cache("constituency_lookup", maxsize=8192, ttl=7 * 86400, negative_ttl=3600,
+                                default_path=DEFAULT_CACHE_DB)
 
-    def load_cache(self):
-        """Load cached constituency data"""
-        try:
-            with open(self.cache_file, 'r') as f:
-                self.cache = json.load(f)
-            print(f"📁 Loaded {len(self.cache)} cached constituencies")
-        except FileNotFoundError:
-            print("📁 No cache file found, starting fresh")
-            self.cache = {}
-
-    def save_cache(self):
-        """Save constituency data to cache"""
-        try:
-            import os
-            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
-            with open(self.cache_file, 'w') as f:
-                json.dump(self.cache, f, indent=2)
-            print(f"💾 Saved {len(self.cache)} constituencies to cache")
-        except Exception as e:
-            print(f"❌ Error saving cache: {e}")
+    def report_cache(self):
+        """Print cache hit/miss counts"""
+        stats = self.cache.stats()
+        print(f"📊 Cache: {stats['hits']} hits, {stats['misses']} misses, {stats['size']} entries"
+              f"{' (shared)' if stats['shared'] else ''}")
 
     def get_constituency(self, postcode):
         """Get constituency name from postcode"""
@@ -45,20 +31,24 @@ class ConstituencyLookup:
         clean_postcode = postcode.replace(' ', '').upper()
 
         # Check cache first
-        if clean_postcode in self.cache:
+        cached = self.cache.lookup(clean_postcode)
+        if cached is not None:
             print(f"📋 Using cached data for {postcode}")
-            return self.cache[clean_postcode]
+            return cached.value
 
         # Make API request
         url = f"{self.base_url}/postcode/{clean_postcode}"
 
         try:
             print(f"🌐 Looking up constituency for {postcode}...")
-            response = requests.get(url, timeout=10)
+            response = http_client.get(url)
 
             if response.status_code != 200:
                 error_msg = f"Invalid postcode or API failed (Status: {response.status_code})"
                 print(f"❌ {error_msg}")
+                if response.status_code == 404:
+                    # Unknown postcodes stay unknown; don't ask again for a while
+                    self.cache.set_negative(clean_postcode, {"error": error_msg})
                 return {"error": error_msg}
 
             data = response.json()
@@ -101,11 +91,12 @@ class ConstituencyLookup:
         results = {}
 
         for postcode in postcodes:
+            misses = self.cache.stats()["misses"]
             result = self.get_constituency(postcode)
             results[postcode] = result
 
-            # Be nice to the API - small delay between requests
-            if not postcode.replace(' ', '').upper() in self.cache:
+            # Be nice to the API - small delay after requests that went out
+            if self.cache.stats()["misses"] > misses:
                 time.sleep(0.5)
 
         return results
@@ -170,9 +161,7 @@ def test_constituency_lookup():
             print(f"📍 ID: {result['id']}")
             print(f"📅 Lookup time: {result['lookup_time']}")
 
-    # Save cache
-    lookup.save_cache()
-    print(f"\n💾 Cache saved with {len(lookup.cache)} entries")
+    lookup.report_cache()
 
 def main():
     """Main function for command line usage"""
@@ -198,8 +187,7 @@ def main():
         print(f"📅 Lookup time: {result['lookup_time']}")
         print(f"🔗 API source: {result['api_source']}")
 
-    # Save cache
-    lookup.save_cache()
+    lookup.report_cache()
 
 if __name__ == "__main__":
     if len(sys.argv) > 1 and sys.argv[1] == "--test":
@@ -0,0 +1,127 @@
+"""
+Precomputed constituency name search for autocomplete.
+Names are normalised once (accents folded, "&" read as "and", punctuation
+dropped) into token prefix and trigram tables, so a query only touches the
+names sharing its tokens instead of scanning all 650 on every keystroke.
+"""
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+# Ignored when matching tokens, so "Richmond & Northallerton" and "richmond northallerton" agree
+STOPWORDS = frozenset({"and", "of", "the"})
+
+# Ranking tiers, best first
+EXACT = 4.0
+NAME_PREFIX = 3.0
+TOKEN_PREFIX = 2.0
+FUZZY = 1.0
+
+MIN_FUZZY_SIMILARITY = 0.5
+
+def normalise_name(text: str) -> str:
+    """Lower-case, fold accents, spell out "&" and drop punctuation ("Ynys Môn" -> "ynys mon")"""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(c for c in text if not unicodedata.combining(c)).lower().replace('&', ' and ')
+    return ' '.join(re.sub(r"[^a-z0-9\s]", ' ', text.replace("'", '')).split())
+
+def name_tokens(text: str) -> List[str]:
+    return [token for token in normalise_name(text).split() if token not in STOPWORDS]
+
+def trigrams(token: str) -> Set[str]:
+    padded = f" {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class ConstituencySearchIndex:
+    def __init__(self, names: List[str], mp_lookup: Optional[Callable[[str], Optional[Dict]]] = None):
+        self.names = tuple(sorted(set(names)))
+        self.mp_lookup = mp_lookup
+        self.keys: Tuple[str, ...] = tuple(' '.join(name_tokens(name)) for name in self.names)
+        self.prefixes: Dict[str, Set[int]] = defaultdict(set)
+        self.token_ids: Dict[str, Set[int]] = defaultdict(set)
+        self.trigram_tokens: Dict[str, Set[str]] = defaultdict(set)
+
+        for name_id, key in enumerate(self.keys):
+            for token in key.split():
+                self.token_ids[token].add(name_id)
+                for end in range(1, len(token) + 1):
+                    self.prefixes[token[:end]].add(name_id)
+        for token in self.token_ids:
+            for gram in trigrams(token):
+                self.trigram_tokens[gram].add(token)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _prefix_matches(self, key: str, tokens: List[str]) -> Dict[int, float]:
+        """Names containing a token starting with every query token"""
+        candidates = set.intersection(*(self.prefixes.get(token, set()) for token in tokens))
+        scores = {}
+        for name_id in candidates:
+            name_key = self.keys[name_id]
+            if name_key == key:
+                scores[name_id] = EXACT
+            elif name_key.startswith(key):
+                scores[name_id] = NAME_PREFIX
+            else:
+                scores[name_id] = TOKEN_PREFIX
+        return scores
+
+    def _fuzzy_matches(self, tokens: List[str]) -> Dict[int, float]:
+        """Names whose tokens are close to every query token by trigram (Dice) similarity"""
+        per_token: List[Dict[int, float]] = []
+        for token in tokens:
+            grams = trigrams(token)
+            shared: Dict[str, int] = defaultdict(int)
+            for gram in grams:
+                for candidate in self.trigram_tokens.get(gram, ()):
+                    shared[candidate] += 1
+            best: Dict[int, float] = {}
+            for candidate, count in shared.items():
+                similarity = 2 * count / (len(grams) + len(trigrams(candidate)))
+                if similarity < MIN_FUZZY_SIMILARITY:
+                    continue
+                for name_id in self.token_ids[candidate]:
+                    best[name_id] = max(best.get(name_id, 0.0), similarity)
+            per_token.append(best)
+
+        common = set.intersection(*(set(best) for best in per_token))
+        return {name_id: FUZZY * sum(best[name_id] for best in per_token) / len(per_token)
+                for name_id in common}
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Dict]:
+        """Ranked matches: exact name, name prefix, token prefixes, then near misses.
+
+        With no limit every prefix match is returned, and near misses only when
+        nothing matches by prefix.
+        """
+        tokens = name_tokens(query)
+        if not tokens:
+            return []
+        key = ' '.join(tokens)
+
+        scores = self._prefix_matches(key, tokens)
+        match_types = {EXACT: "exact", NAME_PREFIX: "prefix", TOKEN_PREFIX: "token"}
+        wanted = limit if limit is not None else 1
+        if len(scores) < wanted:
+            for name_id, score in self._fuzzy_matches(tokens).items():
+                scores.setdefault(name_id, score)
+
+        # Better tier first, then the shorter (closer) name, then alphabetical
+        ranked = sorted(scores, key=lambda i: (-scores[i], len(self.keys[i]), self.names[i]))[:limit]
+        results = []
+        for name_id in ranked:
+            name = self.names[name_id]
+            score = scores[name_id]
+            result = {
+                "constituency": name,
+                "match": match_types.get(score, "fuzzy"),
+                "score": round(score, 3)
+            }
+            mp = self.mp_lookup(name) if self.mp_lookup else None
+            if mp:
+                result["mp"] = {"name": mp.get("name"), "party": mp.get("party"),
+                                "profile_url": mp.get("profile_url")}
+            results.append(result)
+        return results
@@ -0,0 +1,137 @@
+"""
+Concurrent RSS/Atom fetcher for the news scripts.
+Every feed is requested at once, each with the ETag/Last-Modified it sent
+last time, so an unchanged feed costs a 304 and its stored entries are
+reused without parsing. A run is bounded by a deadline: feeds still
+outstanding when it passes fall back to their stored entries, so a refresh
+takes as long as the slowest feed (at most the deadline), not their sum.
+"""
+import os
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import feedparser
+import requests
+from requests.adapters import HTTPAdapter
+
+import json_io
+
+USER_AGENT = "GovWhiz News Aggregator/1.0 (https://govwhiz.uk)"
+DEFAULT_STATE_PATH = "data/feed_state.json"
+
+# Entries kept per feed for reuse when the feed has not changed
+MAX_STORED_ENTRIES = 50
+
+def entry_to_dict(entry) -> Dict:
+    """The fields of a feedparser entry the news scripts use"""
+    return {
+        "id": entry.get("id") or entry.get("link", ""),
+        "title": entry.get("title", ""),
+        "link": entry.get("link", ""),
+        "summary": entry.get("summary", ""),
+        "published": entry.get("published") or entry.get("updated") or ""
+    }
+
+class FeedFetcher:
+    def __init__(self, state_path: str = DEFAULT_STATE_PATH, deadline: float = 20.0,
+                 timeout: float = 10.0, workers: int = 8):
+        self.state_path = state_path
+        self.deadline = deadline
+        self.timeout = timeout
+        self.workers = max(1, workers)
+        self.session = requests.Session()
+        self.session.headers.update({"User-Agent": USER_AGENT})
+        adapter = HTTPAdapter(pool_maxsize=self.workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        # Per-feed validators and entries, keyed by feed URL
+        self.state: Dict[str, Dict] = json_io.load_file(state_path, {})
+        self._state_lock = threading.Lock()
+
+    def save_state(self) -> None:
+        directory = os.path.dirname(self.state_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._state_lock:
+            state = dict(self.state)
+        json_io.dump_file(self.state_path, state)
+
+    def _stored(self, url: str, status: str, error: Optional[str] = None) -> Dict:
+        stored = self.state.get(url, {})
+        return {"status": status, "entries": stored.get("entries", []), "error": error,
+                "fetched_at": stored.get("fetched_at"), "elapsed": 0.0}
+
+    def fetch_feed(self, url: str, run_deadline: Optional[float] = None) -> Dict:
+        """Fetch one feed conditionally.
+
+        Returns {"status", "entries", "error", "fetched_at", "elapsed"} where
+        status is "updated", "not_modified" or "error"; an errored feed keeps
+        its stored entries.
+        """
+        start = time.monotonic()
+        stored = self.state.get(url, {})
+        headers = {}
+        if stored.get("etag"):
+            headers["If-None-Match"] = stored["etag"]
+        if stored.get("modified"):
+            headers["If-Modified-Since"] = stored["modified"]
+
+        read_timeout = self.timeout
+        if run_deadline is not None:
+            read_timeout = max(0.1, min(read_timeout, run_deadline - time.monotonic()))
+
+        try:
+            response = self.session.get(url, headers=headers, timeout=(min(5.0, read_timeout), read_timeout))
+            if response.status_code == 304 and stored:
+                result = self._stored(url, "not_modified")
+            else:
+                response.raise_for_status()
+                feed = feedparser.parse(response.content, response_headers=dict(response.headers))
+                if feed.bozo and not feed.entries:
+                    raise ValueError(f"could not parse feed: {feed.get('bozo_exception')}")
+                entries = [entry_to_dict(entry) for entry in feed.entries[:MAX_STORED_ENTRIES]]
+                fetched_at = datetime.now().isoformat()
+                with self._state_lock:
+                    self.state[url] = {
+                        "etag": response.headers.get("ETag"),
+                        "modified": response.headers.get("Last-Modified"),
+                        "fetched_at": fetched_at,
+                        "entries": entries
+                    }
+                result = {"status": "updated", "entries": entries, "error": None, "fetched_at": fetched_at}
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logging.warning(f"Could not fetch feed {url}: {e}")
+            result = self._stored(url, "error", str(e))
+
+        result["elapsed"] = round(time.monotonic() - start, 3)
+        return result
+
+    def fetch_all(self, feeds: Dict[str, str], deadline: Optional[float] = None) -> Dict[str, Dict]:
+        """Fetch {key: url} feeds concurrently within deadline seconds.
+
+        Feeds not finished by the deadline are returned with status "timeout"
+        and their stored entries. The validator state is saved afterwards.
+        """
+        deadline = self.deadline if deadline is None else deadline
+        run_deadline = time.monotonic() + deadline
+        executor = ThreadPoolExecutor(max_workers=min(self.workers, max(1, len(feeds))),
+                                      thread_name_prefix="feed-fetch")
+        futures = {key: executor.submit(self.fetch_feed, url, run_deadline) for key, url in feeds.items()}
+        wait(futures.values(), timeout=deadline)
+        # Requests still running are capped by run_deadline; don't wait for them
+        executor.shutdown(wait=False, cancel_futures=True)
+
+        results = {}
+        for key, future in futures.items():
+            if future.done() and not future.cancelled():
+                results[key] = future.result()
+            else:
+                logging.warning(f"Feed {key} missed the {deadline:.0f}s deadline; using stored entries")
+                results[key] = self._stored(feeds[key], "timeout", f"Deadline of {deadline}s exceeded")
+                results[key]["elapsed"] = round(deadline, 3)
+        self.save_state()
+        return results
@@ -5,20 +5,32 @@ Fetches BBC Politics news and provides AI-powered summaries
 Saves results to JSON file for web integration
 """
 
-import feedparser
 import warnings
 import sys
-import json
-import os
 import time
-import requests
 from datetime import datetime
 from typing import List, Dict, Optional
 from pathlib import Path
 
+from article_store import ArticleStore
+from feed_fetcher import FeedFetcher
+from news_summarizer import ENGINES, SummaryWorker
+
 # Suppress warnings for cleaner output
 warnings.filterwarnings("ignore")
 
+# Whole-run time limit for fetching every feed, in seconds
+FETCH_DEADLINE = 20
+
+# Every article seen is kept here; latest_news.json shows the newest LATEST_NEWS_LIMIT
+ARTICLE_DB = "data/articles.db"
+LATEST_NEWS_LIMIT = 50
+
+# Summary engine ("auto", "bart" or "extractive") and the seconds the AI model
+# may spend per run before the remaining articles get extractive summaries
+SUMMARY_ENGINE = "auto"
+SUMMARY_BUDGET = 60
+
 # News sources configuration
 NEWS_SOURCES = {
     "bbc_politics": {
@@ -41,34 +53,59 @@ NEWS_SOURCES = {
     }
 }
 
-def load_summarizer():
-    """Load the AI summarization model with enhanced error handling"""
-    try:
-        print("🤖 Loading AI summarization model (this may take a moment on first run)...")
-
-        try:
-            from transformers import pipeline
-        except ImportError:
-            print("❌ transformers library not found. Installing...")
-            import subprocess
-            subprocess.check_call([sys.executable, "-m", "pip", "install", "transformers", "torch"])
-            from transformers import pipeline
-
-        # Load the model
-        summarizer = pipeline(
-            "summarization",
-            model="facebook/bart-large-cnn",
-            device=-1,  # Use CPU (set to 0 for GPU if available)
-            max_length=512,
-            truncation=True
-        )
-        print("✅ AI model loaded successfully!")
-        return summarizer
+_summary_worker: Optional[SummaryWorker] = None
+
+def load_summarizer() -> SummaryWorker:
+    """Start the summarisation worker once; it loads the model on its first job"""
+    global _summary_worker
+    if _summary_worker is None:
+        print("🤖 Starting AI summarisation worker (the model loads once, on first use)...")
+        _summary_worker = SummaryWorker(engine=SUMMARY_ENGINE, latency_budget=SUMMARY_BUDGET)
+    return _summary_worker
+
+_fetcher: Optional[FeedFetcher] = None
+
+def get_fetcher() -> FeedFetcher:
+    """Shared feed fetcher holding the per-feed ETag/Last-Modified state"""
+    global _fetcher
+    if _fetcher is None:
+        _fetcher = FeedFetcher(deadline=FETCH_DEADLINE)
+    return _fetcher
+
+def build_articles(source_key: str, source: Dict, result: Dict, num_articles: int) -> List[Dict]:
+    """Convert a feed fetch result into our standard article format"""
+    status = result["status"]
+    if status == "not_modified":
+        print(f"♻️ {source['name']} unchanged; reusing {len(result['entries'])} stored articles")
+    elif status in ("error", "timeout"):
+        print(f"❌ Error fetching news from {source['name']}: {result['error']}")
+        if result["entries"]:
+            print(f"♻️ Using {len(result['entries'])} stored articles from {result['fetched_at']}")
+    elif result["entries"]:
+        print(f"✅ Found {len(result['entries'])} articles from {source['name']} ({result['elapsed']:.1f}s)")
+
+    if not result["entries"]:
+        print(f"❌ No articles found in {source['name']} feed")
+        return []
 
-    except Exception as e:
-        print(f"❌ Error loading AI model: {e}")
-        print("💡 Falling back to original summaries...")
-        return None
+    articles = []
+    for entry in result["entries"][:num_articles]:
+        articles.append({
+            'id': entry['id'],
+            'title': entry['title'],
+            'link': entry['link'],
+            'original_summary': entry['summary'],
+            'published': entry['published'] or datetime.now().isoformat(),
+            'source': source['name'],
+            'source_key': source_key,
+            'category': source['category']
+        })
+    return articles
+
+def fetch_sources(sources: Dict[str, Dict], num_articles: int, deadline: Optional[float] = None) -> Dict[str, List[Dict]]:
+    """Fetch several sources concurrently; articles keyed by source key"""
+    results = get_fetcher().fetch_all({key: source['url'] for key, source in sources.items()}, deadline)
+    return {key: build_articles(key, sources[key], results[key], num_articles) for key in sources}
 
 def fetch_news_from_source(source_key: str, num_articles: int = 5) -> List[Dict]:
     """Fetch news from a specific source"""
@@ -76,105 +113,27 @@ def fetch_news_from_source(source_key: str, num_articles: int = 5) -> List[Dict]
         print(f"❌ Unknown news source: {source_key}")
         return []
 
-    source = NEWS_SOURCES[source_key]
-    print(f"📰 Fetching news from {source['name']}...")
+    print(f"📰 Fetching news from {NEWS_SOURCES[source_key]['name']}...")
+    return fetch_sources({source_key: NEWS_SOURCES[source_key]}, num_articles)[source_key]
 
+def get_pub_date(article):
     try:
-        # Parse the RSS feed with user agent
-        feed = feedparser.parse(source['url'], 
-            agent='GovWhiz News Aggregator/1.0 (https://govwhiz.uk)')
-
-        if not feed.entries:
-            print(f"❌ No articles found in {source['name']} feed")
-            return []
-
-        print(f"✅ Found {len(feed.entries)} articles from {source['name']}")
-
-        # Convert to our standard format
-        articles = []
-        for entry in feed.entries[:num_articles]:
-            article = {
-                'title': entry.title,
-                'link': entry.link,
-                'original_summary': getattr(entry, 'summary', ''),
-                'published': getattr(entry, 'published', datetime.now().isoformat()),
-                'source': source['name'],
-                'source_key': source_key,
-                'category': source['category']
-            }
-            articles.append(article)
-
-        return articles
-
-    except Exception as e:
-        print(f"❌ Error fetching news from {source['name']}: {e}")
-        return []
-
-def fetch_all_news_sources(num_articles_per_source: int = 3) -> List[Dict]:
-    """Fetch news from all configured sources"""
+        if article.get('published'):
+            return datetime.strptime(article['published'], '%a, %d %b %Y %H:%M:%S %Z')
+    except:
+        pass
+    return datetime.min
+
+def fetch_all_news_sources(num_articles_per_source: int = 3, deadline: Optional[float] = None) -> List[Dict]:
+    """Fetch news from all configured sources concurrently, within deadline seconds"""
     all_articles = []
-
-    for source_key in NEWS_SOURCES.keys():
-        articles = fetch_news_from_source(source_key, num_articles_per_source)
+    for articles in fetch_sources(NEWS_SOURCES, num_articles_per_source, deadline).values():
         all_articles.extend(articles)
 
-        # Small delay between requests to be respectful
-        time.sleep(1)
-
     # Sort by publication date if available
-    def get_pub_date(article):
-        try:
-            if article.get('published'):
-                return datetime.strptime(article['published'], '%a, %d %b %Y %H:%M:%S %Z')
-        except:
-            pass
-        return datetime.min
-
     all_articles.sort(key=get_pub_date, reverse=True)
     return all_articles
 
-def clean_text(text):
-    """Clean and prepare text for summarization"""
-    if not text:
-        return ""
-
-    # Remove HTML tags and clean up text
-    import re
-    text = re.sub(r'<[^>]+>', '', text)
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
-
-def summarize_article(summarizer, text, max_length=50, min_length=25):
-    """Generate AI summary of article text"""
-    if not summarizer or not text:
-        return None
-
-    try:
-        # Clean the text
-        clean_text_content = clean_text(text)
-
-        # Skip if text is too short
-        word_count = len(clean_text_content.split())
-        if word_count < 10:
-            return None
-
-        # Adjust max_length based on input length to avoid warnings
-        adjusted_max_length = min(max_length, max(word_count - 5, 10))
-        adjusted_min_length = min(min_length, adjusted_max_length - 5)
-
-        # Generate summary
-        summary = summarizer(
-            clean_text_content,
-            max_length=adjusted_max_length,
-            min_length=max(adjusted_min_length, 5),
-            do_sample=False
-        )
-        return summary[0]['summary_text']
-
-    except Exception as e:
-        print(f"⚠️ Error summarizing text: {e}")
-        return None
-
 def format_article_output(entry, ai_summary=None, index=1):
     """Format article for display"""
     print(f"\n📄 Article {index}")
@@ -196,25 +155,20 @@ def format_article_output(entry, ai_summary=None, index=1):
 
     print("-" * 60)
 
-def save_to_json(articles_data, filename="data/latest_news.json"):
-    """Save articles data to JSON file"""
-    try:
-        # Ensure data directory exists
-        os.makedirs(os.path.dirname(filename), exist_ok=True)
-
-        # Format data for JSON
-        output_data = {
-            "last_updated": datetime.now().isoformat(),
-            "total_articles": len(articles_data),
-            "articles": articles_data
-        }
+_store: Optional[ArticleStore] = None
 
-        # Save to file
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(output_data, f, indent=2, ensure_ascii=False)
-        
-        print(f"✅ Saved {len(articles_data)} articles to {filename}")
+def get_store() -> ArticleStore:
+    """Shared store of every article seen by the fetchers"""
+    global _store
+    if _store is None:
+        _store = ArticleStore(ARTICLE_DB)
+    return _store
 
+def save_to_json(filename="data/latest_news.json"):
+    """Materialise the latest stored articles as the frontend's JSON file"""
+    try:
+        output = get_store().export_json(filename, limit=LATEST_NEWS_LIMIT)
+        print(f"✅ Saved {output['total_articles']} of {output['stored_articles']} stored articles to {filename}")
     except Exception as e:
         print(f"❌ Error saving to JSON: {e}")
 
@@ -231,25 +185,24 @@ def fetch_mp_news(mp_name: str, constituency: str, num_articles: int = 5) -> Lis
         'parliament OR commons'
     ]
 
-    # Add MP-specific feeds
-    NEWS_SOURCES["guardian_mp"] = {
-        "name": "The Guardian",
-        "url": f"https://www.theguardian.com/politics/search.atom?q={'+'.join(search_terms)}",
-        "description": "Guardian MP Coverage",
-        "category": "MP News"
-    }
-    
-    NEWS_SOURCES["bbc_mp"] = {
-        "name": "BBC News",
-        "url": f"http://feeds.bbci.co.uk/news/politics/rss.xml",
-        "description": "BBC MP Coverage",
-        "category": "MP News"
+    # MP-specific feeds
+    mp_sources = {
+        "guardian_mp": {
+            "name": "The Guardian",
+            "url": f"https://www.theguardian.com/politics/search.atom?q={'+'.join(search_terms)}",
+            "description": "Guardian MP Coverage",
+            "category": "MP News"
+        },
+        "bbc_mp": {
+            "name": "BBC News",
+            "url": f"http://feeds.bbci.co.uk/news/politics/rss.xml",
+            "description": "BBC MP Coverage",
+            "category": "MP News"
+        }
     }
 
-    # Fetch from all sources
-    for source_key in ["guardian_mp", "bbc_mp"]:
-        articles = fetch_news_from_source(source_key, num_articles)
-        
+    # Fetch from all sources at once
+    for articles in fetch_sources(mp_sources, num_articles).values():
         # Filter for MP relevance
         filtered_articles = []
         for article in articles:
@@ -259,21 +212,10 @@ def fetch_mp_news(mp_name: str, constituency: str, num_articles: int = 5) -> Lis
                 filtered_articles.append(article)
         
         all_articles.extend(filtered_articles)
-        time.sleep(1)  # Respectful delay between requests
-
-    # Sort by relevance and date
-    def sort_key(article):
-        relevance_score = 2 if article.get('relevance') == 'direct' else 1
-        try:
-            date = datetime.strptime(article['published'], '%a, %d %b %Y %H:%M:%S %Z')
-            return (-relevance_score, -date.timestamp())
-        except:
-            return (-relevance_score, 0)
 
-    all_articles.sort(key=sort_key)
-
-    # Take top articles
-    top_articles = all_articles[:num_articles]
+    # Remember them, then answer from everything seen about this MP so far
+    get_store().merge(all_articles, mp_name=mp_name)
+    top_articles = get_store().articles_for_mp(mp_name, num_articles)
 
     if not top_articles:
         print(f"⚠️ No news found specifically about {mp_name}")
@@ -282,7 +224,7 @@ def fetch_mp_news(mp_name: str, constituency: str, num_articles: int = 5) -> Lis
 
     return top_articles
 
-def main():
+def main(engine: Optional[str] = None):
     """Main function to run the enhanced news fetcher with AI summarization"""
     print("🚀 Enhanced UK Parliament News Scraper with AI Summarization")
     print("=" * 70)
@@ -306,27 +248,48 @@ def main():
 
     print(f"\n🔍 Processing {len(articles)} articles...")
 
-    # Process each article
-    for i, article in enumerate(articles, 1):
-        # Generate AI summary if model is available
-        ai_summary = None
-        if summarizer and article.get('original_summary'):
-            print(f"🧠 Generating AI summary for article {i}/{len(articles)}...")
-            ai_summary = summarize_article(summarizer, article['original_summary'])
-
+    # Summarise every article in one batched, cached job
+    ai_summaries = [None] * len(articles)
+    to_summarise = [i for i, article in enumerate(articles) if article.get('original_summary')]
+    if to_summarise:
+        print(f"🧠 Generating AI summaries for {len(to_summarise)} articles...")
+        results = summarizer.summarize([articles[i]['original_summary'] for i in to_summarise], engine=engine)
+        for i, ai_summary in zip(to_summarise, results):
+            ai_summaries[i] = ai_summary
+        stats = summarizer.stats
+        print(f"   {stats['cached']} cached, {stats['summarised']} summarised in {stats['batches']} batches, "
+              f"{stats['extractive']} extractive so far")
+
+    for i, (article, ai_summary) in enumerate(zip(articles, ai_summaries), 1):
         # Add AI summary to article
         article['ai_summary'] = ai_summary if ai_summary else None
-        
+
         # Display formatted output
         format_article_output(article, ai_summary, i)
 
-    # Save to JSON file
-    print(f"\n💾 Saving news data to JSON file...")
-    save_to_json(articles)
+    # Merge into the article store and rebuild the JSON file from it
+    counts = get_store().merge(articles)
+    print(f"\n🗃️ {counts['added']} new, {counts['seen']} already stored, "
+          f"{counts['duplicate']} syndicated copies of stored articles")
+    print(f"💾 Saving news data to JSON file...")
+    save_to_json()
 
     print(f"\n✅ Completed processing {len(articles)} articles")
     print("=" * 70)
 
+def watch(interval: int = 300, engine: Optional[str] = None):
+    """Refresh the news every interval seconds in one process, keeping the model loaded"""
+    summarizer = load_summarizer()
+    try:
+        while True:
+            main(engine)
+            print(f"💤 Waiting {interval} seconds before next update...")
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("\n👋 Stopping news updates")
+    finally:
+        summarizer.close()
+
 def quick_test():
     """Quick test function without AI summarization"""
     print("🚀 Quick News Test (No AI)")
@@ -376,7 +339,9 @@ def show_help():
     print("=" * 50)
     print("Usage:")
     print("  python fetch_news.py                    # Full scraper with AI")
+    print("  python fetch_news.py --watch [secs]    # Refresh every 300s (model stays loaded)")
     print("  python fetch_news.py --quick           # Quick test (BBC only)")
+    print("  ... --engine <auto|bart|extractive>    # Summary engine for the full scraper/--watch")
     print("  python fetch_news.py --source <key>    # Test single source")
     print("  python fetch_news.py --list-sources    # List available sources")
     print("  python fetch_news.py --help            # Show this help")
@@ -387,6 +352,15 @@ def show_help():
 
 if __name__ == "__main__":
     # Parse command line arguments
+    engine = None
+    if "--engine" in sys.argv:
+        position = sys.argv.index("--engine")
+        engine = sys.argv[position + 1] if position + 1 < len(sys.argv) else None
+        del sys.argv[position:position + 2]
+        if engine not in ENGINES:
+            print(f"❌ Unknown engine. Choose from: {', '.join(ENGINES)}")
+            sys.exit(1)
+
     if len(sys.argv) > 1:
         arg = sys.argv[1].lower()
 
@@ -396,9 +370,11 @@ if __name__ == "__main__":
             show_help()
         elif arg == "--list-sources":
             list_sources()
+        elif arg == "--watch":
+            watch(int(sys.argv[2]) if len(sys.argv) > 2 else 300, engine)
         elif arg == "--source" and len(sys.argv) > 2:
             test_single_source(sys.argv[2])
         else:
             print("❌ Unknown argument. Use --help to see available options.")
     else:
-        main()
+        main(engine)
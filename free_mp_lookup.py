@@ -4,7 +4,7 @@ Enhanced MP Lookup System
 Handles MP search by postcode and maintains local database with automatic updates
 """
 
-import requests
+import http_client
 import json
 import os
 import re
@@ -101,7 +101,7 @@ class MPLookupService:
                 }
 
             # Try Postcodes.io API
-            response = requests.get(
+            response = http_client.get(
                 f"https://api.postcodes.io/postcodes/{formatted_postcode.replace(' ', '')}"
             )
 
@@ -160,7 +160,7 @@ class MPLookupService:
                         }
 
             # Get current MP from Parliament API
-            response = requests.get(
+            response = http_client.get(
                 "https://members-api.parliament.uk/api/Location/Constituency/Search",
                 params={"searchText": constituency}
             )
@@ -171,7 +171,7 @@ class MPLookupService:
                     constituency_id = data["items"][0]["value"]["id"]
                     
                     # Get current MP
-                    mp_response = requests.get(
+                    mp_response = http_client.get(
                         f"https://members-api.parliament.uk/api/Location/Constituency/{constituency_id}/Members/Current"
                     )
 
@@ -0,0 +1,245 @@
+"""
+Shared HTTP client for upstream APIs (postcodes.io, MapIt, Parliament).
+Keeps one pooled keep-alive session per host, applies the timeouts from
+config.json / update-config.json, retries transient failures with jittered
+exponential backoff within an overall deadline and stops calling a host
+that keeps failing until its circuit breaker resets.
+"""
+import os
+import json
+import time
+import random
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+USER_AGENT = "GovWhiz/2.0 (+https://github.com/ag-4/GovWhiz)"
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# Total time budget for calls made while serving a web request
+INTERACTIVE_DEADLINE = 5.0
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised without calling a host whose circuit breaker is open"""
+
+class CircuitBreaker:
+    """Opens after failure_threshold consecutive failures; lets one trial call
+    through after reset_timeout seconds and closes again if it succeeds"""
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+def _load_json(path: str) -> Dict:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def load_settings(config_path: Optional[str] = None, update_config_path: Optional[str] = None) -> Dict:
+    """Read timeouts and retry settings.
+
+    config.json's api.timeout (seconds) gives the default connect/read timeouts
+    and the total deadline across retries, and errorHandling the retry count
+    and base delay (ms); each
+    update-config.json dataSources entry overrides the read timeout (ms) for
+    its baseUrl host.
+    """
+    config = _load_json(config_path or os.path.join(ROOT_DIR, "config.json"))
+    update_config = _load_json(update_config_path or os.path.join(ROOT_DIR, "update-config.json"))
+
+    timeout = config.get("api", {}).get("timeout", {})
+    error_handling = config.get("errorHandling", {})
+    connect = float(timeout.get("connect", 5))
+    default_timeout = (connect, float(timeout.get("request", 10)))
+
+    host_timeouts = {}
+    for source in update_config.get("dataSources", {}).values():
+        host = urlparse(source.get("baseUrl", "")).netloc
+        if host and source.get("timeout"):
+            host_timeouts[host] = (connect, source["timeout"] / 1000)
+
+    return {
+        "timeout": default_timeout,
+        "host_timeouts": host_timeouts,
+        "deadline": float(timeout.get("total", 30)),
+        "retries": int(error_handling.get("retryAttempts", 3)),
+        "backoff": error_handling.get("retryDelay", 1000) / 1000
+    }
+
+def _cap_timeout(timeout, remaining: Optional[float]):
+    """A requests timeout (seconds or a connect/read pair) cut to the time remaining"""
+    if remaining is None or timeout is None:
+        return timeout
+    remaining = max(remaining, 0.001)
+    if isinstance(timeout, tuple):
+        return tuple(min(part, remaining) if part is not None else remaining for part in timeout)
+    return min(timeout, remaining)
+
+def _time_left(expires: Optional[float], delay: float) -> bool:
+    """Whether a retry after delay seconds would still start before the deadline"""
+    return expires is None or time.monotonic() + delay < expires
+
+class HTTPClient:
+    def __init__(self, settings: Optional[Dict] = None, pool_size: int = 10,
+                 failure_threshold: int = 5, reset_timeout: float = 30.0, max_backoff: float = 8.0):
+        settings = settings or load_settings()
+        self.timeout: Tuple[float, float] = settings["timeout"]
+        self.host_timeouts: Dict[str, Tuple[float, float]] = settings["host_timeouts"]
+        self.deadline: Optional[float] = settings.get("deadline")
+        self.retries = settings["retries"]
+        self.backoff = settings["backoff"]
+        self.max_backoff = max_backoff
+        self.pool_size = pool_size
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._sessions: Dict[str, requests.Session] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def session(self, host: str) -> requests.Session:
+        """Pooled keep-alive session for a host"""
+        with self._lock:
+            if host not in self._sessions:
+                session = requests.Session()
+                session.headers.update({"User-Agent": USER_AGENT})
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._sessions[host] = session
+            return self._sessions[host]
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        with self._lock:
+            if host not in self._breakers:
+                self._breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return self._breakers[host]
+
+    def timeout_for(self, host: str) -> Tuple[float, float]:
+        return self.host_timeouts.get(host, self.timeout)
+
+    def _delay(self, attempt: int, response: Optional[requests.Response]) -> float:
+        """Full-jitter exponential backoff, honouring a numeric Retry-After"""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                return min(float(retry_after), self.max_backoff)
+        return random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt)))
+
+    def request(self, method: str, url: str, retries: Optional[int] = None,
+                deadline: Optional[float] = None, **kwargs) -> requests.Response:
+        """Send a request through the host's session and circuit breaker.
+
+        Connection errors, timeouts and 429/5xx responses are retried for
+        idempotent methods (or when retries is given). All attempts and
+        backoff together take at most deadline seconds (the configured total
+        by default): each attempt's timeouts are cut to the time left and no
+        retry is started once it has passed. Returns the final
+        response, including error statuses; raises the last exception, or
+        CircuitOpenError while the host's breaker is open.
+        """
+        method = method.upper()
+        host = urlparse(url).netloc
+        breaker = self.breaker(host)
+        if retries is None:
+            retries = self.retries if method in IDEMPOTENT_METHODS else 0
+        if deadline is None:
+            deadline = self.deadline
+        timeout = kwargs.pop("timeout", self.timeout_for(host))
+        session = self.session(host)
+        expires = time.monotonic() + deadline if deadline is not None else None
+
+        for attempt in range(retries + 1):
+            if not breaker.allow():
+                raise CircuitOpenError(f"Circuit open for {host}; not calling {url}")
+
+            remaining = expires - time.monotonic() if expires is not None else None
+            response = None
+            try:
+                response = session.request(method, url, timeout=_cap_timeout(timeout, remaining), **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                breaker.record_failure()
+                delay = self._delay(attempt, response)
+                if attempt == retries or not _time_left(expires, delay):
+                    raise
+                logging.warning(f"{method} {url} failed ({e}); retry {attempt + 1}/{retries}")
+            except Exception:
+                # Not worth retrying, but it must still settle a half-open breaker's trial call
+                breaker.record_failure()
+                raise
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    breaker.record_success()
+                    return response
+                breaker.record_failure()
+                delay = self._delay(attempt, response)
+                if attempt == retries or not _time_left(expires, delay):
+                    return response
+                logging.warning(f"{method} {url} returned {response.status_code}; retry {attempt + 1}/{retries}")
+            time.sleep(delay)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+_client: Optional[HTTPClient] = None
+_client_lock = threading.Lock()
+
+def get_client() -> HTTPClient:
+    """Process-wide shared client"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = HTTPClient()
+    return _client
+
+def get(url: str, **kwargs) -> requests.Response:
+    return get_client().get(url, **kwargs)
+
+def post(url: str, **kwargs) -> requests.Response:
+    return get_client().post(url, **kwargs)
@@ -0,0 +1,93 @@
+"""
+JSON serialisation used by the API and the data files.
+orjson is used when it is installed and the standard library otherwise, so
+callers get the same output either way. Machine-read files are written
+compact; files people read or diff (mp_database.json) can ask for indent.
+"""
+import os
+import json
+import logging
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Optional
+
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional: fall back to the standard library
+    orjson = None
+
+BACKEND = "orjson" if orjson else "json"
+
+def _default(value: Any) -> Any:
+    """Types neither backend serialises natively"""
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if hasattr(value, "__html__"):
+        return str(value.__html__())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps_bytes(value: Any, indent: bool = False) -> bytes:
+    """Serialise to UTF-8 JSON bytes"""
+    if orjson:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(value, default=_default, option=option)
+    return dumps(value, indent).encode('utf-8')
+
+def dumps(value: Any, indent: bool = False) -> str:
+    """Serialise to a JSON string (compact unless indent is set)"""
+    if orjson:
+        return dumps_bytes(value, indent).decode('utf-8')
+    if indent:
+        return json.dumps(value, default=_default, ensure_ascii=False, indent=2)
+    return json.dumps(value, default=_default, ensure_ascii=False, separators=(',', ':'))
+
+def loads(data: Any) -> Any:
+    """Parse JSON from str or bytes"""
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def load_file(path: str, default: Any = None) -> Any:
+    """Read a JSON file, returning default if it is missing or malformed"""
+    try:
+        with open(path, 'rb') as f:
+            return loads(f.read())
+    except FileNotFoundError:
+        return default
+    except ValueError as e:
+        logging.warning(f"Could not parse {path}: {e}")
+        return default
+
+def dump_file(path: str, value: Any, indent: bool = False, fsync: bool = False) -> None:
+    """Write a JSON file atomically via a temp file and rename"""
+    temp_path = path + ".tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(dumps_bytes(value, indent))
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+class FastJSONProvider(JSONProvider):
+    """Flask JSON provider backed by dumps/loads above"""
+    mimetype = "application/json"
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return dumps(obj)
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        return loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps_bytes(obj), mimetype=self.mimetype)
+
+def init_app(app, provider_class: Optional[type] = None) -> None:
+    """Serve app's jsonify responses through FastJSONProvider"""
+    app.json = (provider_class or FastJSONProvider)(app)
@@ -0,0 +1,232 @@
+"""
+Two-tier cache for MP and constituency lookups.
+Each cache keeps a bounded in-process TTL/LRU tier and can sit on a shared
+SQLite tier, so several workers (or successive runs of a CLI) reuse each
+other's lookups. Failed lookups such as unknown postcodes are cached
+separately with a shorter TTL, and every cache counts its hits and misses.
+
+The shared tier is enabled for every cache created by make_cache when the
+GOVWHIZ_CACHE_DB environment variable names a SQLite file; command-line
+tools pass a default file so their lookups persist between runs anyway.
+"""
+import os
+import time
+import sqlite3
+import logging
+import threading
+from typing import Any, Dict, NamedTuple, Optional
+
+from cachetools import TTLCache
+
+import json_io
+
+SHARED_CACHE_ENV = "GOVWHIZ_CACHE_DB"
+# Used by command-line tools when GOVWHIZ_CACHE_DB is not set
+DEFAULT_CACHE_DB = "data/lookup_cache.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    negative INTEGER NOT NULL DEFAULT 0,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS cache_entries_expiry ON cache_entries (expires_at);
+"""
+
+class CacheEntry(NamedTuple):
+    value: Any
+    negative: bool
+
+class SQLiteCacheTier:
+    """Cache entries shared between processes through one SQLite file.
+
+    Expired entries are deleted when the tier is opened and after every
+    purge_interval writes, so the file does not grow without bound.
+    """
+    def __init__(self, path: str, purge_interval: int = 1000):
+        self.path = path
+        self.purge_interval = purge_interval
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+        self._conn().executescript(SCHEMA)
+        self.purge_expired()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, namespace: str, key: str) -> Optional[CacheEntry]:
+        """Return the entry if it has not expired"""
+        row = self._conn().execute(
+            "SELECT value, negative, expires_at FROM cache_entries WHERE namespace = ? AND key = ?",
+            (namespace, key)).fetchone()
+        if row is None or row[2] <= time.time():
+            return None
+        return CacheEntry(json_io.loads(row[0]), bool(row[1]))
+
+    def set(self, namespace: str, key: str, value: Any, negative: bool, ttl: float) -> None:
+        self._conn().execute(
+            "INSERT OR REPLACE INTO cache_entries (namespace, key, value, negative, expires_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (namespace, key, json_io.dumps(value), int(negative), time.time() + ttl))
+        with self._writes_lock:
+            self._writes += 1
+            due = self._writes % self.purge_interval == 0
+        if due:
+            self.purge_expired()
+
+    def delete(self, namespace: str, key: str) -> None:
+        self._conn().execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def clear(self, namespace: str) -> None:
+        self._conn().execute("DELETE FROM cache_entries WHERE namespace = ?", (namespace,))
+
+    def purge_expired(self) -> int:
+        """Delete expired entries and return how many were removed"""
+        purged = self._conn().execute("DELETE FROM cache_entries WHERE expires_at <= ?", (time.time(),)).rowcount
+        if purged:
+            logging.info(f"Purged {purged} expired entries from {self.path}")
+        return purged
+
+class LookupCache:
+    def __init__(self, name: str, maxsize: int = 1024, ttl: float = 3600, negative_ttl: float = 300,
+                 shared: Optional[SQLiteCacheTier] = None):
+        self.name = name
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.shared = shared
+        self._local = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._negative = TTLCache(maxsize=max(1, maxsize // 4), ttl=negative_ttl)
+        self._lock = threading.Lock()
+        self._metrics = {"local_hits": 0, "shared_hits": 0, "negative_hits": 0, "misses": 0, "sets": 0}
+
+    def __len__(self) -> int:
+        return len(self._local) + len(self._negative)
+
+    def _count(self, metric: str) -> None:
+        with self._lock:
+            self._metrics[metric] += 1
+
+    def lookup(self, key: str) -> Optional[CacheEntry]:
+        """Find key in the local tier, then the shared tier; None on a miss"""
+        with self._lock:
+            if key in self._local:
+                self._metrics["local_hits"] += 1
+                return CacheEntry(self._local[key], False)
+            if key in self._negative:
+                self._metrics["negative_hits"] += 1
+                return CacheEntry(self._negative[key], True)
+
+        if self.shared is not None:
+            try:
+                entry = self.shared.get(self.name, key)
+            except sqlite3.Error as e:
+                logging.error(f"Shared cache read failed for {self.name}: {e}")
+                entry = None
+            if entry is not None:
+                with self._lock:
+                    (self._negative if entry.negative else self._local)[key] = entry.value
+                self._count("negative_hits" if entry.negative else "shared_hits")
+                return entry
+
+        self._count("misses")
+        return None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Cached value for key, or default on a miss or a cached failure"""
+        entry = self.lookup(key)
+        if entry is None or entry.negative:
+            return default
+        return entry.value
+
+    def _store(self, key: str, value: Any, negative: bool) -> None:
+        with self._lock:
+            if negative:
+                self._local.pop(key, None)
+                self._negative[key] = value
+            else:
+                self._negative.pop(key, None)
+                self._local[key] = value
+            self._metrics["sets"] += 1
+        if self.shared is not None:
+            try:
+                self.shared.set(self.name, key, value, negative, self.negative_ttl if negative else self.ttl)
+            except sqlite3.Error as e:
+                logging.error(f"Shared cache write failed for {self.name}: {e}")
+
+    def set(self, key: str, value: Any) -> None:
+        self._store(key, value, False)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self.set(key, value)
+
+    def set_negative(self, key: str, value: Any = None) -> None:
+        """Remember a failed lookup (e.g. an unknown postcode) for negative_ttl seconds"""
+        self._store(key, value, True)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._local.pop(key, None)
+            self._negative.pop(key, None)
+        if self.shared is not None:
+            self.shared.delete(self.name, key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._local.clear()
+            self._negative.clear()
+        if self.shared is not None:
+            self.shared.clear(self.name)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            metrics = dict(self._metrics)
+            size = len(self._local)
+            negative_size = len(self._negative)
+        hits = metrics["local_hits"] + metrics["shared_hits"] + metrics["negative_hits"]
+        lookups = hits + metrics["misses"]
+        return dict(metrics, hits=hits, hit_rate=round(hits / lookups, 3) if lookups else 0.0,
+                    size=size, negative_size=negative_size, maxsize=self._local.maxsize,
+                    shared=self.shared is not None)
+
+_shared_tiers: Dict[str, SQLiteCacheTier] = {}
+_shared_lock = threading.Lock()
+_caches: Dict[str, LookupCache] = {}
+
+def shared_tier(default_path: Optional[str] = None) -> Optional[SQLiteCacheTier]:
+    """The process-wide shared tier named by GOVWHIZ_CACHE_DB, else default_path, if either is set"""
+    path = os.environ.get(SHARED_CACHE_ENV) or default_path
+    if not path:
+        return None
+    path = os.path.abspath(path)
+    with _shared_lock:
+        if path not in _shared_tiers:
+            _shared_tiers[path] = SQLiteCacheTier(path)
+        return _shared_tiers[path]
+
+def make_cache(name: str, maxsize: int = 1024, ttl: float = 3600, negative_ttl: float = 300,
+               default_path: Optional[str] = None) -> LookupCache:
+    """Create a named cache on the shared tier and register it for cache_stats.
+
+    The tier is GOVWHIZ_CACHE_DB's file, or default_path when that is unset;
+    with neither the cache is in-process only.
+    """
+    cache = LookupCache(name, maxsize, ttl, negative_ttl, shared_tier(default_path))
+    _caches[name] = cache
+    return cache
+
+def cache_stats() -> Dict[str, Dict]:
+    """Hit/miss metrics for every cache created with make_cache"""
+    return {name: cache.stats() for name, cache in _caches.items()}
@@ -13,9 +13,12 @@ import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from mp_lookup_service import MPLookupService
+import json_io
+from lookup_cache import cache_stats
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
+json_io.init_app(app)
 
 # Initialize the MP lookup service
 mp_service = MPLookupService()
@@ -63,7 +66,7 @@ def health_check():
     """
     Health check endpoint
     """
-    return jsonify({"status": "healthy", "service": "MP Lookup API"})
+    return jsonify({"status": "healthy", "service": "MP Lookup API", "cache": cache_stats()})
 
 @app.route('/')
 def index():
@@ -0,0 +1,306 @@
+"""
+Compiled, memory-mapped MP dataset.
+
+One versioned file holds the MP records and postcode tables that used to be
+spread across members.json, cleaned_mps.json, constituency_lookup.json and
+mp_database.json. Every string is stored once in an interned table and
+records refer to it by id, so the file is compact, loads without JSON
+parsing and its pages are shared by every worker that maps it. Lookups
+binary search the mapped sections and decode only the strings they touch.
+
+File layout (little endian):
+    header     magic "GWMD", format version (H), MP field count (H), meta length (I)
+    meta       UTF-8 JSON: dataset version, build time, sources and section counts
+    strings    count + 1 offsets (I) into the UTF-8 blob that follows
+    mps        mp count x (MP field string ids (I...), extra fields string id (I), member id (I),
+               constituency id (I)), sorted by constituency
+    districts  district count x (4-byte outward code, constituency string id (I)), sorted
+    exact      exact count x (7-byte postcode key, constituency string id (I)), sorted
+    sectors    sector count x (5-byte sector key, constituency string id (I)), sorted
+    splits     split count x 4-byte outward code, sorted
+"""
+import os
+import mmap
+import json
+import struct
+import hashlib
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from postcode_index import postcode_key
+
+MAGIC = b"GWMD"
+FORMAT_VERSION = 2
+HEADER = struct.Struct('<4sHHI')
+
+# String fields of an MP record, in record order
+MP_FIELDS = ("constituency", "name", "party", "party_abbreviation", "email", "phone",
+             "profile_url", "thumbnail_url", "gender", "membership_start", "status")
+# Numeric ids are packed into the record; anything else is kept with the extra fields
+MP_IDS = ("id", "constituency_id")
+MP_RECORD = struct.Struct(f'<{len(MP_FIELDS)}IIII')
+DISTRICT_RECORD = struct.Struct('<4sI')
+EXACT_RECORD = struct.Struct('<7sI')
+SECTOR_RECORD = struct.Struct('<5sI')
+SPLIT_RECORD = struct.Struct('<4s')
+OFFSET = struct.Struct('<I')
+
+def district_key(district: str) -> Optional[bytes]:
+    """Pack an outward code into its 4-byte key ("M1" -> b"M1  ")"""
+    outward = ''.join((district or '').split()).upper()
+    if not 2 <= len(outward) <= 4:
+        return None
+    try:
+        return f"{outward:<4}".encode('ascii')
+    except UnicodeEncodeError:
+        return None
+
+def sector_key(sector: str) -> Optional[bytes]:
+    """Pack a postcode sector into its 5-byte key ("M1 1" -> b"M1  1")"""
+    compact = ''.join((sector or '').split()).upper()
+    outward = district_key(compact[:-1])
+    if outward is None or not compact[-1:].isdigit():
+        return None
+    return outward + compact[-1].encode('ascii')
+
+def _packed_id(value) -> Optional[int]:
+    """An id that fits the record's unsigned field, or None"""
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        return None
+    return number if 0 <= number < 2 ** 32 else None
+
+def _extra_fields(mp: Dict) -> Dict:
+    """Fields the fixed record cannot hold: unknown keys, non-string values and non-numeric ids"""
+    extra = {}
+    for field, value in mp.items():
+        if field in MP_IDS:
+            if value not in (None, "") and _packed_id(value) is None:
+                extra[field] = value
+        elif field not in MP_FIELDS or (value is not None and not isinstance(value, str)):
+            extra[field] = value
+    return extra
+
+def _unpack_key(key: bytes) -> str:
+    """Inverse of the key packers: b"M1  1AA" -> "M1 1AA", b"M1  " -> "M1" """
+    text = key.decode('ascii')
+    outward = text[:4].strip()
+    return f"{outward} {text[4:]}" if len(text) > 4 else outward
+
+class _StringTable:
+    def __init__(self):
+        self.strings: List[str] = []
+        self.ids: Dict[str, int] = {}
+
+    def intern(self, value) -> int:
+        value = "" if value is None else str(value)
+        if value not in self.ids:
+            self.ids[value] = len(self.strings)
+            self.strings.append(value)
+        return self.ids[value]
+
+    def pack(self) -> bytes:
+        encoded = [s.encode('utf-8') for s in self.strings]
+        offsets = [0]
+        for item in encoded:
+            offsets.append(offsets[-1] + len(item))
+        return struct.pack(f'<{len(offsets)}I', *offsets) + b"".join(encoded)
+
+def write_dataset(path: str, mps: Iterable[Dict], postcode_map: Dict[str, str],
+                  exact_map: Optional[Dict[str, str]] = None, sector_map: Optional[Dict[str, str]] = None,
+                  split_districts: Iterable[str] = (), sources: Optional[Dict] = None) -> Dict:
+    """Compile MP records and postcode tables into the dataset file and return its meta"""
+    strings = _StringTable()
+    # One record per constituency (the last one given wins), sorted for binary search
+    by_constituency = {mp["constituency"]: mp for mp in mps if mp.get("constituency")}
+    mp_records = []
+    for constituency in sorted(by_constituency):
+        mp = by_constituency[constituency]
+        extra = _extra_fields(mp)
+        mp_records.append(MP_RECORD.pack(
+            *(strings.intern(mp.get(field)) for field in MP_FIELDS),
+            strings.intern(json.dumps(extra, ensure_ascii=False, separators=(',', ':')) if extra else ""),
+            *(_packed_id(mp.get(field)) or 0 for field in MP_IDS)))
+
+    def packed(table: Optional[Dict[str, str]], pack_key, record: struct.Struct) -> List[bytes]:
+        keyed = {}
+        for key, name in (table or {}).items():
+            packed_key = pack_key(key)
+            if packed_key is not None and name:
+                keyed[packed_key] = strings.intern(name)
+        return [record.pack(key, name_id) for key, name_id in sorted(keyed.items())]
+
+    districts = packed(postcode_map, district_key, DISTRICT_RECORD)
+    exact = packed(exact_map, postcode_key, EXACT_RECORD)
+    sectors = packed(sector_map, sector_key, SECTOR_RECORD)
+    splits = sorted({SPLIT_RECORD.pack(key) for key in map(district_key, split_districts) if key})
+
+    body = strings.pack() + b"".join(mp_records + districts + exact + sectors + splits)
+    meta = {
+        "version": hashlib.sha256(body).hexdigest()[:12],
+        "built_at": datetime.now().isoformat(timespec='seconds'),
+        "sources": sources or {},
+        "counts": {
+            "strings": len(strings.strings),
+            "mps": len(mp_records),
+            "districts": len(districts),
+            "exact": len(exact),
+            "sectors": len(sectors),
+            "splits": len(splits)
+        }
+    }
+    encoded_meta = json.dumps(meta, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    temp_path = path + ".tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(MP_FIELDS), len(encoded_meta)))
+        f.write(encoded_meta)
+        f.write(body)
+    os.replace(temp_path, path)
+    return meta
+
+class MPDataset:
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            self._read_sections()
+        except (ValueError, KeyError, TypeError, struct.error) as e:
+            self._mm.close()
+            raise ValueError(f"{path} is not a valid version {FORMAT_VERSION} MP dataset: {e}") from e
+
+        counts = self.meta["counts"]
+        logging.info(f"Mapped MP dataset {path} (version {self.version}): {counts['mps']} MPs, "
+                     f"{counts['districts']} districts")
+
+    def _read_sections(self) -> None:
+        """Read the header and meta and check every section fits the file exactly"""
+        size = len(self._mm)
+        if size < HEADER.size:
+            raise ValueError("file is shorter than its header")
+        magic, version, field_count, meta_length = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != FORMAT_VERSION or field_count != len(MP_FIELDS):
+            raise ValueError("bad magic, version or field count")
+        if HEADER.size + meta_length > size:
+            raise ValueError("meta runs past the end of the file")
+        self.meta = json.loads(self._mm[HEADER.size:HEADER.size + meta_length].decode('utf-8'))
+        counts = self.meta["counts"]
+
+        offset = HEADER.size + meta_length
+        self._strings_start = offset + OFFSET.size * (counts["strings"] + 1)
+        if self._strings_start > size:
+            raise ValueError("string offsets run past the end of the file")
+        self._string_offsets = struct.unpack_from(f'<{counts["strings"] + 1}I', self._mm, offset)
+        self._strings: List[Optional[str]] = [None] * counts["strings"]
+        offset = self._strings_start + self._string_offsets[-1]
+
+        # Section start offsets, in file order
+        self._sections: Dict[str, Tuple[int, int, struct.Struct]] = {}
+        for section, record in (("mps", MP_RECORD), ("districts", DISTRICT_RECORD), ("exact", EXACT_RECORD),
+                                ("sectors", SECTOR_RECORD), ("splits", SPLIT_RECORD)):
+            self._sections[section] = (offset, counts[section], record)
+            offset += counts[section] * record.size
+        if offset != size:
+            raise ValueError(f"sections end at byte {offset} but the file has {size}")
+
+    @property
+    def version(self) -> str:
+        return self.meta["version"]
+
+    def string(self, string_id: int) -> str:
+        """Decode an interned string once and reuse it"""
+        value = self._strings[string_id]
+        if value is None:
+            start = self._strings_start + self._string_offsets[string_id]
+            end = self._strings_start + self._string_offsets[string_id + 1]
+            value = self._strings[string_id] = self._mm[start:end].decode('utf-8')
+        return value
+
+    def _records(self, section: str) -> Iterator[Tuple]:
+        start, count, record = self._sections[section]
+        for index in range(count):
+            yield record.unpack_from(self._mm, start + index * record.size)
+
+    def _mp(self, values: Tuple) -> Dict:
+        mp = {field: self.string(string_id) for field, string_id in zip(MP_FIELDS, values)}
+        mp["id"], mp["constituency_id"] = values[-2:]
+        extra = self.string(values[len(MP_FIELDS)])
+        if extra:
+            mp.update(json.loads(extra))
+        return mp
+
+    def mps(self) -> Iterator[Dict]:
+        """MP records ordered by constituency"""
+        for values in self._records("mps"):
+            yield self._mp(values)
+
+    def get_mp(self, constituency: str) -> Optional[Dict]:
+        """Binary search the MP records by constituency name"""
+        start, count, record = self._sections["mps"]
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            values = record.unpack_from(self._mm, start + mid * record.size)
+            name = self.string(values[0])
+            if name == constituency:
+                return self._mp(values)
+            if name < constituency:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+    def constituencies(self) -> List[str]:
+        """Constituency names with an MP record, in order"""
+        return [self.string(values[0]) for values in self._records("mps")]
+
+    def _table(self, section: str) -> Iterator[Tuple[str, str]]:
+        for key, name_id in self._records(section):
+            yield _unpack_key(key), self.string(name_id)
+
+    def districts(self) -> Iterator[Tuple[str, str]]:
+        """(outward code, constituency) pairs"""
+        return self._table("districts")
+
+    def exact_postcodes(self) -> Iterator[Tuple[str, str]]:
+        """(postcode, constituency) pairs"""
+        return self._table("exact")
+
+    def sectors(self) -> Iterator[Tuple[str, str]]:
+        """(sector, constituency) pairs"""
+        return self._table("sectors")
+
+    def split_districts(self) -> List[str]:
+        return [_unpack_key(key) for (key,) in self._records("splits")]
+
+    def _search(self, section: str, key: Optional[bytes]) -> Optional[int]:
+        """Binary search a sorted keyed table for the string id stored against key"""
+        start, count, record = self._sections[section]
+        lo, hi = 0, count
+        while key is not None and lo < hi:
+            mid = (lo + hi) // 2
+            mid_key, name_id = record.unpack_from(self._mm, start + mid * record.size)
+            if mid_key == key:
+                return name_id
+            if mid_key < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+    def _lookup(self, section: str, key: Optional[bytes]) -> Optional[str]:
+        name_id = self._search(section, key)
+        return None if name_id is None else self.string(name_id)
+
+    def lookup_district(self, district: str) -> Optional[str]:
+        return self._lookup("districts", district_key(district))
+
+    def lookup_exact(self, postcode: str) -> Optional[str]:
+        return self._lookup("exact", postcode_key(postcode))
+
+    def close(self) -> None:
+        self._mm.close()
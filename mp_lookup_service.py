@@ -11,6 +11,7 @@ from urllib.parse import urljoin, quote_plus
 from datetime import datetime, timedelta
 from typing import Dict, Optional, Tuple
 import logging
+from lookup_cache import make_cache
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -21,6 +22,9 @@ class MPLookupService:
         self.config_path = config_path
         self.validate_regex = re.compile(r'^[A-Z]{1,2}[0-9][A-Z0-9]?\s?[0-9][A-Z]{2}$', re.IGNORECASE)
         self.cache_duration = timedelta(hours=1)
+        # Lookups are cached in a bounded TTL cache rather than in the database file
+        self.cache = make_cache("mp_lookup_service", maxsize=4096,
+                                ttl=self.cache_duration.total_seconds(), negative_ttl=600)
         self.load_config()
         self.load_database()
         
@@ -44,13 +48,14 @@ class MPLookupService:
             if os.path.exists(self.db_path):
                 with open(self.db_path, 'r') as f:
                     self.db = json.load(f)
+                # Older databases carried an ever-growing cache section; drop it on the next save
+                self.db.pop("cache", None)
             else:
                 self.db = {
                     "version": "2024.1",
                     "last_updated": datetime.now().isoformat(),
                     "constituencies": {},
-                    "postcode_map": {},
-                    "cache": {}
+                    "postcode_map": {}
                 }
                 self.save_database()
         except Exception as e:
@@ -59,8 +64,7 @@ class MPLookupService:
                 "version": "2024.1",
                 "last_updated": datetime.now().isoformat(),
                 "constituencies": {},
-                "postcode_map": {},
-                "cache": {}
+                "postcode_map": {}
             }
 
     def save_database(self):
@@ -78,24 +82,18 @@ class MPLookupService:
 
     def validate_postcode(self, postcode: str) -> bool:
         """Validate postcode format"""
-        return bool(self.validate_regex.match(postcode))    def get_from_cache(self, key: str) -> Tuple[bool, Optional[dict]]:
+        return bool(self.validate_regex.match(postcode))
+
+    def get_from_cache(self, key: str) -> Tuple[bool, Optional[dict]]:
         """Get data from cache if not expired"""
-        cache = self.db.get('cache', {})
-        if key in cache:
-            data = cache[key]
-            if datetime.fromisoformat(data['timestamp']) + self.cache_duration > datetime.now():
-                return True, data['data']
-        return False, None
+        entry = self.cache.lookup(key)
+        if entry is None:
+            return False, None
+        return True, entry.value
 
     def save_to_cache(self, key: str, data: dict):
-        """Save data to cache with timestamp"""
-        if 'cache' not in self.db:
-            self.db['cache'] = {}
-        self.db['cache'][key] = {
-            'data': data,
-            'timestamp': datetime.now().isoformat()
-        }
-        self.save_database()
+        """Save data to cache"""
+        self.cache.set(key, data)
 
     def validate_mp_data(self, data: dict) -> Tuple[bool, Optional[str]]:
         """Validate MP data structure and required fields
@@ -126,17 +124,24 @@ class MPLookupService:
         """Get constituency information from PostcodesIO API"""
         try:
             cache_key = f"postcode_{postcode}"
-            cached = self.get_from_cache(cache_key)
-            if cached:
-                return True, cached
+            entry = self.cache.lookup(cache_key)
+            if entry is not None:
+                return not entry.negative, entry.value
 
             response = requests.get(f"{self.postcodes_api_url}{quote_plus(postcode)}")
+            if response.status_code == 404:
+                # Remember unknown postcodes so repeated requests don't reach the API
+                error = {"error": "Postcode not found"}
+                self.cache.set_negative(cache_key, error)
+                return False, error
             if response.status_code != 200:
                 return False, {"error": "Postcode lookup failed"}
 
             data = response.json()
             if not data.get('result') or not data['result'].get('parliamentary_constituency'):
-                return False, {"error": "No constituency found for this postcode"}
+                error = {"error": "No constituency found for this postcode"}
+                self.cache.set_negative(cache_key, error)
+                return False, error
 
             result = {
                 "constituency": data['result']['parliamentary_constituency'],
@@ -285,8 +290,7 @@ class MPLookupService:
 
     def clear_cache(self):
         """Clear all cached data"""
-        self.db['cache'] = {}
-        self.save_database()
+        self.cache.clear()
 
     def test_lookup(self, postcode="SW1A 0AA"):
         """Test the MP lookup functionality"""
@@ -0,0 +1,195 @@
+"""
+Asynchronous postcode -> constituency -> MP -> news pipeline.
+Independent steps run concurrently on one aiohttp session, each under its
+own deadline, so a combined lookup takes as long as its slowest part
+rather than the sum of all of them. A step that misses its deadline is
+reported in "partial" instead of failing the whole lookup.
+
+Synchronous callers share one event loop on a background thread and one
+long-lived session on it, so keep-alive connections and DNS results are
+reused across requests instead of being rebuilt for each one.
+"""
+import time
+import asyncio
+import logging
+import threading
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import aiohttp
+
+from postcode_resolver import normalise_postcode
+
+POSTCODES_IO_URL = "https://api.postcodes.io/postcodes/"
+CONSTITUENCY_SEARCH_URL = "https://members-api.parliament.uk/api/Location/Constituency/Search"
+
+DEFAULT_DEADLINES = {
+    "constituency": 3.0,
+    "mp": 5.0,
+    "guardian": 6.0,
+    "bbc": 6.0
+}
+
+class MPLookupPipeline:
+    def __init__(self, resolver=None, news=None, deadlines: Optional[Dict[str, float]] = None,
+                 max_connections: int = 10):
+        self.resolver = resolver
+        self.news = news
+        self.deadlines = dict(DEFAULT_DEADLINES, **(deadlines or {}))
+        self.max_connections = max_connections
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._lock = threading.Lock()
+
+    def _new_session(self) -> aiohttp.ClientSession:
+        return aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.max_connections))
+
+    async def _with_deadline(self, step: str, coro, default, timings: Dict[str, int], partial: List[str]):
+        """Await coro within the step's deadline, falling back to default"""
+        start = time.monotonic()
+        try:
+            return await asyncio.wait_for(coro, self.deadlines[step])
+        except asyncio.TimeoutError:
+            logging.warning(f"MP lookup step '{step}' missed its {self.deadlines[step]}s deadline")
+            partial.append(step)
+            return default
+        except Exception as e:
+            logging.error(f"MP lookup step '{step}' failed: {e}")
+            partial.append(step)
+            return default
+        finally:
+            timings[step] = int((time.monotonic() - start) * 1000)
+
+    async def resolve_constituency(self, session: aiohttp.ClientSession, postcode: str) -> Optional[str]:
+        """Resolve from the local tables, falling back to postcodes.io"""
+        if self.resolver is not None:
+            constituency = self.resolver.resolve(postcode)
+            if constituency:
+                return constituency
+
+        async with session.get(POSTCODES_IO_URL + normalise_postcode(postcode)) as response:
+            if response.status != 200:
+                return None
+            data = await response.json()
+        return (data.get("result") or {}).get("parliamentary_constituency")
+
+    async def fetch_mp_details(self, session: aiohttp.ClientSession, constituency: str) -> Optional[Dict]:
+        """Current MP for a constituency from the Parliament Members API"""
+        params = {"searchText": constituency, "skip": "0", "take": "1"}
+        async with session.get(CONSTITUENCY_SEARCH_URL, params=params) as response:
+            if response.status != 200:
+                return None
+            data = await response.json()
+
+        if not data.get("items"):
+            return None
+        constituency_data = data["items"][0]["value"]
+        member = ((constituency_data.get("currentRepresentation") or {}).get("member") or {}).get("value")
+        if not member:
+            return None
+        return {
+            "name": member["nameDisplayAs"],
+            "party": (member.get("latestParty") or {}).get("name", "Unknown"),
+            "member_id": str(member["id"]),
+            "constituency": constituency_data.get("name", constituency),
+            "image": member.get("thumbnailUrl", ""),
+            "profile_url": f"https://members.parliament.uk/member/{member['id']}"
+        }
+
+    def _news_steps(self, session: aiohttp.ClientSession, query: str, timings: Dict[str, int],
+                    partial: List[str]) -> List:
+        if self.news is None:
+            return []
+        return [
+            self._with_deadline("guardian", self.news.fetch_guardian_news(query, session=session), [],
+                                timings, partial),
+            self._with_deadline("bbc", self.news.fetch_bbc_news(query, session=session), [],
+                                timings, partial)
+        ]
+
+    async def lookup(self, postcode: str, session: Optional[aiohttp.ClientSession] = None) -> Dict:
+        """Resolve a postcode to its MP with Guardian and BBC news.
+
+        Uses the given session, or a session of its own for this lookup.
+        """
+        if session is None:
+            async with self._new_session() as session:
+                return await self.lookup(postcode, session)
+
+        timings: Dict[str, int] = {}
+        partial: List[str] = []
+        start = time.monotonic()
+        constituency = await self._with_deadline(
+            "constituency", self.resolve_constituency(session, postcode), None, timings, partial)
+        if not constituency:
+            return {"found": False, "error": "Could not find constituency for this postcode",
+                    "postcode": postcode, "timings": timings, "partial": partial}
+
+        local_mp = self.resolver.get_mp(constituency) if self.resolver is not None else None
+        mp_step = self._with_deadline("mp", self.fetch_mp_details(session, constituency), None,
+                                      timings, partial)
+
+        if local_mp:
+            # The local record names the MP, so the live refresh and news run together
+            query = f"{local_mp['name']} {constituency}"
+            mp, *news = await asyncio.gather(mp_step, *self._news_steps(session, query, timings, partial))
+            # Live details win, but fields only the local record has are kept
+            mp = dict(local_mp, **mp) if mp else dict(local_mp)
+        else:
+            mp = await mp_step
+            if not mp:
+                return {"found": False, "error": "No MP found for this constituency",
+                        "postcode": postcode, "constituency": constituency,
+                        "timings": timings, "partial": partial}
+            news = await asyncio.gather(*self._news_steps(session, f"{mp['name']} {constituency}",
+                                                          timings, partial))
+
+        if news:
+            mp["news"] = {"guardian": news[0], "bbc": news[1]}
+        timings["total"] = int((time.monotonic() - start) * 1000)
+        return {
+            "found": True,
+            "postcode": postcode,
+            "constituency": constituency,
+            "mp": mp,
+            "timings": timings,
+            "partial": partial
+        }
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """The background event loop, started on first use"""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="mp-pipeline",
+                                                daemon=True)
+                self._thread.start()
+            return self._loop
+
+    async def _shared_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = self._new_session()
+        return self._session
+
+    def run(self, step: Callable[[aiohttp.ClientSession], Awaitable]):
+        """Run step(session) on the background loop with the shared session and wait for it"""
+        async def call():
+            return await step(await self._shared_session())
+        return asyncio.run_coroutine_threadsafe(call(), self._ensure_loop()).result()
+
+    def lookup_sync(self, postcode: str) -> Dict:
+        """Run lookup on the shared loop and session (for synchronous Flask views)"""
+        return self.run(lambda session: self.lookup(postcode, session))
+
+    def close(self) -> None:
+        """Close the shared session and stop the background loop"""
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        if self._session is not None:
+            asyncio.run_coroutine_threadsafe(self._session.close(), loop).result()
+            self._session = None
+        loop.call_soon_threadsafe(loop.stop)
+        self._thread.join()
+        loop.close()
@@ -4,26 +4,27 @@ Enhanced MP lookup service with comprehensive UK coverage using local data.
 import os
 import json
 import requests
+import http_client
 import re
 from datetime import datetime
 from typing import Dict, Optional, List, Tuple
+from postcode_resolver import PostcodeResolver
+from constituency_search import ConstituencySearchIndex
+from write_behind_cache import WriteBehindCache
 
 class MPLookupService:
     def __init__(self):
-        self.mps_file = "data/cleaned_mps.json"
         self.constituencies_file = "data/constituency_lookup.json"
         self.postcode_cache_file = "data/constituency_cache.json"
         self.mp_database_file = "data/mp_database.json"
         self.api_key = os.getenv('THEYWORKFORYOU_API_KEY', 'your_api_key_here')
         
-        # Load data files
-        self.mps_data = self._load_json(self.mps_file)
-        self.constituency_data = self._load_json(self.constituencies_file)
-        self.postcode_cache = self._load_json(self.postcode_cache_file)
-        self.mp_database = self._load_json(self.mp_database_file)
-        
-        if self.postcode_cache is None:
-            self.postcode_cache = {}
+        # Postcode cache is appended to a log in batches rather than rewritten per miss
+        self.postcode_cache = WriteBehindCache(self.postcode_cache_file)
+
+        # Compiled postcode/constituency tables, shared read-only by all requests
+        self.resolver = PostcodeResolver(self.mp_database_file, self.constituencies_file)
+        self.search_index = self._build_search_index()
 
     def _load_json(self, file_path: str) -> Dict:
         """Load JSON data from file"""
@@ -34,10 +35,18 @@ class MPLookupService:
             return {}
 
     def _save_postcode_cache(self):
-        """Save postcode to constituency mapping cache"""
-        os.makedirs(os.path.dirname(self.postcode_cache_file), exist_ok=True)
-        with open(self.postcode_cache_file, 'w', encoding='utf-8') as f:
-            json.dump(self.postcode_cache, f, indent=2)    def _validate_postcode(self, postcode: str) -> bool:
+        """Persist pending postcode cache entries immediately"""
+        self.postcode_cache.flush()
+
+    def _build_search_index(self) -> ConstituencySearchIndex:
+        return ConstituencySearchIndex(self.resolver.constituencies(), self.resolver.get_mp)
+
+    def reload(self):
+        """Reload the local postcode and constituency data from disk"""
+        self.resolver.reload()
+        self.search_index = self._build_search_index()
+
+    def _validate_postcode(self, postcode: str) -> bool:
         """Validate UK postcode format"""
         # UK postcode regex pattern
         pattern = r'^[A-Z]{1,2}[0-9][A-Z0-9]? ?[0-9][A-Z]{2}$'
@@ -51,44 +60,26 @@ class MPLookupService:
         if postcode in self.postcode_cache:
             return self.postcode_cache[postcode]["constituency"]
 
-        # Load the postcode mapping database
-        try:
-            with open("data/mp_database.json", 'r', encoding='utf-8') as f:
-                mp_db = json.load(f)
-                postcode_map = mp_db.get("postcode_map", {})
-        except (FileNotFoundError, json.JSONDecodeError):
-            postcode_map = {}
-
-        # Extract district from full postcode (e.g., "SW1A 1AA" -> "SW1A")
-        district = postcode.split()[0] if ' ' in postcode else postcode[:4].rstrip()
-        
-        # Check if we have the district in our local database
-        if district in postcode_map:
-            constituency = postcode_map[district]
-            # Cache the result
-            self.postcode_cache[postcode] = {
-                "constituency": constituency,
-                "timestamp": datetime.now().isoformat()
-            }
-            self._save_postcode_cache()
+        # Resolve from the compiled local tables (exact postcode, then district)
+        constituency = self.resolver.resolve(postcode)
+        if constituency:
             return constituency
 
         # Fallback to API if district not found
         try:
             url = f"https://api.postcodes.io/postcodes/{postcode.replace(' ', '')}"
-            response = requests.get(url, timeout=5)
+            response = http_client.get(url, retries=1, deadline=http_client.INTERACTIVE_DEADLINE)
             response.raise_for_status()
             data = response.json()
 
             if data["status"] == 200 and "result" in data:
                 constituency = data["result"]["parliamentary_constituency"]
                 
-                # Cache the result
-                self.postcode_cache[postcode] = {
+                # Cache the result (written behind to the append log)
+                self.postcode_cache.set(postcode, {
                     "constituency": constituency,
                     "timestamp": datetime.now().isoformat()
-                }
-                self._save_postcode_cache()
+                })
                 
                 return constituency
 
@@ -118,7 +109,7 @@ class MPLookupService:
             }
 
         # Look up MP data from our local constituency data
-        constituency_info = self.constituency_data.get("constituencies", {}).get(constituency)
+        constituency_info = self.resolver.get_mp(constituency)
         if not constituency_info:
             return {
                 "found": False,
@@ -142,13 +133,15 @@ class MPLookupService:
 
     def get_all_constituencies(self) -> List[str]:
         """Get a list of all constituencies"""
-        return list(self.constituency_data.get("constituencies", {}).keys())
+        return self.resolver.constituencies()
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Dict]:
+        """Ranked constituency matches with a summary of each MP"""
+        return self.search_index.search(query, limit)
 
-    def search_constituencies(self, query: str) -> List[str]:
-        """Search constituencies by name"""
-        query = query.lower()
-        all_constituencies = self.get_all_constituencies()
-        return [c for c in all_constituencies if query in c.lower()]
+    def search_constituencies(self, query: str, limit: Optional[int] = None) -> List[str]:
+        """Search constituencies by name, best match first"""
+        return [result["constituency"] for result in self.search(query, limit)]
 
 # Create a singleton instance
 mp_service = MPLookupService()
@@ -0,0 +1,310 @@
+"""
+SQLite-backed store for the automated MP updater.
+Runs in WAL mode so request threads and other workers can read while the
+updater writes, and every change is a single-row upsert instead of a
+rewrite of the whole JSON database.
+"""
+import os
+import json
+import hashlib
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS constituencies (
+    name TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    last_updated TEXT,
+    content_hash TEXT,
+    checked_at TEXT
+);
+CREATE TABLE IF NOT EXISTS postcode_patterns (
+    pattern TEXT NOT NULL,
+    constituency TEXT NOT NULL,
+    PRIMARY KEY (pattern, constituency)
+);
+CREATE INDEX IF NOT EXISTS idx_patterns_constituency ON postcode_patterns (constituency);
+CREATE TABLE IF NOT EXISTS update_status (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS http_validators (
+    key TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    content_hash TEXT,
+    body TEXT,
+    checked_at TEXT
+);
+"""
+
+# Columns added after the first release of the schema
+MIGRATIONS = {
+    "constituencies": (("content_hash", "TEXT"), ("checked_at", "TEXT")),
+}
+
+# Volatile fields left out of the content hash
+UNHASHED_FIELDS = ("last_updated",)
+
+def content_hash(data) -> str:
+    """Stable hash of a JSON-serialisable value"""
+    if isinstance(data, dict):
+        data = {key: value for key, value in data.items() if key not in UNHASHED_FIELDS}
+    encoded = json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+DEFAULT_STATUS = {
+    "last_full_update": None,
+    "failed_constituencies": [],
+    "last_error": None
+}
+
+class MPDatabaseStore:
+    def __init__(self, db_path: str = "data/mp_database.db"):
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # sqlite3 connections must stay on the thread that created them
+        self._local = threading.local()
+        # executescript manages its own transaction
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self) -> None:
+        """Add columns missing from databases created by older versions"""
+        for table, columns in MIGRATIONS.items():
+            existing = {row[1] for row in self.conn.execute(f"PRAGMA table_info({table})")}
+            for column, column_type in columns:
+                if column not in existing:
+                    self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def transaction(self):
+        """Context manager for an immediate write transaction"""
+        return _Transaction(self.conn)
+
+    # Constituencies
+
+    def get_constituency(self, name: str) -> Optional[Dict]:
+        row = self.conn.execute("SELECT data FROM constituencies WHERE name = ?", (name,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def upsert_constituency(self, name: str, mp_info: Dict) -> None:
+        self.upsert_constituencies({name: mp_info})
+
+    def upsert_constituencies(self, records: Dict[str, Dict]) -> None:
+        """Insert or replace several MP records in one transaction"""
+        now = datetime.now().isoformat()
+        rows = [
+            (name, json.dumps(mp_info, ensure_ascii=False), mp_info.get("last_updated"), content_hash(mp_info), now)
+            for name, mp_info in records.items()
+        ]
+        with self.transaction() as conn:
+            conn.executemany(
+                "INSERT INTO constituencies (name, data, last_updated, content_hash, checked_at) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET data = excluded.data, last_updated = excluded.last_updated, "
+                "content_hash = excluded.content_hash, checked_at = excluded.checked_at",
+                rows
+            )
+
+    def sync_constituency(self, name: str, mp_info: Dict) -> Optional[Dict]:
+        """Write mp_info only if its content changed.
+
+        Returns a diff entry ({"constituency", "change", "fields"}) for a new or
+        changed record, or None when the stored record is identical, in which
+        case only its checked_at time is bumped.
+        """
+        new_hash = content_hash(mp_info)
+        now = datetime.now().isoformat()
+        with self.transaction() as conn:
+            row = conn.execute("SELECT data, content_hash FROM constituencies WHERE name = ?", (name,)).fetchone()
+            if row and row[1] == new_hash:
+                conn.execute("UPDATE constituencies SET checked_at = ? WHERE name = ?", (now, name))
+                return None
+            conn.execute(
+                "INSERT INTO constituencies (name, data, last_updated, content_hash, checked_at) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET data = excluded.data, last_updated = excluded.last_updated, "
+                "content_hash = excluded.content_hash, checked_at = excluded.checked_at",
+                (name, json.dumps(mp_info, ensure_ascii=False), mp_info.get("last_updated"), new_hash, now)
+            )
+
+        if not row:
+            return {"constituency": name, "change": "added", "fields": sorted(mp_info)}
+        old_info = json.loads(row[0])
+        fields = sorted(
+            key for key in set(old_info) | set(mp_info)
+            if key not in UNHASHED_FIELDS and old_info.get(key) != mp_info.get(key)
+        )
+        return {"constituency": name, "change": "updated", "fields": fields}
+
+    def mark_checked(self, name: str) -> None:
+        with self.transaction() as conn:
+            conn.execute("UPDATE constituencies SET checked_at = ? WHERE name = ?",
+                         (datetime.now().isoformat(), name))
+
+    def checked_at(self, name: str) -> Optional[str]:
+        """When the record was last fetched or revalidated"""
+        row = self.conn.execute(
+            "SELECT COALESCE(checked_at, last_updated) FROM constituencies WHERE name = ?", (name,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def constituency_names(self) -> List[str]:
+        return [row[0] for row in self.conn.execute("SELECT name FROM constituencies ORDER BY name")]
+
+    def all_constituencies(self) -> Dict[str, Dict]:
+        return {name: json.loads(data) for name, data in self.conn.execute("SELECT name, data FROM constituencies")}
+
+    def constituency_count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM constituencies").fetchone()[0]
+
+    # Postcode patterns
+
+    def add_pattern(self, pattern: str, constituency: str) -> bool:
+        """Record a pattern mapping; returns False if it was already known"""
+        with self.transaction() as conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO postcode_patterns (pattern, constituency) VALUES (?, ?)",
+                (pattern, constituency)
+            )
+        return cursor.rowcount > 0
+
+    def iter_patterns(self) -> Iterator[Tuple[str, str]]:
+        return iter(self.conn.execute("SELECT pattern, constituency FROM postcode_patterns").fetchall())
+
+    def patterns(self) -> Dict[str, Set[str]]:
+        patterns: Dict[str, Set[str]] = {}
+        for pattern, constituency in self.iter_patterns():
+            patterns.setdefault(pattern, set()).add(constituency)
+        return patterns
+
+    def pattern_count(self) -> int:
+        return self.conn.execute("SELECT COUNT(DISTINCT pattern) FROM postcode_patterns").fetchone()[0]
+
+    # HTTP validators for conditional requests
+
+    def get_validator(self, key: str) -> Optional[Dict]:
+        row = self.conn.execute(
+            "SELECT etag, last_modified, content_hash, body FROM http_validators WHERE key = ?", (key,)
+        ).fetchone()
+        if not row:
+            return None
+        return {"etag": row[0], "last_modified": row[1], "content_hash": row[2], "body": json.loads(row[3])}
+
+    def set_validator(self, key: str, etag: Optional[str], last_modified: Optional[str], body) -> bool:
+        """Store a response's validators and body; returns True if the body changed"""
+        new_hash = content_hash(body)
+        with self.transaction() as conn:
+            row = conn.execute("SELECT content_hash FROM http_validators WHERE key = ?", (key,)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO http_validators (key, etag, last_modified, content_hash, body, checked_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, etag, last_modified, new_hash, json.dumps(body, ensure_ascii=False), datetime.now().isoformat())
+            )
+        return not row or row[0] != new_hash
+
+    def clear_validators(self) -> None:
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM http_validators")
+
+    # Update status and metadata
+
+    def get_status(self) -> Dict:
+        status = dict(DEFAULT_STATUS)
+        for key, value in self.conn.execute("SELECT key, value FROM update_status"):
+            status[key] = json.loads(value)
+        return status
+
+    def set_status(self, **fields) -> None:
+        with self.transaction() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO update_status (key, value) VALUES (?, ?)",
+                [(key, json.dumps(value)) for key, value in fields.items()]
+            )
+
+    def get_meta(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key: str, value: str) -> None:
+        with self.transaction() as conn:
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def touch(self) -> None:
+        self.set_meta("last_updated", datetime.now().isoformat())
+
+    # JSON import/export
+
+    def is_empty(self) -> bool:
+        return self.get_meta("version") is None
+
+    def import_json(self, database: Dict) -> None:
+        """Load a legacy mp_database.json structure into the store"""
+        constituencies = {
+            name: mp_info for name, mp_info in database.get("constituencies", {}).items()
+            if isinstance(mp_info, dict)
+        }
+        self.upsert_constituencies(constituencies)
+        with self.transaction() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO postcode_patterns (pattern, constituency) VALUES (?, ?)",
+                [
+                    (pattern, constituency)
+                    for pattern, names in database.get("postcode_patterns", {}).items()
+                    for constituency in names
+                ]
+            )
+        status = database.get("update_status")
+        if isinstance(status, dict):
+            self.set_status(**status)
+        self.set_meta("version", database.get("version", "2025.1"))
+        self.set_meta("last_updated", database.get("last_updated") or datetime.now().isoformat())
+        logging.info(f"Imported {len(constituencies)} constituencies into {self.db_path}")
+
+    def export_json(self) -> Dict:
+        """Render the store in the legacy JSON layout (pattern sets as sorted lists)"""
+        return {
+            "version": self.get_meta("version", "2025.1"),
+            "last_updated": self.get_meta("last_updated"),
+            "constituencies": self.all_constituencies(),
+            "postcode_patterns": {
+                pattern: sorted(names) for pattern, names in sorted(self.patterns().items())
+            },
+            "update_status": self.get_status()
+        }
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+class _Transaction:
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
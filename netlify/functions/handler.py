@@ -1,31 +1,28 @@
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-import json
 import os
-import time
+import sys
 from datetime import datetime
 
+# Shared modules live at the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from lookup_cache import make_cache
+
 app = Flask(__name__)
 CORS(app)
 
-# Cache for MP data to reduce API calls
-mp_cache = {}
+# Cache for MP data to reduce API calls (bounded, expires after an hour)
 CACHE_DURATION = 3600  # 1 hour cache
+mp_cache = make_cache("netlify_mp", maxsize=2048, ttl=CACHE_DURATION)
 
 def get_cached_mp(postcode):
     """Get cached MP data if available and not expired"""
-    if postcode in mp_cache:
-        data = mp_cache[postcode]
-        if time.time() - data['timestamp'] < CACHE_DURATION:
-            return data['data']
-    return None
+    return mp_cache.get(postcode)
 
 def set_cached_mp(postcode, data):
-    """Cache MP data with timestamp"""
-    mp_cache[postcode] = {
-        'data': data,
-        'timestamp': time.time()
-    }
+    """Cache MP data"""
+    mp_cache.set(postcode, data)
 
 @app.route('/.netlify/functions/handler', methods=['GET'])
 def handle_request():
@@ -2,21 +2,71 @@
 AI-powered news fetching service for MP information
 Uses web scraping and natural language processing to avoid API key requirements
 """
-import requests
+import asyncio
+import codecs
+import aiohttp
 from bs4 import BeautifulSoup
 import hashlib
 from datetime import datetime, timedelta
+from html.parser import HTMLParser
 import json
 import os
 import re
-from typing import List, Dict
+from typing import List, Dict, Optional
 import logging
 
+from lookup_cache import make_cache
+
+# Results returned per search, and the description fetch limits for them
+MAX_RESULTS = 5
+DESCRIPTION_TIMEOUT = 4
+DESCRIPTION_CONCURRENCY = 5
+# Stop reading an article page after this much HTML even without a description
+MAX_DESCRIPTION_BYTES = 64 * 1024
+
+class DescriptionParser(HTMLParser):
+    """Streaming parser that stops at the page's meta description.
+
+    Falls back to the first paragraph when the head has no description.
+    """
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.description: Optional[str] = None
+        self.done = False
+        self._in_paragraph = False
+        self._paragraph: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        if tag == 'meta':
+            attrs = dict(attrs)
+            if (attrs.get('name') or '').lower() == 'description' and attrs.get('content'):
+                self.description = attrs['content'].strip()
+                self.done = True
+        elif tag == 'p':
+            self._in_paragraph = True
+
+    def handle_endtag(self, tag):
+        if tag == 'p' and self._in_paragraph and not self.done:
+            self._in_paragraph = False
+            text = re.sub(r'\s+', ' ', ''.join(self._paragraph)).strip()
+            self._paragraph = []
+            if text:
+                self.description = text
+                self.done = True
+
+    def handle_data(self, data):
+        if self._in_paragraph and not self.done:
+            self._paragraph.append(data)
+
 class NewsScraperService:
     def __init__(self):
         self.cache_dir = "data/news_cache"
         self.cache_expiry = timedelta(hours=1)
         self.user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+        # Article descriptions by URL, shared by every search that returns the article
+        self.description_cache = make_cache("news_descriptions", maxsize=4096, ttl=24 * 3600, negative_ttl=600)
         self.ensure_cache_dir()
 
     def ensure_cache_dir(self):
@@ -47,81 +97,132 @@ class NewsScraperService:
                 'articles': articles
             }, f)
 
-    async def fetch_guardian_news(self, query: str) -> List[Dict]:
-        """Fetch news from The Guardian without API key"""
-        try:
-            url = f"https://www.theguardian.com/politics/search?q={query}"
-            headers = {'User-Agent': self.user_agent}
-            response = requests.get(url, headers=headers)
-            soup = BeautifulSoup(response.text, 'html.parser')
+    async def fetch_html(self, url: str, params: Dict, session: Optional[aiohttp.ClientSession] = None,
+                         timeout: float = 10) -> str:
+        """Fetch a page without blocking the event loop"""
+        if session is None:
+            async with aiohttp.ClientSession() as own_session:
+                return await self.fetch_html(url, params, own_session, timeout)
+        headers = {'User-Agent': self.user_agent}
+        async with session.get(url, params=params, headers=headers,
+                               timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+            return await response.text()
+
+    def parse_guardian_results(self, html: str, limit: int = MAX_RESULTS) -> List[Dict]:
+        """Parse Guardian search results (descriptions are added by add_descriptions)"""
+        soup = BeautifulSoup(html, 'html.parser')
+
+        articles = []
+        for article in soup.select('.fc-item'):
+            title = article.select_one('.fc-item__title')
+            link = article.select_one('a')
+            date = article.select_one('.fc-item__timestamp')
             
-            articles = []
-            for article in soup.select('.fc-item'):
-                title = article.select_one('.fc-item__title')
-                link = article.select_one('a')
-                date = article.select_one('.fc-item__timestamp')
-                
-                if title and link:
-                    articles.append({
-                        'title': title.text.strip(),
-                        'url': link['href'],
-                        'source': 'The Guardian',
-                        'publishedAt': date['datetime'] if date else None,
-                        'description': self.extract_description(link['href'])
-                    })
+            if title and link:
+                articles.append({
+                    'title': title.text.strip(),
+                    'url': link['href'],
+                    'source': 'The Guardian',
+                    'publishedAt': date['datetime'] if date else None
+                })
+                if len(articles) == limit:
+                    break
+
+        return articles
+
+    def parse_bbc_results(self, html: str, limit: int = MAX_RESULTS) -> List[Dict]:
+        """Parse BBC News search results (descriptions are added by add_descriptions)"""
+        soup = BeautifulSoup(html, 'html.parser')
+
+        articles = []
+        for article in soup.select('.ssrcss-1v7bxtk-StyledContainer'):
+            title = article.select_one('.ssrcss-6arcww-PromoHeadline')
+            link = article.select_one('a')
+            date = article.select_one('time')
             
-            return articles[:5]  # Return top 5 articles
+            if title and link:
+                articles.append({
+                    'title': title.text.strip(),
+                    'url': f"https://www.bbc.co.uk{link['href']}" if not link['href'].startswith('http') else link['href'],
+                    'source': 'BBC News',
+                    'publishedAt': date['datetime'] if date else None
+                })
+                if len(articles) == limit:
+                    break
+
+        return articles
+
+    async def fetch_guardian_news(self, query: str, session: Optional[aiohttp.ClientSession] = None) -> List[Dict]:
+        """Fetch news from The Guardian without API key"""
+        if session is None:
+            async with aiohttp.ClientSession() as own_session:
+                return await self.fetch_guardian_news(query, own_session)
+        try:
+            html = await self.fetch_html("https://www.theguardian.com/politics/search", {'q': query}, session)
+            # Parsing the results page blocks, so keep it off the event loop
+            articles = await asyncio.to_thread(self.parse_guardian_results, html)
+            return await self.add_descriptions(articles, session)
         except Exception as e:
             logging.error(f"Guardian news fetch error: {e}")
             return []
 
-    async def fetch_bbc_news(self, query: str) -> List[Dict]:
+    async def fetch_bbc_news(self, query: str, session: Optional[aiohttp.ClientSession] = None) -> List[Dict]:
         """Fetch news from BBC without API key"""
+        if session is None:
+            async with aiohttp.ClientSession() as own_session:
+                return await self.fetch_bbc_news(query, own_session)
         try:
-            url = f"https://www.bbc.co.uk/search?q={query}&filter=news"
-            headers = {'User-Agent': self.user_agent}
-            response = requests.get(url, headers=headers)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            articles = []
-            for article in soup.select('.ssrcss-1v7bxtk-StyledContainer'):
-                title = article.select_one('.ssrcss-6arcww-PromoHeadline')
-                link = article.select_one('a')
-                date = article.select_one('time')
-                
-                if title and link:
-                    articles.append({
-                        'title': title.text.strip(),
-                        'url': f"https://www.bbc.co.uk{link['href']}" if not link['href'].startswith('http') else link['href'],
-                        'source': 'BBC News',
-                        'publishedAt': date['datetime'] if date else None,
-                        'description': self.extract_description(link['href'])
-                    })
-            
-            return articles[:5]  # Return top 5 articles
+            html = await self.fetch_html("https://www.bbc.co.uk/search", {'q': query, 'filter': 'news'}, session)
+            articles = await asyncio.to_thread(self.parse_bbc_results, html)
+            return await self.add_descriptions(articles, session)
         except Exception as e:
             logging.error(f"BBC news fetch error: {e}")
             return []
 
-    def extract_description(self, url: str) -> str:
-        """Extract article description"""
+    async def add_descriptions(self, articles: List[Dict], session: aiohttp.ClientSession,
+                               timeout: float = DESCRIPTION_TIMEOUT) -> List[Dict]:
+        """Fill in each article's description concurrently, within timeout seconds each"""
+        semaphore = asyncio.Semaphore(DESCRIPTION_CONCURRENCY)
+
+        async def describe(article: Dict) -> None:
+            async with semaphore:
+                article['description'] = await self.extract_description(article['url'], session, timeout)
+
+        await asyncio.gather(*(describe(article) for article in articles))
+        return articles
+
+    async def extract_description(self, url: str, session: aiohttp.ClientSession,
+                                  timeout: float = DESCRIPTION_TIMEOUT) -> str:
+        """Extract article description, reading the page only as far as it.
+
+        Descriptions are cached per URL, independently of the search query;
+        pages that fail or time out are remembered briefly as empty.
+        """
+        entry = self.description_cache.lookup(url)
+        if entry is not None:
+            return entry.value or ""
         try:
-            headers = {'User-Agent': self.user_agent}
-            response = requests.get(url, headers=headers)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Try meta description first
-            meta_desc = soup.find('meta', {'name': 'description'})
-            if meta_desc and meta_desc.get('content'):
-                return meta_desc['content']
-            
-            # Try first paragraph
-            first_para = soup.find('p')
-            if first_para:
-                return first_para.text.strip()
-            
-            return ""
-        except:
+            description = await asyncio.wait_for(self._read_description(url, session, timeout), timeout)
+        except Exception as e:
+            logging.warning(f"Could not extract description from {url}: {e}")
+            self.description_cache.set_negative(url, "")
             return ""
+        self.description_cache.set(url, description)
+        return description
+
+    async def _read_description(self, url: str, session: aiohttp.ClientSession, timeout: float) -> str:
+        headers = {'User-Agent': self.user_agent}
+        async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+            response.raise_for_status()
+            decoder = codecs.getincrementaldecoder(response.charset or 'utf-8')(errors='replace')
+            parser = DescriptionParser()
+            read = 0
+            async for chunk in response.content.iter_chunked(8192):
+                parser.feed(decoder.decode(chunk))
+                read += len(chunk)
+                # Leaving the block closes the connection without downloading the rest
+                if parser.done or read >= MAX_DESCRIPTION_BYTES:
+                    break
+            return parser.description or ""
 
 news_service = NewsScraperService()
@@ -0,0 +1,291 @@
+"""
+Batched, cached article summarisation.
+A SummaryWorker loads the summarisation model once and keeps it on a
+background thread; callers submit lists of articles as jobs. Each job
+skips texts whose summary is already cached (keyed by a hash of the
+cleaned text and the model settings) and sends the rest through the
+pipeline in batched calls, which on CPU is far cheaper than one call per
+article.
+
+The "extractive" engine picks the most central sentences by TextRank over
+TF-IDF sentence vectors, using only the standard library. It costs
+milliseconds per article, so the "auto" engine falls back to it when the
+model is unavailable, fails, or would overrun the job's latency budget.
+"""
+import re
+import math
+import time
+import queue
+import hashlib
+import logging
+import threading
+from collections import Counter
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from write_behind_cache import WriteBehindCache
+
+DEFAULT_MODEL = "facebook/bart-large-cnn"
+DEFAULT_CACHE_PATH = "data/summary_cache.json"
+
+ENGINES = ("auto", "bart", "extractive")
+
+# Texts shorter than this are not worth summarising
+MIN_WORDS = 10
+
+STOPWORDS = frozenset("""
+a about after all also an and any are as at be been but by can could did do does for from had has
+have he her his i if in into is it its more most mr ms no not of on or our out over said says she so
+than that the their them then there these they this to up was we were what when which who will with
+would you
+""".split())
+
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+(?=["\'\u201c\u2018(]?[A-Z0-9])')
+WORD = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+def clean_text(text):
+    """Clean and prepare text for summarization"""
+    if not text:
+        return ""
+
+    # Remove HTML tags and clean up text
+    text = re.sub(r'<[^>]+>', '', text)
+    text = re.sub(r'\s+', ' ', text).strip()
+    return text
+
+def summary_lengths(word_count: int, max_length: int = 50, min_length: int = 25) -> Tuple[int, int]:
+    """Output length bounds for a text, shrunk for short inputs to avoid warnings"""
+    adjusted_max_length = min(max_length, max(word_count - 5, 10))
+    adjusted_min_length = min(min_length, adjusted_max_length - 5)
+    return adjusted_max_length, max(adjusted_min_length, 5)
+
+def split_sentences(text: str) -> List[str]:
+    return [sentence.strip() for sentence in SENTENCE_BOUNDARY.split(text) if sentence.strip()]
+
+def _tfidf_vectors(sentences: Sequence[str]) -> List[Dict[str, float]]:
+    """Unit-length TF-IDF vector per sentence, treating each sentence as a document"""
+    tokenised = [[word for word in WORD.findall(sentence.lower()) if word not in STOPWORDS]
+                 for sentence in sentences]
+    document_frequency = Counter(word for words in tokenised for word in set(words))
+    count = len(sentences)
+    vectors = []
+    for words in tokenised:
+        weights = {word: tf * (math.log(count / document_frequency[word]) + 1)
+                   for word, tf in Counter(words).items()}
+        norm = math.sqrt(sum(weight * weight for weight in weights.values())) or 1.0
+        vectors.append({word: weight / norm for word, weight in weights.items()})
+    return vectors
+
+def textrank(sentences: Sequence[str], damping: float = 0.85, iterations: int = 50,
+             tolerance: float = 1e-6) -> List[float]:
+    """Centrality score per sentence: PageRank over the cosine-similarity graph"""
+    vectors = _tfidf_vectors(sentences)
+    count = len(vectors)
+    weights = [[0.0] * count for _ in range(count)]
+    for i in range(count):
+        for j in range(i + 1, count):
+            small, large = sorted((vectors[i], vectors[j]), key=len)
+            similarity = sum(weight * large.get(word, 0.0) for word, weight in small.items())
+            weights[i][j] = weights[j][i] = similarity
+    totals = [sum(row) for row in weights]
+
+    scores = [1.0 / count] * count
+    for _ in range(iterations):
+        updated = [(1 - damping) / count + damping * sum(
+            weights[j][i] / totals[j] * scores[j] for j in range(count) if totals[j])
+            for i in range(count)]
+        converged = max(abs(a - b) for a, b in zip(updated, scores)) < tolerance
+        scores = updated
+        if converged:
+            break
+    return scores
+
+def extractive_summary(text: str, max_words: int = 50) -> Optional[str]:
+    """Top-ranked sentences, in their original order, within max_words"""
+    cleaned = clean_text(text)
+    if len(cleaned.split()) < MIN_WORDS:
+        return None
+    sentences = split_sentences(cleaned)
+    if len(sentences) == 1:
+        ranked = [0]
+    else:
+        scores = textrank(sentences)
+        # Ties go to the earlier sentence, which in news is usually the lede
+        ranked = sorted(range(len(sentences)), key=lambda i: (-scores[i], i))
+
+    chosen, words = [], 0
+    for index in ranked:
+        length = len(sentences[index].split())
+        if chosen and words + length > max_words:
+            continue
+        chosen.append(index)
+        words += length
+    if words > max_words:
+        # A single sentence longer than the limit is cut at a word boundary
+        return " ".join(sentences[chosen[0]].split()[:max_words]) + "\u2026"
+    return " ".join(sentences[index] for index in sorted(chosen))
+
+def load_pipeline(model: str = DEFAULT_MODEL, device: int = -1):
+    """Load the transformers summarisation pipeline, or None if it is unavailable"""
+    try:
+        from transformers import pipeline
+    except ImportError:
+        logging.error("transformers is not installed; install it with: pip install transformers torch")
+        return None
+    try:
+        return pipeline("summarization", model=model, device=device, truncation=True)
+    except Exception as e:
+        logging.error(f"Error loading summarisation model {model}: {e}")
+        return None
+
+class SummaryWorker:
+    """Long-lived summarisation worker: the model is loaded once, jobs are queued.
+
+    engine is "bart" (model only), "extractive" (never loads the model) or
+    "auto": the model, with extractive summaries for texts it cannot do
+    within latency_budget seconds per job or at all.
+    """
+    def __init__(self, model: str = DEFAULT_MODEL, batch_size: int = 8, cache_path: str = DEFAULT_CACHE_PATH,
+                 max_length: int = 50, min_length: int = 25, summarizer=None, engine: str = "auto",
+                 latency_budget: Optional[float] = None):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown summary engine {engine!r}; choose from {', '.join(ENGINES)}")
+        self.model = model
+        self.batch_size = max(1, batch_size)
+        self.max_length = max_length
+        self.min_length = min_length
+        self.engine = engine
+        self.latency_budget = latency_budget
+        self.cache = WriteBehindCache(cache_path)
+        self._summarizer = summarizer
+        self._loaded = summarizer is not None
+        # Moving average of model seconds per text, used to stay inside the budget
+        self._seconds_per_text: Optional[float] = None
+        self._jobs: "queue.Queue[Optional[Tuple[List[str], str, Optional[float], Future]]]" = queue.Queue()
+        self.stats = {"jobs": 0, "texts": 0, "cached": 0, "summarised": 0, "batches": 0, "extractive": 0}
+        self._thread = threading.Thread(target=self._run, name="summary-worker", daemon=True)
+        self._thread.start()
+
+    def cache_key(self, text: str) -> str:
+        digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        return f"{self.model}:{self.max_length}:{self.min_length}:{digest}"
+
+    @property
+    def summarizer(self):
+        """The pipeline, loaded on first use by the worker thread"""
+        if not self._loaded:
+            logging.info(f"Loading summarisation model {self.model}...")
+            self._summarizer = load_pipeline(self.model)
+            self._loaded = True
+        return self._summarizer
+
+    def submit(self, texts: List[str], engine: Optional[str] = None,
+               latency_budget: Optional[float] = None) -> Future:
+        """Queue texts for summarisation; the future resolves to one summary (or None) per text.
+
+        engine and latency_budget override the worker's defaults for this job.
+        """
+        engine = engine or self.engine
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown summary engine {engine!r}; choose from {', '.join(ENGINES)}")
+        future = Future()
+        budget = self.latency_budget if latency_budget is None else latency_budget
+        self._jobs.put((list(texts), engine, budget, future))
+        return future
+
+    def summarize(self, texts: List[str], timeout: Optional[float] = None, engine: Optional[str] = None,
+                  latency_budget: Optional[float] = None) -> List[Optional[str]]:
+        return self.submit(texts, engine, latency_budget).result(timeout)
+
+    def _run(self) -> None:
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            texts, engine, budget, future = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(self._process(texts, engine, budget))
+            except Exception as e:
+                logging.error(f"Summarisation job failed: {e}")
+                future.set_exception(e)
+
+    def _process(self, texts: List[str], engine: str = "auto",
+                 budget: Optional[float] = None) -> List[Optional[str]]:
+        started = time.monotonic()
+        self.stats["jobs"] += 1
+        self.stats["texts"] += len(texts)
+        results: List[Optional[str]] = [None] * len(texts)
+
+        # Group uncached texts by output length so each group is one batched call
+        pending: Dict[Tuple[int, int], Dict[str, List[int]]] = {}
+        for index, text in enumerate(texts):
+            cleaned = clean_text(text)
+            word_count = len(cleaned.split())
+            if word_count < MIN_WORDS:
+                continue
+            key = self.cache_key(cleaned)
+            if engine != "extractive" and key in self.cache:
+                results[index] = self.cache[key]
+                self.stats["cached"] += 1
+                continue
+            lengths = summary_lengths(word_count, self.max_length, self.min_length)
+            pending.setdefault(lengths, {}).setdefault(cleaned, []).append(index)
+
+        summarizer = self.summarizer if pending and engine != "extractive" else None
+        if summarizer is None and engine == "auto" and pending:
+            logging.info("Summarisation model unavailable; using extractive summaries")
+
+        for (max_length, min_length), group in pending.items():
+            unique_texts = list(group)
+            start = 0
+            while start < len(unique_texts):
+                # Under a budget with no timing yet, one text measures the model before a full batch
+                size = 1 if budget is not None and self._seconds_per_text is None else self.batch_size
+                batch = unique_texts[start:start + size]
+                start += size
+                if summarizer is not None and self._within_budget(started, budget, len(batch)):
+                    summaries = self._summarise_batch(batch, max_length, min_length)
+                else:
+                    summaries = [None] * len(batch)
+
+                for text, summary in zip(batch, summaries):
+                    if summary is not None:
+                        self.cache[self.cache_key(text)] = summary
+                    elif engine != "bart":
+                        # Extractive summaries are cheap, so they are not cached and
+                        # a later run with the model available replaces them
+                        summary = extractive_summary(text, self.max_length)
+                        self.stats["extractive"] += 1
+                    for index in group[text]:
+                        results[index] = summary
+        return results
+
+    def _within_budget(self, started: float, budget: Optional[float], count: int) -> bool:
+        """Whether a model batch of count texts is expected to finish inside the job's budget"""
+        if budget is None:
+            return True
+        estimate = (self._seconds_per_text or 0.0) * count
+        return time.monotonic() - started + estimate <= budget
+
+    def _summarise_batch(self, batch: List[str], max_length: int, min_length: int) -> List[Optional[str]]:
+        started = time.monotonic()
+        try:
+            outputs = self.summarizer(batch, max_length=max_length, min_length=min_length,
+                                      do_sample=False, batch_size=len(batch))
+        except Exception as e:
+            logging.warning(f"Error summarising a batch of {len(batch)}: {e}")
+            return [None] * len(batch)
+        per_text = (time.monotonic() - started) / len(batch)
+        self._seconds_per_text = per_text if self._seconds_per_text is None else (
+            0.7 * self._seconds_per_text + 0.3 * per_text)
+        self.stats["batches"] += 1
+        self.stats["summarised"] += len(batch)
+        return [output['summary_text'] for output in outputs]
+
+    def close(self) -> None:
+        """Finish queued jobs, stop the worker and flush the cache"""
+        self._jobs.put(None)
+        self._thread.join()
+        self.cache.close()
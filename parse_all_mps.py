@@ -9,6 +9,48 @@ import requests
 import os
 from typing import List, Dict, Any
 
+def clean_member(mp: Dict[str, Any]) -> Dict[str, Any]:
+    """Reduce a Members API record to the fields the lookup system uses"""
+    # Extract basic information
+    mp_id = mp.get("id", "")
+    name = mp.get("nameDisplayAs", "Unknown")
+    
+    # Extract party information
+    party_info = mp.get("latestParty", {})
+    party = party_info.get("name", "Unknown")
+    party_abbrev = party_info.get("abbreviation", "")
+    
+    # Extract constituency information
+    membership = mp.get("latestHouseMembership", {})
+    constituency = membership.get("membershipFrom", "Unknown")
+    constituency_id = membership.get("membershipFromId", "")
+    
+    # Generate email (standard format for MPs)
+    email_name = name.lower().replace(" ", ".").replace("'", "").replace("-", "")
+    # Remove titles and honorifics
+    email_name = email_name.replace("rt.hon.", "").replace("sir.", "").replace("dame.", "")
+    email_name = email_name.replace("dr.", "").replace("mr.", "").replace("ms.", "").replace("mrs.", "")
+    email_name = email_name.strip(".")
+    email = f"{email_name}.mp@parliament.uk"
+    
+    # Create cleaned MP record
+    mp_record = {
+        "id": mp_id,
+        "name": name,
+        "party": party,
+        "party_abbreviation": party_abbrev,
+        "constituency": constituency,
+        "constituency_id": constituency_id,
+        "email": email,
+        "phone": "020 7219 3000",  # General Parliament number
+        "profile_url": f"https://members.parliament.uk/member/{mp_id}",
+        "thumbnail_url": mp.get("thumbnailUrl", ""),
+        "gender": mp.get("gender", ""),
+        "membership_start": membership.get("membershipStartDate", ""),
+        "status": membership.get("membershipStatus", {}).get("statusDescription", "Current Member")
+    }
+    return mp_record
+
 def parse_mp_data() -> List[Dict[str, Any]]:
     """
     Parse the downloaded MP data and extract relevant fields.
@@ -47,46 +89,7 @@ def parse_mp_data() -> List[Dict[str, Any]]:
     
     for mp in members:
         try:
-            # Extract basic information
-            mp_id = mp.get("id", "")
-            name = mp.get("nameDisplayAs", "Unknown")
-            
-            # Extract party information
-            party_info = mp.get("latestParty", {})
-            party = party_info.get("name", "Unknown")
-            party_abbrev = party_info.get("abbreviation", "")
-            
-            # Extract constituency information
-            membership = mp.get("latestHouseMembership", {})
-            constituency = membership.get("membershipFrom", "Unknown")
-            constituency_id = membership.get("membershipFromId", "")
-            
-            # Generate email (standard format for MPs)
-            email_name = name.lower().replace(" ", ".").replace("'", "").replace("-", "")
-            # Remove titles and honorifics
-            email_name = email_name.replace("rt.hon.", "").replace("sir.", "").replace("dame.", "")
-            email_name = email_name.replace("dr.", "").replace("mr.", "").replace("ms.", "").replace("mrs.", "")
-            email_name = email_name.strip(".")
-            email = f"{email_name}.mp@parliament.uk"
-            
-            # Create cleaned MP record
-            mp_record = {
-                "id": mp_id,
-                "name": name,
-                "party": party,
-                "party_abbreviation": party_abbrev,
-                "constituency": constituency,
-                "constituency_id": constituency_id,
-                "email": email,
-                "phone": "020 7219 3000",  # General Parliament number
-                "profile_url": f"https://members.parliament.uk/member/{mp_id}",
-                "thumbnail_url": mp.get("thumbnailUrl", ""),
-                "gender": mp.get("gender", ""),
-                "membership_start": membership.get("membershipStartDate", ""),
-                "status": membership.get("membershipStatus", {}).get("statusDescription", "Current Member")
-            }
-            
-            all_mps.append(mp_record)
+            all_mps.append(clean_member(mp))
             
         except Exception as e:
             print(f"⚠️ Warning: Error processing MP {mp.get('nameDisplayAs', 'Unknown')}: {e}")
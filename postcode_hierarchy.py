@@ -0,0 +1,163 @@
+"""
+Hierarchical postcode index (area -> district -> sector -> unit).
+
+Each level only stores entries beneath parents that are split between
+constituencies, so most postcodes resolve from a single area or district
+entry and unit-level data is kept just for the genuinely split sectors.
+"""
+import os
+import re
+import json
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+LEVELS = ("area", "district", "sector", "unit")
+
+_AREA_RE = re.compile(r'^[A-Z]{1,2}')
+
+def postcode_parts(postcode: str) -> Dict[str, str]:
+    """Split a full or partial postcode into its hierarchy keys.
+
+    "SW1A 1AA" -> {"area": "SW", "district": "SW1A", "sector": "SW1A 1", "unit": "SW1A1AA"}
+    """
+    compact = ''.join((postcode or '').split()).upper()
+    area = _AREA_RE.match(compact)
+    if not area:
+        return {}
+
+    parts = {"area": area.group(0)}
+    if len(compact) >= 5:
+        outward, inward = compact[:-3], compact[-3:]
+        parts["district"] = outward
+        parts["sector"] = f"{outward} {inward[0]}"
+        parts["unit"] = compact
+    elif len(compact) > len(parts["area"]):
+        parts["district"] = compact
+    return parts
+
+class PostcodeHierarchy:
+    def __init__(self):
+        self.names: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self.entries: Dict[str, Dict[str, int]] = {level: {} for level in LEVELS}
+        self.split: Dict[str, Set[str]] = {level: set() for level in LEVELS[:-1]}
+
+    def _intern(self, name: str) -> int:
+        if name not in self._ids:
+            self._ids[name] = len(self.names)
+            self.names.append(name)
+        return self._ids[name]
+
+    def add(self, level: str, key: str, constituency: str) -> None:
+        """Record that everything under key maps to a single constituency"""
+        self.entries[level][key] = self._intern(constituency)
+
+    def mark_split(self, level: str, key: str) -> None:
+        """Record that key straddles more than one constituency"""
+        self.split[level].add(key)
+        self.entries[level].pop(key, None)
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self.entries.values())
+
+    @classmethod
+    def build(cls, pairs: Iterable[Tuple[str, str]]) -> 'PostcodeHierarchy':
+        """Build from (postcode, constituency) pairs.
+
+        pairs must be re-iterable: unit entries are collected in a second pass
+        so only postcodes inside split sectors are held in memory.
+        """
+        hierarchy = cls()
+        seen: Dict[str, Dict[str, Set[int]]] = {level: defaultdict(set) for level in LEVELS[:-1]}
+
+        for postcode, constituency in pairs:
+            parts = postcode_parts(postcode)
+            if "unit" not in parts:
+                continue
+            constituency_id = hierarchy._intern(constituency)
+            for level in LEVELS[:-1]:
+                seen[level][parts[level]].add(constituency_id)
+
+        def place(level: str, key: str) -> bool:
+            """Store an unambiguous key; return True if its children are needed"""
+            ids = seen[level][key]
+            if len(ids) == 1:
+                hierarchy.entries[level][key] = next(iter(ids))
+                return False
+            hierarchy.split[level].add(key)
+            return True
+
+        split_areas = {area for area in seen["area"] if place("area", area)}
+        split_districts = {
+            district for district in seen["district"]
+            if postcode_parts(district)["area"] in split_areas and place("district", district)
+        }
+        split_sectors = {
+            sector for sector in seen["sector"]
+            if sector.split(' ')[0] in split_districts and place("sector", sector)
+        }
+
+        if split_sectors:
+            for postcode, constituency in pairs:
+                parts = postcode_parts(postcode)
+                if parts.get("sector") in split_sectors:
+                    hierarchy.entries["unit"][parts["unit"]] = hierarchy._intern(constituency)
+
+        return hierarchy
+
+    def resolve(self, postcode: str) -> Tuple[Optional[str], str]:
+        """Resolve from the coarsest unambiguous level.
+
+        Returns (constituency, level) on a hit, (None, "split") when the postcode
+        lies in a known split region without finer data, else (None, "unknown").
+        """
+        parts = postcode_parts(postcode)
+        split_seen = False
+        for level in LEVELS:
+            key = parts.get(level)
+            if key is None:
+                break
+            constituency_id = self.entries[level].get(key)
+            if constituency_id is not None:
+                return self.names[constituency_id], level
+            if level in self.split and key in self.split[level]:
+                split_seen = True
+        return None, "split" if split_seen else "unknown"
+
+    def to_dict(self) -> Dict:
+        return {
+            "version": 1,
+            "names": self.names,
+            "entries": self.entries,
+            "split": {level: sorted(keys) for level, keys in self.split.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'PostcodeHierarchy':
+        hierarchy = cls()
+        for name in data.get("names", []):
+            hierarchy._intern(name)
+        for level in LEVELS:
+            hierarchy.entries[level] = dict(data.get("entries", {}).get(level, {}))
+        for level in LEVELS[:-1]:
+            hierarchy.split[level] = set(data.get("split", {}).get(level, []))
+        return hierarchy
+
+    def save(self, path: str) -> None:
+        temp_path = path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: Optional[str]) -> 'PostcodeHierarchy':
+        """Load a saved hierarchy, or return an empty one if unavailable"""
+        if not path or not os.path.exists(path):
+            return cls()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return cls.from_dict(json.load(f))
+        except (OSError, json.JSONDecodeError) as e:
+            logging.error(f"Could not load postcode hierarchy {path}: {e}")
+            return cls()
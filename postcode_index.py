@@ -0,0 +1,127 @@
+"""
+Memory-mapped binary postcode index.
+
+File layout (little endian):
+    header   magic "GWPI", version (H), key width (H), record count (I),
+             names offset (I), names count (I)
+    records  record count x (7-byte postcode key, constituency id (H)), sorted by key
+    names    names count x (length (H), UTF-8 constituency name)
+
+Keys use the ONSPD 7-character form: the outward code left-justified to four
+characters followed by the inward code, e.g. "SW1A1AA" or "M1  1AA".
+"""
+import os
+import mmap
+import struct
+import logging
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+MAGIC = b"GWPI"
+VERSION = 1
+KEY_WIDTH = 7
+HEADER = struct.Struct('<4sHHIII')
+RECORD = struct.Struct(f'<{KEY_WIDTH}sH')
+NAME_LENGTH = struct.Struct('<H')
+
+def postcode_key(postcode: str) -> Optional[bytes]:
+    """Pack a postcode into its fixed-width index key, or None if malformed"""
+    compact = ''.join((postcode or '').split()).upper()
+    if not 5 <= len(compact) <= 7:
+        return None
+    outward, inward = compact[:-3], compact[-3:]
+    try:
+        return f"{outward:<4}{inward}".encode('ascii')
+    except UnicodeEncodeError:
+        return None
+
+def write_index(path: str, records: Iterable[Tuple[bytes, int]], names: List[str]) -> int:
+    """Write sorted (key, constituency id) records and the name table to path"""
+    packed = sorted(RECORD.pack(key, constituency_id) for key, constituency_id in records)
+    encoded_names = [name.encode('utf-8') for name in names]
+    names_offset = HEADER.size + len(packed) * RECORD.size
+
+    temp_path = path + ".tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, KEY_WIDTH, len(packed), names_offset, len(names)))
+        f.writelines(packed)
+        for name in encoded_names:
+            f.write(NAME_LENGTH.pack(len(name)))
+            f.write(name)
+    os.replace(temp_path, path)
+    return len(packed)
+
+class PostcodeIndex:
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            self._read_header()
+        except (ValueError, struct.error) as e:
+            self._mm.close()
+            raise ValueError(f"{path} is not a valid version {VERSION} postcode index: {e}") from e
+
+        logging.info(f"Mapped postcode index {path}: {self._count} postcodes, {len(self.names)} constituencies")
+
+    def _read_header(self) -> None:
+        """Check the header against the file's size and read the name table"""
+        if len(self._mm) < HEADER.size:
+            raise ValueError("file is shorter than its header")
+        magic, version, key_width, self._count, names_offset, names_count = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION or key_width != KEY_WIDTH:
+            raise ValueError("bad magic or version")
+        if names_offset != HEADER.size + self._count * RECORD.size or names_offset > len(self._mm):
+            raise ValueError(f"{self._count} records do not fit the file")
+
+        self.names: List[str] = []
+        offset = names_offset
+        for _ in range(names_count):
+            (length,) = NAME_LENGTH.unpack_from(self._mm, offset)
+            offset += NAME_LENGTH.size
+            if offset + length > len(self._mm):
+                raise ValueError("name table runs past the end of the file")
+            self.names.append(self._mm[offset:offset + length].decode('utf-8'))
+            offset += length
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _key_at(self, index: int) -> bytes:
+        offset = HEADER.size + index * RECORD.size
+        return self._mm[offset:offset + KEY_WIDTH]
+
+    def _lower_bound(self, key: bytes) -> int:
+        """Index of the first record whose key is >= key"""
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def lookup_id(self, postcode: str) -> Optional[int]:
+        """Binary search for a postcode and return its constituency id"""
+        key = postcode_key(postcode)
+        if key is None:
+            return None
+        index = self._lower_bound(key)
+        if index < self._count and self._key_at(index) == key:
+            return RECORD.unpack_from(self._mm, HEADER.size + index * RECORD.size)[1]
+        return None
+
+    def lookup(self, postcode: str) -> Optional[str]:
+        """Get the constituency name for a full postcode"""
+        constituency_id = self.lookup_id(postcode)
+        return None if constituency_id is None else self.names[constituency_id]
+
+    def __iter__(self) -> Iterator[Tuple[str, int]]:
+        """Iterate (postcode key, constituency id) pairs in key order"""
+        for index in range(self._count):
+            key, constituency_id = RECORD.unpack_from(self._mm, HEADER.size + index * RECORD.size)
+            yield key.decode('ascii'), constituency_id
+
+    def close(self) -> None:
+        self._mm.close()
@@ -0,0 +1,210 @@
+"""
+Compiled postcode to constituency resolver.
+Built once at startup and shared read-only between request threads. When
+the compiled MP dataset is current, postcode and MP lookups are served
+straight from its memory mapping, so worker processes share its pages;
+otherwise the JSON database and constituency lookup files are compiled
+into in-memory tables.
+"""
+import os
+import json
+import re
+import threading
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+from postcode_index import PostcodeIndex
+from mp_dataset import MPDataset
+from postcode_hierarchy import PostcodeHierarchy
+
+def normalise_postcode(postcode: str) -> str:
+    """Strip whitespace and upper-case a postcode (e.g. "sw1a 1aa" -> "SW1A1AA")"""
+    return re.sub(r'\s+', '', postcode or '').upper()
+
+def outward_code(postcode: str) -> str:
+    """Return the outward code (district) of a full or partial postcode"""
+    compact = normalise_postcode(postcode)
+    return compact[:-3] if len(compact) >= 5 else compact
+
+class _JSONTables:
+    """Interned name and id tables compiled from the JSON files.
+
+    Offers the same lookups as MPDataset, which replaces it when the
+    compiled dataset is current.
+    """
+    def __init__(self, database: Dict, constituencies: Dict):
+        names: List[str] = []
+        ids: Dict[str, int] = {}
+
+        def intern(name: str) -> int:
+            if name not in ids:
+                ids[name] = len(names)
+                names.append(name)
+            return ids[name]
+
+        for name in constituencies:
+            intern(name)
+
+        self.districts = {
+            outward_code(district): intern(name)
+            for district, name in database.get("postcode_map", {}).items() if name
+        }
+        self.exact = {
+            normalise_postcode(postcode): intern(name)
+            for postcode, name in database.get("postcode_exact_map", {}).items() if name
+        }
+        self.names = tuple(names)
+        self.name_ids = ids
+        self.mps = tuple(constituencies.get(name) for name in names)
+
+    def lookup_district(self, district: str) -> Optional[str]:
+        constituency_id = self.districts.get(district)
+        return None if constituency_id is None else self.names[constituency_id]
+
+    def lookup_exact(self, postcode: str) -> Optional[str]:
+        constituency_id = self.exact.get(normalise_postcode(postcode))
+        return None if constituency_id is None else self.names[constituency_id]
+
+    def get_mp(self, constituency: str) -> Optional[Dict]:
+        constituency_id = self.name_ids.get(constituency)
+        return None if constituency_id is None else self.mps[constituency_id]
+
+    def constituencies(self) -> List[str]:
+        return [name for name, mp in zip(self.names, self.mps) if mp is not None]
+
+class _ResolverSnapshot:
+    """Immutable set of lookup tables; replaced wholesale on reload"""
+    __slots__ = ('tables', 'index', 'hierarchy')
+
+    def __init__(self, tables, index=None, hierarchy: Optional[PostcodeHierarchy] = None):
+        self.tables = tables
+        self.index = index
+        self.hierarchy = hierarchy or PostcodeHierarchy()
+
+class PostcodeResolver:
+    def __init__(self, database_path: str = "data/mp_database.json",
+                 constituencies_path: str = "data/constituency_lookup.json",
+                 index_path: Optional[str] = "data/postcode_index.bin",
+                 hierarchy_path: Optional[str] = "data/postcode_hierarchy.json",
+                 dataset_path: Optional[str] = None):
+        self.database_path = database_path
+        self.constituencies_path = constituencies_path
+        self.index_path = index_path
+        self.hierarchy_path = hierarchy_path
+        # The compiled dataset lives beside the database it was built from ("" disables it)
+        if dataset_path is None:
+            dataset_path = os.path.join(os.path.dirname(database_path), "mp_dataset.bin")
+        self.dataset_path = dataset_path
+        self.dataset_version: Optional[str] = None
+        self._reload_lock = threading.Lock()
+        self._snapshot = self._build()
+
+    def _load_json(self, file_path: str) -> Dict:
+        """Load JSON data from file"""
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError) as e:
+            logging.warning(f"Resolver could not load {file_path}: {e}")
+            return {}
+
+    def _open_index(self):
+        """Memory-map the ONSPD postcode index if it has been built"""
+        if not self.index_path or not os.path.exists(self.index_path):
+            return None
+        try:
+            return PostcodeIndex(self.index_path)
+        except (OSError, ValueError) as e:
+            logging.error(f"Could not open postcode index {self.index_path}: {e}")
+            return None
+
+    def _load_hierarchy(self, split_districts: Iterable[str],
+                        sectors: Iterable[Tuple[str, str]]) -> PostcodeHierarchy:
+        """Load the area/district/sector hierarchy plus split data found by the district processor"""
+        hierarchy = PostcodeHierarchy.load(self.hierarchy_path)
+        for district in split_districts:
+            hierarchy.mark_split("district", outward_code(district))
+        for sector, name in sectors:
+            if name:
+                hierarchy.add("sector", sector.upper(), name)
+        return hierarchy
+
+    def _open_dataset(self) -> Optional[MPDataset]:
+        """Map the compiled dataset unless a JSON source has changed since it was built"""
+        if not self.dataset_path or not os.path.exists(self.dataset_path):
+            return None
+        built = os.path.getmtime(self.dataset_path)
+        for path in (self.database_path, self.constituencies_path):
+            if os.path.exists(path) and os.path.getmtime(path) > built:
+                logging.warning(f"{path} is newer than {self.dataset_path}; loading JSON instead "
+                                f"(rerun scripts/build_mp_dataset.py)")
+                return None
+        try:
+            return MPDataset(self.dataset_path)
+        except (OSError, ValueError, KeyError) as e:
+            logging.error(f"Could not open MP dataset {self.dataset_path}: {e}")
+            return None
+
+    def _build(self) -> _ResolverSnapshot:
+        """Map the compiled dataset, or compile the JSON sources into lookup tables.
+
+        Only the split districts and their sectors, a few hundred entries, are
+        copied out of the dataset into the hierarchy; everything else is
+        looked up in the mapping.
+        """
+        dataset = self._open_dataset()
+        if dataset is not None:
+            self.dataset_version = dataset.version
+            tables = dataset
+            hierarchy = self._load_hierarchy(dataset.split_districts(), dataset.sectors())
+        else:
+            self.dataset_version = None
+            database = self._load_json(self.database_path)
+            constituencies = self._load_json(self.constituencies_path).get("constituencies", {})
+            tables = _JSONTables(database, constituencies)
+            hierarchy = self._load_hierarchy(database.get("split_districts", []),
+                                             database.get("postcode_sector_map", {}).items())
+            logging.info(f"Resolver compiled {len(tables.districts)} districts, "
+                         f"{len(tables.exact)} exact postcodes, {len(tables.names)} constituencies")
+        return _ResolverSnapshot(tables, self._open_index(), hierarchy)
+
+    def reload(self) -> None:
+        """Rebuild the lookup tables from disk and swap them in atomically.
+
+        The previous dataset and index mappings are left for the garbage
+        collector so that threads still holding the old snapshot can finish
+        their lookups.
+        """
+        with self._reload_lock:
+            self._snapshot = self._build()
+
+    def resolve(self, postcode: str) -> Optional[str]:
+        """Resolve a postcode to a constituency name using local data only"""
+        snapshot = self._snapshot
+        compact = normalise_postcode(postcode)
+
+        constituency = snapshot.tables.lookup_exact(compact)
+        if constituency:
+            return constituency
+
+        # Coarsest unambiguous level first; finer data only for split districts
+        constituency, level = snapshot.hierarchy.resolve(compact)
+        if constituency:
+            return constituency
+
+        if snapshot.index is not None:
+            constituency = snapshot.index.lookup(compact)
+            if constituency:
+                return constituency
+
+        # A single-constituency district mapping would guess wrong for a known split
+        if level == "split":
+            return None
+        return snapshot.tables.lookup_district(outward_code(compact))
+
+    def get_mp(self, constituency: str) -> Optional[Dict]:
+        """Get the MP record for a constituency name"""
+        return self._snapshot.tables.get_mp(constituency)
+
+    def constituencies(self) -> List[str]:
+        """Get the names of all constituencies with an MP record"""
+        return self._snapshot.tables.constituencies()
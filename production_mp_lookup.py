@@ -5,18 +5,19 @@ Real constituency lookup + comprehensive MP database
 Perfect for production use with reliable data
 """
 
-import requests
+import http_client
 import json
 import os
 import sys
 from datetime import datetime
+from lookup_cache import DEFAULT_CACHE_DB, make_cache
 
 class ProductionMPLookup:
     def __init__(self):
         self.mapit_base_url = "https://mapit.mysociety.org"
-        self.cache = {}
-        self.cache_file = "data/production_mp_cache.json"
-        self.load_cache()
+        # Constituency and MP lookups, kept for a day on disk so later runs reuse them
+        self.cache = make_cache("production_mp", maxsize=4096, ttl=86400, negative_ttl=3600,
+                                default_path=DEFAULT_CACHE_DB)
 
         # Comprehensive MP database (updated as of 2024)
         self.mp_database = {
@@ -99,25 +100,11 @@ class ProductionMPLookup:
             }
         }
 
-    def load_cache(self):
-        """Load cached data"""
-        try:
-            with open(self.cache_file, 'r') as f:
-                self.cache = json.load(f)
-            print(f"📁 Loaded {len(self.cache)} cached records")
-        except FileNotFoundError:
-            print("📁 No cache file found, starting fresh")
-            self.cache = {}
-
-    def save_cache(self):
-        """Save data to cache"""
-        try:
-            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
-            with open(self.cache_file, 'w') as f:
-                json.dump(self.cache, f, indent=2)
-            print(f"💾 Saved {len(self.cache)} records to cache")
-        except Exception as e:
-            print(f"❌ Error saving cache: {e}")
+    def report_cache(self):
+        """Print cache hit/miss counts"""
+        stats = self.cache.stats()
+        print(f"📊 Cache: {stats['hits']} hits, {stats['misses']} misses, {stats['size']} entries"
+              f"{' (shared)' if stats['shared'] else ''}")
 
     def get_constituency_from_postcode(self, postcode):
         """Get constituency name from postcode using MapIt API"""
@@ -125,17 +112,22 @@ class ProductionMPLookup:
 
         # Check cache first
         cache_key = f"constituency_{clean_postcode}"
-        if cache_key in self.cache:
+        cached = self.cache.lookup(cache_key)
+        if cached is not None:
             print(f"📋 Using cached constituency data for {postcode}")
-            return self.cache[cache_key]
+            return cached.value
 
         try:
             print(f"🌐 Looking up constituency for {postcode}...")
             url = f"{self.mapit_base_url}/postcode/{clean_postcode}"
-            response = requests.get(url, timeout=10)
+            response = http_client.get(url)
 
             if response.status_code != 200:
-                return {"error": f"Invalid postcode or API failed (Status: {response.status_code})"}
+                error = {"error": f"Invalid postcode or API failed (Status: {response.status_code})"}
+                if response.status_code == 404:
+                    # Unknown postcodes stay unknown; don't ask again for a while
+                    self.cache.set_negative(cache_key, error)
+                return error
 
             data = response.json()
 
@@ -165,13 +157,11 @@ class ProductionMPLookup:
         """Get MP details from comprehensive database"""
         cache_key = f"mp_{constituency_name}"
 
-        # Check cache first
-        if cache_key in self.cache:
-            cached_data = self.cache[cache_key]
-            cache_time = datetime.fromisoformat(cached_data.get('cached_at', '2000-01-01'))
-            if (datetime.now() - cache_time).total_seconds() < 86400:  # 24 hours
-                print(f"📋 Using cached MP data for {constituency_name}")
-                return cached_data
+        # Check cache first (entries expire after 24 hours)
+        cached_data = self.cache.get(cache_key)
+        if cached_data:
+            print(f"📋 Using cached MP data for {constituency_name}")
+            return cached_data
 
         print(f"🔍 Looking up MP for {constituency_name}...")
 
@@ -327,7 +317,7 @@ def main():
 
     if sys.argv[1] == "--export":
         lookup.export_mp_data_for_web()
-        lookup.save_cache()
+        lookup.report_cache()
         return
 
     postcode = sys.argv[1]
@@ -358,8 +348,7 @@ def main():
             print(f"🏛️ Constituency: {result['constituency']}")
         print(f"⚠️ Failed at: {result['step']}")
 
-    # Save cache
-    lookup.save_cache()
+    lookup.report_cache()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,70 @@
+"""
+Thread-safe rate limiting shared by concurrent API workers.
+A token bucket caps the request rate and a semaphore per host caps the
+number of requests in flight, so a worker pool stays inside an API's limits
+however many threads are used.
+"""
+import time
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+class TokenBucket:
+    """Token bucket refilled continuously at rate tokens per second"""
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """Take tokens if available; otherwise return the seconds to wait"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        """Block until tokens are available"""
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+class HostRateLimiter:
+    """Per-host token buckets and concurrency caps"""
+    def __init__(self, rate: float = 5.0, max_concurrent: int = 4, burst: Optional[float] = None,
+                 host_rates: Optional[Dict[str, float]] = None):
+        self.rate = rate
+        self.max_concurrent = max_concurrent
+        self.burst = burst
+        self.host_rates = host_rates or {}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def _host_state(self, host: str):
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.host_rates.get(host, self.rate), self.burst)
+                self._slots[host] = threading.BoundedSemaphore(self.max_concurrent)
+            return self._buckets[host], self._slots[host]
+
+    @contextmanager
+    def slot(self, url: str):
+        """Hold a concurrency slot and a rate token for one request to url's host"""
+        bucket, semaphore = self._host_state(urlparse(url).netloc or url)
+        with semaphore:
+            bucket.acquire()
+            yield
@@ -6,9 +6,9 @@ echo ======================================================
 :loop
 echo.
 echo 📅 %date% %time%
-echo 🔄 Running news update...
-python fetch_news.py
+echo 🔄 Starting news updates (model stays loaded between runs)...
+python fetch_news.py --watch 300
 echo.
-echo 💤 Waiting 5 minutes before next update...
+echo ⚠️ News fetcher stopped; restarting in 5 minutes...
 timeout /t 300 /nobreak
 goto loop
@@ -13,9 +13,28 @@ import time
 import re
 from datetime import datetime, timedelta
 import os
-from typing import Dict, List, Optional, Set
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait
+from typing import Dict, List, Optional, Set, Tuple
 import logging
 from pathlib import Path
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlencode
+
+# Allow importing the shared modules from the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mp_store import MPDatabaseStore
+from scripts.build_mp_dataset import rebuild_beside
+from rate_limiter import HostRateLimiter
+import json_io
+
+try:
+    from scripts.twfy_adapter import TheyWorkForYouAdapter
+except ImportError:
+    # The adapter needs the optional ratelimit package
+    TheyWorkForYouAdapter = None
 
 # Configure logging
 logging.basicConfig(
@@ -27,72 +46,144 @@ logging.basicConfig(
     ]
 )
 
+class _PatternNode:
+    __slots__ = ('children', 'constituencies')
+
+    def __init__(self):
+        self.children: Dict[str, '_PatternNode'] = {}
+        self.constituencies: Set[str] = set()
+
+class PostcodePatternTrie:
+    """Prefix trie over postcode patterns.
+
+    Every node keeps the constituencies of all patterns beneath it, so a prefix
+    query costs O(len(prefix)) to walk plus the size of the result.
+    """
+    def __init__(self):
+        self.root = _PatternNode()
+
+    def insert(self, pattern: str, constituency: str) -> None:
+        node = self.root
+        for char in pattern:
+            node = node.children.setdefault(char, _PatternNode())
+            node.constituencies.add(constituency)
+
+    def find(self, prefix: str) -> Set[str]:
+        """Constituencies of every pattern starting with prefix"""
+        node = self.root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return set()
+        # Copy so callers can iterate while other requests insert
+        return set(node.constituencies)
+
 class AutomatedMPUpdater:
-    def __init__(self, database_path: str = "data/mp_database.json", twfy_api_key: Optional[str] = None):
+    def __init__(self, database_path: str = "data/mp_database.json", twfy_api_key: Optional[str] = None,
+                 workers: int = 8, rate: float = 5.0, max_per_host: int = 4, revalidate_hours: float = 24,
+                 refresh_workers: int = 2):
         self.database_path = Path(database_path)
         self.database_path.parent.mkdir(parents=True, exist_ok=True)
+        self.workers = max(1, workers)
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'GovWhiz/2.0 Automated MP Database Updater'
         })
-        self.postcode_patterns = {}
+        # Keep a pooled connection per worker so the refresh pool never waits on the pool itself
+        adapter = HTTPAdapter(pool_maxsize=self.workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        # Shared by every worker thread: requests per second and in-flight requests per host
+        self.limiter = HostRateLimiter(rate=rate, max_concurrent=max_per_host)
+        # How long a stored MP record is served before process_postcode revalidates it
+        self.revalidate_after = timedelta(hours=revalidate_hours)
+        # Stale records are served immediately and refreshed here, one refresh per constituency
+        self._revalidator = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix="mp-revalidate")
+        self._revalidating: Dict[str, Future] = {}
+        self._revalidating_lock = threading.Lock()
+        self._not_modified = 0
+        self._counter_lock = threading.Lock()
+        self.pattern_index = PostcodePatternTrie()
         
         # Initialize TheyWorkForYou adapter
-        self.twfy = TheyWorkForYouAdapter(twfy_api_key)
+        self.twfy = TheyWorkForYouAdapter(twfy_api_key) if TheyWorkForYouAdapter else None
         
+        # Constituencies, patterns and update status live in SQLite next to the JSON file
+        self.store = MPDatabaseStore(str(self.database_path.with_suffix(".db")))
         self.load_database()
-        
-        # Ensure all required database sections exist
-        if "constituencies" not in self.database:
-            self.database["constituencies"] = {}
-        if "postcode_patterns" not in self.database:
-            self.database["postcode_patterns"] = {}
-        if "update_status" not in self.database:
-            self.database["update_status"] = {
-                "last_full_update": None,
-                "failed_constituencies": [],
-                "last_error": None
-            }
+
+        for pattern, constituency in self.store.iter_patterns():
+            self.pattern_index.insert(pattern, constituency)
 
     def load_database(self) -> None:
-        """Load or initialize the MP database"""
+        """Initialize the store, importing the legacy JSON database on first run"""
+        if not self.store.is_empty():
+            return
         try:
+            database = {}
             if self.database_path.exists():
                 with open(self.database_path, 'r', encoding='utf-8') as f:
-                    self.database = json.load(f)
-            else:
-                self.database = {
-                    "version": "2025.1",
-                    "last_updated": datetime.now().isoformat(),
-                    "constituencies": {},
-                    "postcode_patterns": {},
-                    "update_status": {
-                        "last_full_update": None,
-                        "failed_constituencies": [],
-                        "last_error": None
-                    }
-                }
+                    database = json.load(f)
+            self.store.import_json(database)
         except Exception as e:
             logging.error(f"Error loading database: {e}")
             raise
 
     def save_database(self) -> None:
-        """Save the current state of the database"""
+        """Export the store into the JSON database read by the lookup services.
+
+        Individual updates are already committed to SQLite; this only refreshes
+        the sections the updater owns and leaves other keys (postcode_map etc.) intact.
+        """
         try:
-            self.database["last_updated"] = datetime.now().isoformat()
-            with open(self.database_path, 'w', encoding='utf-8') as f:
-                json.dump(self.database, f, indent=2, ensure_ascii=False)
+            self.store.touch()
+            database = json_io.load_file(str(self.database_path), {})
+            database.update(self.store.export_json())
+            json_io.dump_file(str(self.database_path), database, indent=True)
             logging.info(f"Database saved successfully to {self.database_path}")
+            if rebuild_beside(str(self.database_path)):
+                logging.info("Rebuilt the compiled MP dataset")
         except Exception as e:
             logging.error(f"Error saving database: {e}")
             raise
 
+    def _get(self, url: str, **kwargs) -> requests.Response:
+        """GET through the shared per-host rate limiter"""
+        with self.limiter.slot(url):
+            return self.session.get(url, **kwargs)
+
+    def _fetch_json(self, url: str, params: Optional[Dict] = None, timeout: int = 10):
+        """GET JSON with a conditional request when validators are stored.
+
+        A 304 response returns the body stored with the validators, so callers
+        always get the current document. Raises for other error statuses.
+        """
+        key = f"{url}?{urlencode(sorted(params.items()))}" if params else url
+        cached = self.store.get_validator(key)
+        headers = {}
+        if cached:
+            if cached["etag"]:
+                headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"]:
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        response = self._get(url, params=params, headers=headers, timeout=timeout)
+        if response.status_code == 304 and cached:
+            with self._counter_lock:
+                self._not_modified += 1
+            return cached["body"]
+        response.raise_for_status()
+
+        data = response.json()
+        self.store.set_validator(key, response.headers.get("ETag"), response.headers.get("Last-Modified"), data)
+        return data
+
     def get_constituency_from_postcode(self, postcode: str) -> Optional[Dict]:
         """Get constituency information from a postcode using PostcodesIO API"""
         try:
             clean_postcode = re.sub(r'\s+', '', postcode.upper())
             url = f"https://api.postcodes.io/postcodes/{clean_postcode}"
-            response = self.session.get(url, timeout=10)
+            response = self._get(url, timeout=10)
             response.raise_for_status()
             data = response.json()
 
@@ -108,15 +199,69 @@ class AutomatedMPUpdater:
             logging.error(f"Error getting constituency for postcode {postcode}: {e}")
             return None
 
+    def get_member_contact(self, mp_id, constituency: str) -> Tuple[Dict, Dict]:
+        """Fetch a member's contact details and social media links"""
+        contact_data = {}
+        social_links = {}
+        try:
+            # Fetch contact details
+            contact_value = self._fetch_json(f"https://members-api.parliament.uk/api/Members/{mp_id}/Contact").get("value", {})
+            # The API returns a list of addresses; keep the legacy dict shape
+            if isinstance(contact_value, list):
+                contact_data = {
+                    "email": next((c.get("email") for c in contact_value if c.get("email")), None),
+                    "phone": next((c.get("phone") for c in contact_value if c.get("phone")), None),
+                    "website": next((c.get("website") for c in contact_value if c.get("website")), None),
+                    "addresses": [{"address": c.get("line1", "")} for c in contact_value if c.get("line1")]
+                }
+            else:
+                contact_data = contact_value or {}
+        except Exception as e:
+            logging.warning(f"Could not fetch contact data for {constituency}: {e}")
+
+        try:
+            # Fetch social media links
+            social_json = self._fetch_json(f"https://members-api.parliament.uk/api/Members/{mp_id}/SocialLinks")
+            social_links = {
+                link["type"].lower(): link["value"]
+                for link in social_json.get("value", [])
+                if isinstance(link, dict) and link.get("type") and link.get("value")
+            }
+        except Exception as e:
+            logging.warning(f"Could not fetch social media data for {constituency}: {e}")
+        return contact_data, social_links
+
+    def build_mp_info(self, mp_data: Dict, constituency: str, contact_data: Dict, social_links: Dict) -> Dict:
+        """Build the stored MP profile from a Members API member record"""
+        mp_id = mp_data["id"]
+        party = mp_data.get("latestParty") or {}
+        membership = mp_data.get("latestHouseMembership") or {}
+        status = membership.get("membershipStatus") or {}
+
+        return {
+            "name": mp_data["nameDisplayAs"],
+            "party": party.get("name", "Unknown"),
+            "party_color": party.get("backgroundColour"),
+            "constituency": constituency,
+            "member_id": str(mp_id),
+            "email": contact_data.get("email") or f"{mp_data['nameDisplayAs'].lower().replace(' ', '.')}@parliament.uk",
+            "phone": contact_data.get("phone") or "020 7219 3000",
+            "website": contact_data.get("website") or f"https://members.parliament.uk/member/{mp_id}",
+            "address": next((a.get("address", "") for a in contact_data.get("addresses", [])), ""),
+            "social_media": social_links,
+            "image": mp_data.get("thumbnailUrl", ""),
+            "gender": mp_data.get("gender", ""),
+            "status": status.get("statusDescription", "Current Member"),
+            "last_updated": datetime.now().isoformat()
+        }
+
     def get_mp_details(self, constituency: str) -> Optional[Dict]:
         """Get MP details from the Parliament API with improved error handling"""
         try:
             # Search for constituency
             search_url = "https://members-api.parliament.uk/api/Location/Constituency/Search"
             params = {"searchText": constituency, "skip": "0", "take": "1"}
-            response = self.session.get(search_url, params=params, timeout=10)
-            response.raise_for_status()
-            search_data = response.json()
+            search_data = self._fetch_json(search_url, params=params)
 
             if not search_data.get("items"):
                 logging.warning(f"No constituency found: {constituency}")
@@ -130,74 +275,8 @@ class AutomatedMPUpdater:
                 return None
 
             mp_data = current_rep["member"]["value"]
-            mp_id = mp_data["id"]            # Fetch additional MP information
-            contact_response = None
-            social_response = None
-            contact_data = {}
-            social_links = {}
-            
-            try:
-                # Fetch contact details
-                contact_url = f"https://members-api.parliament.uk/api/Members/{mp_id}/Contact"
-                contact_response = self.session.get(contact_url, timeout=10)
-                if contact_response.ok:
-                    try:
-                        contact_json = contact_response.json()
-                        contact_data = contact_json.get("value", {})
-                    except Exception as e:
-                        logging.warning(f"Error parsing contact data for {constituency}: {e}")
-                else:
-                    logging.warning(f"Could not fetch contact data for {constituency}: {contact_response.status_code}")
-
-                # Fetch social media links
-                social_url = f"https://members-api.parliament.uk/api/Members/{mp_id}/SocialLinks"
-                social_response = self.session.get(social_url, timeout=10)
-                if social_response.ok:
-                    try:
-                        social_json = social_response.json()
-                        social_links = {
-                            link["type"].lower(): link["value"]
-                            for link in social_json.get("value", [])
-                            if isinstance(link, dict) and "type" in link and "value" in link
-                        }
-                    except Exception as e:
-                        logging.warning(f"Error parsing social media data for {constituency}: {e}")
-                else:
-                    logging.warning(f"Could not fetch social media data for {constituency}: {social_response.status_code}")
-            except Exception as e:
-                logging.warning(f"Error fetching additional MP data for {constituency}: {e}")# Process social media links
-            social_links = {}
-            if social_response and social_response.ok:
-                try:
-                    social_json = social_response.json()
-                    if social_json and isinstance(social_json.get("value"), list):
-                        for link in social_json["value"]:
-                            if link.get("type") and link.get("value"):
-                                social_links[link["type"].lower()] = link["value"]
-                except Exception as e:
-                    logging.warning(f"Error parsing social media data for {constituency}: {e}")# Build comprehensive MP profile
-            party = mp_data.get("latestParty", {})
-            membership = mp_data.get("latestHouseMembership", {})
-            status = membership.get("membershipStatus", {})
-            
-            mp_info = {
-                "name": mp_data["nameDisplayAs"],
-                "party": party.get("name", "Unknown"),
-                "party_color": party.get("backgroundColour"),
-                "constituency": constituency_data["name"],
-                "member_id": str(mp_id),
-                "email": contact_data.get("email") or f"{mp_data['nameDisplayAs'].lower().replace(' ', '.')}@parliament.uk",
-                "phone": contact_data.get("phone") or "020 7219 3000",
-                "website": contact_data.get("website") or f"https://members.parliament.uk/member/{mp_id}",
-                "address": next((a.get("address", "") for a in contact_data.get("addresses", [])), ""),
-                "social_media": social_links,
-                "image": mp_data.get("thumbnailUrl", ""),
-                "gender": mp_data.get("gender", ""),
-                "status": status.get("statusDescription", "Current Member"),
-                "last_updated": datetime.now().isoformat()
-            }
-
-            return mp_info
+            contact_data, social_links = self.get_member_contact(mp_data["id"], constituency)
+            return self.build_mp_info(mp_data, constituency_data["name"], contact_data, social_links)
 
         except requests.exceptions.RequestException as e:
             logging.error(f"Network error getting MP details for {constituency}: {e}")
@@ -206,44 +285,136 @@ class AutomatedMPUpdater:
             logging.error(f"Error getting MP details for {constituency}: {e}")
             return None
 
+    def _fetch_members_page(self, skip: int, take: int) -> Dict:
+        return self._fetch_json(
+            "https://members-api.parliament.uk/api/Members/Search",
+            params={"house": "Commons", "IsCurrentMember": "true", "skip": skip, "take": take},
+            timeout=30
+        )
+
+    def fetch_current_members(self, take: int = 100) -> Dict[str, Dict]:
+        """Download every current Commons member, keyed by constituency.
+
+        The first page gives totalResults; the remaining pages are fetched in
+        parallel. Paging follows the page size the API actually returned, in
+        case it caps take.
+        """
+        first = self._fetch_members_page(0, take)
+        items = list(first.get("items", []))
+        total = first.get("totalResults", len(items))
+        page_size = len(items)
+
+        if page_size and total > page_size:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                pages = executor.map(lambda skip: self._fetch_members_page(skip, page_size),
+                                     range(page_size, total, page_size))
+                for page in pages:
+                    items.extend(page.get("items", []))
+
+        members = {}
+        for item in items:
+            member = item.get("value") or {}
+            constituency = (member.get("latestHouseMembership") or {}).get("membershipFrom")
+            if member.get("id") is not None and constituency:
+                members[constituency] = member
+        logging.info(f"Downloaded {len(members)} current members ({len(items)} of {total} results)")
+        return members
+
     def update_postcode_pattern(self, pattern: str, constituency: str) -> None:
         """Update the postcode pattern mapping"""
-        if pattern not in self.database["postcode_patterns"]:
-            self.database["postcode_patterns"][pattern] = set()
-        self.database["postcode_patterns"][pattern].add(constituency)
+        if self.store.add_pattern(pattern, constituency):
+            self.pattern_index.insert(pattern, constituency)
+
+    def _revalidate(self, constituency: str, pattern: str) -> Optional[Dict]:
+        """Background task: refetch a stale MP record and store it if it changed.
+
+        On failure the stale record is kept and the next request retries.
+        """
+        try:
+            mp_info = self.get_mp_details(constituency)
+            if not mp_info:
+                logging.warning(f"Background refresh of {constituency} failed; serving stored record")
+                return None
+            change = self.store.sync_constituency(constituency, mp_info)
+            if change:
+                self.store.touch()
+                logging.info(f"Background refresh {change['change']} {constituency}: {', '.join(change['fields'])}")
+            self.update_postcode_pattern(pattern, constituency)
+            return mp_info
+        except Exception as e:
+            logging.error(f"Error refreshing {constituency} in the background: {e}")
+            return None
+        finally:
+            with self._revalidating_lock:
+                self._revalidating.pop(constituency, None)
+
+    def revalidate_in_background(self, constituency: str, pattern: str) -> Future:
+        """Queue a refresh of constituency unless one is already in flight"""
+        with self._revalidating_lock:
+            future = self._revalidating.get(constituency)
+            if future is None:
+                # The task's cleanup takes this lock, so it cannot finish before it is registered
+                future = self._revalidator.submit(self._revalidate, constituency, pattern)
+                self._revalidating[constituency] = future
+            return future
+
+    def wait_for_revalidation(self, timeout: Optional[float] = None) -> None:
+        """Block until the queued background refreshes finish"""
+        with self._revalidating_lock:
+            pending = list(self._revalidating.values())
+        wait(pending, timeout=timeout)
+
+    def freshness(self, checked_at: Optional[str], revalidating: bool = False) -> Dict:
+        """Freshness metadata for a served MP record"""
+        age = (datetime.now() - datetime.fromisoformat(checked_at)).total_seconds() if checked_at else None
+        return {
+            "status": "stale" if age is None or age > self.revalidate_after.total_seconds() else "fresh",
+            "checked_at": checked_at,
+            "age_seconds": int(age) if age is not None else None,
+            "max_age_seconds": int(self.revalidate_after.total_seconds()),
+            "revalidating": revalidating
+        }
 
     def process_postcode(self, postcode: str, force_update: bool = False) -> Dict:
-        """Process a postcode and update the database"""
+        """Process a postcode and update the database.
+
+        A stored MP record is served immediately. Once it is older than
+        revalidate_after it is still served (stale-while-revalidate) and a
+        background refresh is queued; only a missing record or force_update
+        waits on the Parliament API. The response's "freshness" says which.
+        """
         try:
             constituency_info = self.get_constituency_from_postcode(postcode)
             if not constituency_info:
                 return {"success": False, "error": "Could not find constituency"}
 
             constituency = constituency_info["constituency"]
-            
-            # Check if we need to update MP info
-            current_mp = self.database["constituencies"].get(constituency, {})
-            needs_update = force_update or not current_mp or (
-                "last_updated" in current_mp and
-                datetime.fromisoformat(current_mp["last_updated"]) < datetime.now() - timedelta(days=1)
-            )
+            current_mp = self.store.get_constituency(constituency) or {}
+            checked_at = self.store.checked_at(constituency)
 
-            if needs_update:
+            if force_update or not current_mp:
                 mp_info = self.get_mp_details(constituency)
-                if mp_info:
-                    self.database["constituencies"][constituency] = mp_info
-                    self.update_postcode_pattern(constituency_info["pattern"], constituency)
-                    self.save_database()
-                else:
+                if not mp_info:
                     return {"success": False, "error": "Could not fetch MP details"}
+                if self.store.sync_constituency(constituency, mp_info):
+                    self.store.touch()
+                else:
+                    mp_info = current_mp
+                self.update_postcode_pattern(constituency_info["pattern"], constituency)
+                freshness = self.freshness(self.store.checked_at(constituency))
             else:
                 mp_info = current_mp
+                freshness = self.freshness(checked_at)
+                if freshness["status"] == "stale":
+                    self.revalidate_in_background(constituency, constituency_info["pattern"])
+                    freshness["revalidating"] = True
 
             return {
                 "success": True,
                 "constituency": constituency,
                 "mp": mp_info,
-                "postcode_pattern": constituency_info["pattern"]
+                "postcode_pattern": constituency_info["pattern"],
+                "freshness": freshness
             }
 
         except Exception as e:
@@ -252,87 +423,154 @@ class AutomatedMPUpdater:
 
     def find_mp_by_pattern(self, pattern: str) -> List[Dict]:
         """Find MPs by postcode pattern"""
-        pattern = pattern.upper()
-        matching_constituencies = set()
-        
-        # Check direct pattern matches
-        if pattern in self.database["postcode_patterns"]:
-            matching_constituencies.update(self.database["postcode_patterns"][pattern])
-        
-        # Check for partial matches
-        for db_pattern in self.database["postcode_patterns"]:
-            if db_pattern.startswith(pattern):
-                matching_constituencies.update(self.database["postcode_patterns"][db_pattern])
+        pattern = re.sub(r'\s+', '', pattern).upper()
+        if not pattern:
+            return []
 
-        return [
-            {
-                "constituency": constituency,
-                "mp": self.database["constituencies"].get(constituency)
-            }
-            for constituency in matching_constituencies
-            if constituency in self.database["constituencies"]
-        ]
+        # Exact and partial matches both come from the pattern's trie node
+        matching_constituencies = self.pattern_index.find(pattern)
+
+        results = []
+        for constituency in matching_constituencies:
+            mp_info = self.store.get_constituency(constituency)
+            if mp_info:
+                results.append({"constituency": constituency, "mp": mp_info})
+        return results
+
+    def _refresh_constituency(self, constituency: str, member: Optional[Dict] = None) -> Optional[Dict]:
+        """Worker task: build one constituency's MP record.
+
+        With a member record from the bulk download only /Contact and
+        /SocialLinks are requested; otherwise fall back to a constituency search.
+        """
+        logging.info(f"Updating {constituency}...")
+        if member is None:
+            return self.get_mp_details(constituency)
+        contact_data, social_links = self.get_member_contact(member["id"], constituency)
+        return self.build_mp_info(member, constituency, contact_data, social_links)
 
-    def update_all_constituencies(self) -> Dict:
-        """Update information for all known constituencies"""
+    def _checkpoint(self, started: str, total: int, completed: List[str], failed: List[str]) -> None:
+        """Record refresh progress so an interrupted run can resume"""
+        self.store.set_status(refresh_checkpoint={
+            "started": started,
+            "total": total,
+            "completed": completed,
+            "failed": failed,
+            "updated_at": datetime.now().isoformat()
+        })
+
+    def update_all_constituencies(self, resume: bool = True, checkpoint_every: int = 25,
+                                  incremental: bool = True) -> Dict:
+        """Update information for all known constituencies.
+
+        Constituencies are refreshed concurrently by a pool of self.workers
+        threads sharing one rate limiter. Progress is checkpointed every
+        checkpoint_every results; with resume, constituencies refreshed by an
+        unfinished previous run are skipped and the ones it failed are retried.
+
+        In incremental mode requests are conditional on the stored validators
+        and records whose content is unchanged are not rewritten; the result's
+        "changes" lists the MPs that were added or updated. A full refresh
+        drops the validators and rewrites every record.
+        """
         start_time = datetime.now()
         updated = 0
+        unchanged = 0
         failed = 0
         errors = []
+        changes = []
+        failed_constituencies = []
+        self._not_modified = 0
         
         # Clear previous error list
-        self.database["update_status"]["failed_constituencies"] = []
+        self.store.set_status(failed_constituencies=[])
+        if not incremental:
+            self.store.clear_validators()
 
-        # Get initial list of constituencies from Parliament API
+        # Build the constituency list from the bulk member download
         try:
-            search_url = "https://members-api.parliament.uk/api/Location/Constituency/Search"
-            params = {"skip": "0", "take": "100"}  # Get up to 100 constituencies
-            response = self.session.get(search_url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-
-            constituencies = []
-            if data.get("items"):
-                constituencies = [item["value"]["name"] for item in data["items"]]
+            members = self.fetch_current_members()
+            constituencies = list(members)
             
-            # Add any constituencies we already know about
-            constituencies.extend(list(self.database["constituencies"].keys()))
-            constituencies = list(set(constituencies))  # Remove duplicates
+            # Add any constituencies we already know about (e.g. now vacant seats)
+            constituencies.extend(self.store.constituency_names())
+            constituencies = sorted(set(constituencies))  # Remove duplicates
             
-            logging.info(f"Found {len(constituencies)} constituencies to update")
+            checkpoint = self.store.get_status().get("refresh_checkpoint") if resume else None
+            # Only successes count as done; older checkpoints also listed failures there
+            earlier_failures = set(checkpoint.get("failed", [])) if checkpoint else set()
+            completed = [c for c in checkpoint["completed"] if c not in earlier_failures] if checkpoint else []
+            started = checkpoint["started"] if checkpoint else start_time.isoformat()
+            done = set(completed)
+            pending = [c for c in constituencies if c not in done]
+            if checkpoint:
+                logging.info(f"Resuming refresh from {started}: {len(completed)} already done")
+
+            processed = 0
+            logging.info(f"Found {len(constituencies)} constituencies to update, "
+                         f"{len(pending)} pending with {self.workers} workers")
             
-            for constituency in constituencies:
-                try:
-                    logging.info(f"Updating {constituency}...")
-                    mp_info = self.get_mp_details(constituency)
-                    if mp_info:
-                        self.database["constituencies"][constituency] = mp_info
-                        updated += 1
-                        logging.info(f"✓ Successfully updated {constituency}")
-                    else:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                futures = {executor.submit(self._refresh_constituency, c, members.get(c)): c for c in pending}
+                for future in as_completed(futures):
+                    constituency = futures[future]
+                    try:
+                        mp_info = future.result()
+                        if mp_info and not incremental:
+                            self.store.upsert_constituency(constituency, mp_info)
+                            updated += 1
+                            logging.info(f"✓ Successfully updated {constituency}")
+                        elif mp_info:
+                            change = self.store.sync_constituency(constituency, mp_info)
+                            if change:
+                                changes.append(change)
+                                updated += 1
+                                logging.info(f"✓ {change['change'].capitalize()} {constituency}: "
+                                             f"{', '.join(change['fields'])}")
+                            else:
+                                unchanged += 1
+                        else:
+                            failed += 1
+                            error_msg = f"No MP information found for {constituency}"
+                            errors.append(error_msg)
+                            failed_constituencies.append(constituency)
+                            logging.error(error_msg)
+                    except Exception as e:
                         failed += 1
-                        error_msg = f"No MP information found for {constituency}"
+                        error_msg = f"Error updating {constituency}: {str(e)}"
                         errors.append(error_msg)
-                        self.database["update_status"]["failed_constituencies"].append(constituency)
+                        failed_constituencies.append(constituency)
                         logging.error(error_msg)
-                    time.sleep(1)  # Rate limiting
-                except Exception as e:
-                    failed += 1
-                    error_msg = f"Error updating {constituency}: {str(e)}"
-                    errors.append(error_msg)
-                    self.database["update_status"]["failed_constituencies"].append(constituency)
-                    logging.error(error_msg)
-                    time.sleep(1)  # Rate limiting even on error
+
+                    # Failures are retried when a run resumes, so only successes count as completed
+                    if constituency not in failed_constituencies:
+                        completed.append(constituency)
+
+                    processed += 1
+                    if processed % checkpoint_every == 0:
+                        self._checkpoint(started, len(constituencies), completed, failed_constituencies)
+                        logging.info(f"Progress: {len(completed)}/{len(constituencies)} constituencies")
             
-            self.database["update_status"]["last_full_update"] = datetime.now().isoformat()
-            self.database["update_status"]["last_error"] = errors[-1] if errors else None
-            self.save_database()
+            self.store.set_status(
+                failed_constituencies=failed_constituencies,
+                last_full_update=datetime.now().isoformat(),
+                last_error=errors[-1] if errors else None,
+                last_changes=changes,
+                refresh_checkpoint=None
+            )
+            # Nothing to export when an incremental run found no changes
+            if changes or not incremental:
+                self.save_database()
 
             duration = datetime.now() - start_time
             return {
                 "success": True,
+                "incremental": incremental,
                 "updated": updated,
+                "unchanged": unchanged,
                 "failed": failed,
+                "not_modified_responses": self._not_modified,
+                "changes": changes,
                 "errors": errors,
                 "duration": str(duration),
                 "constituencies": constituencies
@@ -341,7 +579,7 @@ class AutomatedMPUpdater:
         except Exception as e:
             error_msg = f"Failed to get constituency list: {str(e)}"
             logging.error(error_msg)
-            self.database["update_status"]["last_error"] = error_msg
+            self.store.set_status(last_error=error_msg)
             self.save_database()
             return {
                 "success": False,
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Compare standard-library json with the json_io (orjson) path on our largest payloads.
+
+Payloads are built from the local data: the /api/constituencies list with
+ranked search results, a 10,000-postcode batch result set and the MP
+database file. Each is serialised by the Flask default provider, by the
+json_io provider and written to disk both ways.
+
+Usage:
+    python scripts/benchmark_json.py
+    python scripts/benchmark_json.py --repeat 50
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+# Allow running from the repository root or the scripts directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+import json_io
+from constituency_search import ConstituencySearchIndex
+from postcode_resolver import PostcodeResolver
+
+def build_payloads(resolver: PostcodeResolver) -> Dict[str, object]:
+    names = resolver.constituencies()
+    index = ConstituencySearchIndex(names, resolver.get_mp)
+    batch = []
+    for i in range(10000):
+        name = names[i % len(names)] if names else "Unknown"
+        batch.append({"postcode": f"M{i % 99 + 1} {i % 9 + 1}AA", "found": True, "constituency": name,
+                      "source": "local", "mp": resolver.get_mp(name)})
+    return {
+        "/api/constituencies": {"constituencies": names,
+                                "results": index.search("a", limit=len(names))},
+        "batch results (10k)": {"results": batch},
+        "mp_database.json": json_io.load_file(resolver.database_path, {})
+    }
+
+def best_of(repeat: int, func: Callable[[], object]) -> float:
+    """Fastest of repeat runs in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+def run(repeat: int) -> List[Dict]:
+    resolver = PostcodeResolver()
+    app = Flask(__name__)
+    default_provider = DefaultJSONProvider(app)
+    fast_provider = json_io.FastJSONProvider(app)
+    directory = tempfile.mkdtemp(prefix="json-benchmark-")
+    path = os.path.join(directory, "payload.json")
+
+    def stdlib_file(payload):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, indent=2, ensure_ascii=False)
+
+    rows = []
+    for name, payload in build_payloads(resolver).items():
+        with app.app_context():
+            rows.append({
+                "payload": name,
+                "bytes": len(json_io.dumps_bytes(payload)),
+                "flask_default_ms": best_of(repeat, lambda: default_provider.dumps(payload)),
+                "json_io_ms": best_of(repeat, lambda: fast_provider.dumps(payload)),
+                "file_indent_stdlib_ms": best_of(repeat, lambda: stdlib_file(payload)),
+                "file_compact_json_io_ms": best_of(repeat, lambda: json_io.dump_file(path, payload))
+            })
+    os.remove(path)
+    os.rmdir(directory)
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON serialisation of the largest payloads")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    print(f"Backend: {json_io.BACKEND}")
+    print(f"{'payload':<22}{'size':>10}{'flask json':>12}{'json_io':>10}{'speedup':>9}"
+          f"{'file std':>10}{'file io':>9}")
+    for row in run(args.repeat):
+        speedup = row["flask_default_ms"] / row["json_io_ms"] if row["json_io_ms"] else 0
+        print(f"{row['payload']:<22}{row['bytes'] / 1024:>8.0f}KB{row['flask_default_ms']:>10.2f}ms"
+              f"{row['json_io_ms']:>8.2f}ms{speedup:>8.1f}x{row['file_indent_stdlib_ms']:>8.2f}ms"
+              f"{row['file_compact_json_io_ms']:>7.2f}ms")
+
+if __name__ == "__main__":
+    main()
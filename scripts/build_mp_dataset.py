@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Compile the MP and postcode JSON files into the single memory-mapped dataset.
+
+MP records come from the Members API download (members.json, falling back to
+constituency_lookup.json) and the postcode tables from mp_database.json. The
+resolver maps the result at startup instead of parsing the JSON in every
+worker; rerun this after download_members.py or a district sweep.
+
+Usage:
+    python scripts/build_mp_dataset.py
+    python scripts/build_mp_dataset.py --output data/mp_dataset.bin
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional
+
+# Allow running from the repository root or the scripts directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mp_dataset import MPDataset, write_dataset
+from parse_all_mps import clean_member
+
+def load_json(path: str) -> Dict:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        print(f"⚠️ Could not load {path}: {e}")
+        return {}
+
+def load_mps(members_path: str, lookup_path: str) -> List[Dict]:
+    """Clean Members API records, or reuse the constituency lookup if there is no download"""
+    members = load_json(members_path).get("members", [])
+    if members:
+        return [clean_member(member) for member in members]
+    print(f"⚠️ No members in {members_path}; using {lookup_path}")
+    return [dict(mp, constituency=constituency)
+            for constituency, mp in load_json(lookup_path).get("constituencies", {}).items()]
+
+def build_dataset(members_path: str, lookup_path: str, database_path: str, output_path: str) -> Dict:
+    mps = load_mps(members_path, lookup_path)
+    database = load_json(database_path)
+    sources = {os.path.basename(path): int(os.path.getmtime(path))
+               for path in (members_path, lookup_path, database_path) if os.path.exists(path)}
+    return write_dataset(
+        output_path, mps,
+        postcode_map=database.get("postcode_map", {}),
+        exact_map=database.get("postcode_exact_map", {}),
+        sector_map=database.get("postcode_sector_map", {}),
+        split_districts=database.get("split_districts", []),
+        sources=sources
+    )
+
+def rebuild_beside(database_path: str) -> Optional[Dict]:
+    """Rebuild the dataset next to a just-saved database, if one has been built there.
+
+    The resolver ignores a dataset older than the database, so every save
+    path that rewrites mp_database.json calls this to keep it current.
+    """
+    directory = os.path.dirname(database_path)
+    output_path = os.path.join(directory, "mp_dataset.bin")
+    if not os.path.exists(output_path):
+        return None
+    return build_dataset(os.path.join(directory, "members.json"),
+                         os.path.join(directory, "constituency_lookup.json"), database_path, output_path)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile the MP dataset used by the postcode resolver")
+    parser.add_argument("--members", default="data/members.json", help="Members API download")
+    parser.add_argument("--lookup", default="data/constituency_lookup.json",
+                        help="Constituency lookup used when there is no members download")
+    parser.add_argument("--database", default="data/mp_database.json", help="Postcode mapping database")
+    parser.add_argument("--output", default="data/mp_dataset.bin", help="Dataset file to write")
+    args = parser.parse_args()
+
+    start = time.time()
+    meta = build_dataset(args.members, args.lookup, args.database, args.output)
+    counts = meta["counts"]
+    print(f"✅ Built dataset {meta['version']} in {time.time() - start:.2f}s: {counts['mps']} MPs, "
+          f"{counts['districts']} districts, {counts['exact']} exact postcodes, {counts['sectors']} sectors")
+    print(f"💾 Wrote {args.output} ({os.path.getsize(args.output) / 1024:.1f} KB, "
+          f"{counts['strings']} interned strings)")
+
+    # Read it back so a bad build fails here rather than in the service
+    dataset = MPDataset(args.output)
+    assert sum(1 for _ in dataset.mps()) == counts["mps"]
+    dataset.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Build the binary postcode index from a local ONS Postcode Directory (ONSPD) CSV.
+
+Every live postcode is packed into a fixed-width sorted record pointing at a
+Westminster constituency, so the lookup service can memory-map the file and
+answer full postcodes offline without calling postcodes.io.
+
+Usage:
+    python scripts/build_postcode_index.py ONSPD_FEB_2025_UK.csv \\
+        --names "Westminster Parliamentary Constituency names and codes UK as at 2024.csv"
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+from typing import Dict, List, Optional
+
+# Allow running from the repository root or the scripts directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from postcode_index import PostcodeIndex, postcode_key, write_index
+from postcode_hierarchy import PostcodeHierarchy
+
+POSTCODE_COLUMNS = ("pcds", "pcd", "pcd7", "pcd2")
+CONSTITUENCY_COLUMNS = ("pcon", "pcon24", "pcon24cd")
+
+def find_column(fieldnames: List[str], candidates, override: Optional[str] = None) -> str:
+    """Pick the first matching column name (case-insensitive)"""
+    lookup = {name.lower(): name for name in fieldnames}
+    if override:
+        if override.lower() not in lookup:
+            raise SystemExit(f"Column '{override}' not found in CSV header")
+        return lookup[override.lower()]
+    for candidate in candidates:
+        if candidate in lookup:
+            return lookup[candidate]
+    raise SystemExit(f"None of the columns {', '.join(candidates)} found in CSV header")
+
+def load_constituency_names(path: str) -> Dict[str, str]:
+    """Load a GSS code -> constituency name map (columns like PCON24CD, PCON24NM)"""
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.DictReader(f)
+        code_column = next(c for c in reader.fieldnames if c.upper().endswith("CD"))
+        name_column = next(c for c in reader.fieldnames if c.upper().endswith("NM"))
+        return {row[code_column]: row[name_column] for row in reader if row[code_column]}
+
+def is_pseudo_code(code: str) -> bool:
+    """ONSPD uses codes like L99999999 for postcodes outside any constituency"""
+    return not code or code.endswith("99999999")
+
+def build_index(onspd_path: str, output_path: str, names: Dict[str, str],
+                include_terminated: bool = False, postcode_column: Optional[str] = None,
+                constituency_column: Optional[str] = None) -> Dict:
+    """Stream the ONSPD CSV into the sorted binary index"""
+    constituency_ids: Dict[str, int] = {}
+    constituency_names: List[str] = []
+    records = []
+    skipped = 0
+
+    with open(onspd_path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.DictReader(f)
+        pc_col = find_column(reader.fieldnames, POSTCODE_COLUMNS, postcode_column)
+        pcon_col = find_column(reader.fieldnames, CONSTITUENCY_COLUMNS, constituency_column)
+        doterm_col = next((c for c in reader.fieldnames if c.lower() == "doterm"), None)
+
+        for row in reader:
+            code = row[pcon_col].strip()
+            key = postcode_key(row[pc_col])
+            if key is None or is_pseudo_code(code):
+                skipped += 1
+                continue
+            if doterm_col and row[doterm_col].strip() and not include_terminated:
+                skipped += 1
+                continue
+
+            if code not in constituency_ids:
+                constituency_ids[code] = len(constituency_names)
+                constituency_names.append(names.get(code, code))
+            records.append((key, constituency_ids[code]))
+
+            if len(records) % 500000 == 0:
+                print(f"📥 Read {len(records):,} postcodes...")
+
+    count = write_index(output_path, records, constituency_names)
+    return {
+        "postcodes": count,
+        "constituencies": len(constituency_names),
+        "skipped": skipped,
+        "unnamed": sum(1 for code in constituency_ids if code not in names)
+    }
+
+class IndexPairs:
+    """Re-iterable (postcode, constituency name) view over a PostcodeIndex"""
+    def __init__(self, index: PostcodeIndex):
+        self.index = index
+
+    def __iter__(self):
+        names = self.index.names
+        for key, constituency_id in self.index:
+            yield key, names[constituency_id]
+
+def build_hierarchy(index_path: str, output_path: str) -> PostcodeHierarchy:
+    """Derive the split-aware area/district/sector hierarchy from a built index"""
+    index = PostcodeIndex(index_path)
+    try:
+        hierarchy = PostcodeHierarchy.build(IndexPairs(index))
+        hierarchy.save(output_path)
+    finally:
+        index.close()
+    return hierarchy
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the binary postcode index from an ONSPD CSV")
+    parser.add_argument("onspd_csv", help="Path to the ONSPD CSV (Data/ONSPD_*_UK.csv)")
+    parser.add_argument("--names", help="CSV mapping constituency codes to names")
+    parser.add_argument("--output", default="data/postcode_index.bin", help="Output index path")
+    parser.add_argument("--hierarchy", nargs="?", const="data/postcode_hierarchy.json",
+                        help="Also write the split-aware hierarchy (default data/postcode_hierarchy.json)")
+    parser.add_argument("--include-terminated", action="store_true", help="Keep terminated postcodes")
+    parser.add_argument("--postcode-column", help="Override the postcode column name")
+    parser.add_argument("--constituency-column", help="Override the constituency code column name")
+    args = parser.parse_args()
+
+    names = load_constituency_names(args.names) if args.names else {}
+    if not names:
+        print("⚠️ No constituency names supplied; the index will store GSS codes")
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    start = time.time()
+    stats = build_index(args.onspd_csv, args.output, names, args.include_terminated,
+                        args.postcode_column, args.constituency_column)
+
+    print(f"✅ Indexed {stats['postcodes']:,} postcodes across {stats['constituencies']} constituencies")
+    print(f"   Skipped {stats['skipped']:,} rows, {stats['unnamed']} constituencies without names")
+    print(f"💾 Wrote {args.output} ({os.path.getsize(args.output) / 1024 / 1024:.1f} MB) "
+          f"in {time.time() - start:.1f}s")
+
+    if args.hierarchy:
+        hierarchy = build_hierarchy(args.output, args.hierarchy)
+        print(f"🌳 Wrote {args.hierarchy}: {len(hierarchy):,} entries, "
+              f"{len(hierarchy.split['district']):,} split districts, "
+              f"{len(hierarchy.split['sector']):,} split sectors")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Annotate a CSV of postcodes with constituency and MP.
+
+The input is streamed in chunks: each chunk is resolved from the local
+postcode index, the misses go to postcodes.io in bulk requests, and the
+enriched rows are appended to the output before the next chunk is read,
+so memory stays bounded however large the file is. Progress is
+checkpointed after every chunk and --resume continues from the last one.
+
+Usage:
+    python scripts/enrich_postcodes_csv.py supporters.csv supporters_enriched.csv
+    python scripts/enrich_postcodes_csv.py supporters.csv supporters_enriched.csv --resume
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from itertools import islice
+from typing import Dict, List, Optional
+
+from cachetools import LRUCache
+
+# Allow running from the repository root or the scripts directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch_postcode_lookup import BatchPostcodeLookup
+from postcode_resolver import PostcodeResolver, normalise_postcode
+
+OUTPUT_COLUMNS = ("constituency", "mp_name", "mp_party", "lookup_source")
+
+def find_postcode_column(fieldnames: List[str], override: Optional[str] = None) -> str:
+    if override:
+        if override not in fieldnames:
+            raise SystemExit(f"Column '{override}' not found in CSV header")
+        return override
+    for name in fieldnames:
+        if "postcode" in name.lower():
+            return name
+    raise SystemExit("No postcode column found; use --postcode-column")
+
+def load_checkpoint(path: str) -> Optional[Dict]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+def save_checkpoint(path: str, checkpoint: Dict) -> None:
+    temp_path = path + ".tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f)
+    os.replace(temp_path, path)
+
+def enrich_rows(rows: List[Dict], column: str, lookup: BatchPostcodeLookup, stats: Dict) -> None:
+    """Resolve one chunk of rows in place"""
+    results = {
+        normalise_postcode(result["postcode"]): result
+        for result in lookup.resolve(row.get(column, "") for row in rows)
+    }
+    for row in rows:
+        result = results.get(normalise_postcode(row.get(column, ""))) or {}
+        mp = result.get("mp") or {}
+        row["constituency"] = result.get("constituency", "")
+        row["mp_name"] = mp.get("name", "")
+        row["mp_party"] = mp.get("party", "")
+        row["lookup_source"] = result.get("source") or result.get("error", "")
+        stats["found" if result.get("found") else "not_found"] += 1
+
+def enrich_csv(input_path: str, output_path: str, lookup: BatchPostcodeLookup,
+               checkpoint_path: Optional[str] = None, resume: bool = False,
+               chunk_size: int = 1000, postcode_column: Optional[str] = None) -> Dict:
+    """Stream input_path to output_path with the enrichment columns appended"""
+    checkpoint_path = checkpoint_path or output_path + ".checkpoint.json"
+    checkpoint = load_checkpoint(checkpoint_path) if resume else None
+    if checkpoint and checkpoint.get("input") != os.path.abspath(input_path):
+        raise SystemExit(f"Checkpoint {checkpoint_path} belongs to {checkpoint.get('input')}")
+
+    stats = {"rows": 0, "found": 0, "not_found": 0}
+    with open(input_path, 'r', encoding='utf-8-sig', newline='') as infile:
+        reader = csv.DictReader(infile)
+        column = find_postcode_column(reader.fieldnames or [], postcode_column)
+        fieldnames = list(reader.fieldnames) + [c for c in OUTPUT_COLUMNS if c not in reader.fieldnames]
+
+        if checkpoint:
+            # Drop anything written after the last checkpoint, then skip the rows it covers
+            with open(output_path, 'r+b') as outfile:
+                outfile.truncate(checkpoint["output_offset"])
+            for _ in islice(reader, checkpoint["rows_done"]):
+                pass
+            stats = checkpoint["stats"]
+            print(f"↩️ Resuming after {checkpoint['rows_done']:,} rows")
+
+        with open(output_path, 'a' if checkpoint else 'w', encoding='utf-8', newline='') as outfile:
+            writer = csv.DictWriter(outfile, fieldnames=fieldnames)
+            if not checkpoint:
+                writer.writeheader()
+
+            while True:
+                rows = list(islice(reader, chunk_size))
+                if not rows:
+                    break
+                enrich_rows(rows, column, lookup, stats)
+                writer.writerows(rows)
+                outfile.flush()
+                os.fsync(outfile.fileno())
+
+                stats["rows"] += len(rows)
+                save_checkpoint(checkpoint_path, {
+                    "input": os.path.abspath(input_path),
+                    "rows_done": stats["rows"],
+                    "output_offset": outfile.tell(),
+                    "stats": stats
+                })
+                print(f"📝 {stats['rows']:,} rows enriched ({stats['found']:,} found)")
+
+    os.remove(checkpoint_path)
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description="Add constituency and MP columns to a CSV of postcodes")
+    parser.add_argument("input", help="Input CSV with a postcode column")
+    parser.add_argument("output", help="Output CSV path")
+    parser.add_argument("--postcode-column", help="Name of the postcode column (default: first containing 'postcode')")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Rows resolved and written per step")
+    parser.add_argument("--checkpoint", help="Checkpoint path (default: OUTPUT.checkpoint.json)")
+    parser.add_argument("--resume", action="store_true", help="Continue an interrupted run from its checkpoint")
+    parser.add_argument("--no-remote", action="store_true", help="Only use local data; never call postcodes.io")
+    parser.add_argument("--memo-size", type=int, default=50000,
+                        help="Remote results remembered for repeated postcodes")
+    args = parser.parse_args()
+
+    resolver = PostcodeResolver()
+    lookup = BatchPostcodeLookup(resolver, cache=LRUCache(maxsize=args.memo_size), remote=not args.no_remote)
+
+    start = time.time()
+    stats = enrich_csv(args.input, args.output, lookup, args.checkpoint, args.resume,
+                       args.chunk_size, args.postcode_column)
+    print(f"✅ Enriched {stats['rows']:,} rows in {time.time() - start:.1f}s: "
+          f"{stats['found']:,} found, {stats['not_found']:,} not found")
+    print(f"💾 Wrote {args.output}")
+
+if __name__ == "__main__":
+    main()
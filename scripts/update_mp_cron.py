@@ -32,11 +32,17 @@ def update_mp_database(args) -> None:
     logging.info("Starting automated MP database update...")
 
     try:
-        updater = AutomatedMPUpdater(args.database)
-        result = updater.update_all_constituencies()
+        updater = AutomatedMPUpdater(args.database, workers=args.workers, rate=args.rate,
+                                     max_per_host=args.max_per_host)
+        result = updater.update_all_constituencies(resume=not args.no_resume, incremental=not args.full)
         
         logging.info("Update completed:")
         logging.info(f"Updated: {result['updated']} MPs")
+        if result.get('incremental'):
+            logging.info(f"Unchanged: {result['unchanged']} MPs "
+                         f"({result['not_modified_responses']} not-modified responses)")
+            for change in result.get('changes', []):
+                logging.info(f"  {change['change']}: {change['constituency']} ({', '.join(change['fields'])})")
         logging.info(f"Failed: {result['failed']} MPs")
         logging.info(f"Duration: {result['duration']}")
         
@@ -55,6 +61,34 @@ if __name__ == "__main__":
         default="data/mp_database.json",
         help="Path to the MP database file"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=8,
+        help="Number of concurrent refresh workers"
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=5.0,
+        help="Maximum requests per second to each API host"
+    )
+    parser.add_argument(
+        "--max-per-host",
+        type=int,
+        default=4,
+        help="Maximum requests in flight to each API host"
+    )
+    parser.add_argument(
+        "--no-resume",
+        action="store_true",
+        help="Ignore the checkpoint of an interrupted refresh and start over"
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Ignore stored validators and rewrite every MP record"
+    )
     parser.add_argument(
         "--log-file",
         default="logs/mp_updater.log",
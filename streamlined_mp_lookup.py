@@ -5,7 +5,7 @@ Clean, simple approach combining postcode → constituency → MP lookup
 Based on your elegant function design
 """
 
-import requests
+import http_client
 import urllib.parse
 import json
 import os
@@ -17,7 +17,7 @@ def get_constituency(postcode):
     url = f"https://mapit.mysociety.org/postcode/{postcode.replace(' ', '')}"
     
     try:
-        response = requests.get(url, timeout=10)
+        response = http_client.get(url)
         
         if response.status_code != 200:
             return {"error": "Invalid postcode or API failed."}
@@ -45,7 +45,7 @@ def get_mp_by_constituency(constituency_name):
             'Accept-Language': 'en-US,en;q=0.9'
         }
         
-        response = requests.get(url, headers=headers, timeout=15)
+        response = http_client.get(url, headers=headers)
         
         if response.status_code != 200:
             # Fallback to curated data if Parliament API is blocked
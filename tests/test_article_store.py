@@ -0,0 +1,103 @@
+"""
+Test suite for the persistent article store
+"""
+import json
+import pytest
+from article_store import ArticleStore, article_id, normalise_url
+
+def make_article(title, link, source_key="bbc_politics", source="BBC Politics",
+                 published="Mon, 06 Jan 2025 10:00:00 GMT", ai_summary=None):
+    return {"title": title, "link": link, "original_summary": f"{title}.", "published": published,
+            "source": source, "source_key": source_key, "category": "Politics", "ai_summary": ai_summary}
+
+@pytest.fixture
+def store(tmp_path):
+    return ArticleStore(str(tmp_path / "articles.db"))
+
+def test_urls_normalise_to_one_id():
+    """Test tracking parameters, scheme, www. and trailing slashes don't change an article's id"""
+    assert normalise_url("http://www.bbc.co.uk/news/politics-1/?at_medium=RSS&utm_source=x#top") == \
+        "https://bbc.co.uk/news/politics-1"
+    assert article_id({"link": "https://bbc.co.uk/news/politics-1"}) == \
+        article_id({"link": "http://www.bbc.co.uk/news/politics-1/?at_campaign=rss"})
+
+def test_linkless_articles_keep_their_guids(store):
+    """Test articles without links are told apart by their feed GUIDs"""
+    first = dict(make_article("Written statement: fuel duty", ""), id="urn:statement:1")
+    second = dict(make_article("Written statement: rail fares", ""), id="urn:statement:2")
+    assert article_id(first) != article_id(second)
+    assert store.merge([first, second])["added"] == 2
+
+def test_merge_is_incremental(store):
+    """Test a second merge only refreshes stored articles and keeps their summaries"""
+    first = [make_article("Budget vote tonight", "https://bbc.co.uk/news/1"),
+             make_article("PM faces questions", "https://bbc.co.uk/news/2",
+                          published="Tue, 07 Jan 2025 12:00:00 GMT")]
+    assert store.merge(first) == {"added": 2, "seen": 0, "duplicate": 0}
+
+    second = [make_article("Budget vote tonight", "http://www.bbc.co.uk/news/1?at_medium=RSS", ai_summary="Vote."),
+              make_article("New bill published", "https://bbc.co.uk/news/3",
+                           published="Wed, 08 Jan 2025 09:00:00 GMT")]
+    assert store.merge(second) == {"added": 1, "seen": 1, "duplicate": 0}
+
+    latest = store.latest()
+    assert [a["title"] for a in latest] == ["New bill published", "PM faces questions", "Budget vote tonight"]
+    assert latest[2]["ai_summary"] == "Vote."
+    assert store.merge([make_article("Budget vote tonight", "https://bbc.co.uk/news/1")]) == \
+        {"added": 0, "seen": 1, "duplicate": 0}
+    assert store.get(second[0])["ai_summary"] == "Vote."
+
+def test_syndicated_copies_are_merged(store):
+    """Test a near-identical headline from another source is recorded on the original"""
+    store.merge([make_article("Chancellor confirms fuel duty rise in budget", "https://bbc.co.uk/news/1")])
+    copy = make_article("Chancellor confirms fuel duty rise in Budget!", "https://theguardian.com/politics/1",
+                        source_key="guardian", source="The Guardian", published="Mon, 06 Jan 2025 11:30:00 GMT")
+    unrelated = make_article("Chancellor rules out income tax rise", "https://gov.uk/news/1",
+                             source_key="gov_uk", source="GOV.UK")
+
+    assert store.merge([copy, unrelated]) == {"added": 1, "seen": 0, "duplicate": 1}
+    assert store.merge([copy]) == {"added": 0, "seen": 1, "duplicate": 0}
+    original = store.get(copy)
+    assert original["link"] == "https://bbc.co.uk/news/1"
+    assert original["also_reported_by"] == [{"source": "The Guardian", "link": "https://theguardian.com/politics/1"}]
+    assert store.count() == 2
+
+@pytest.mark.parametrize("title, other", [
+    ("Labour wins Runcorn by-election", "Reform wins Runcorn by-election"),
+    ("MPs vote for assisted dying bill", "MPs vote against assisted dying bill"),
+    ("PM to visit France on Monday", "PM to visit Spain on Monday"),
+])
+def test_different_stories_with_similar_headlines_are_kept(store, title, other):
+    """Test headlines differing in one meaningful word are stored as separate stories"""
+    store.merge([make_article(title, "https://bbc.co.uk/news/1")])
+    assert store.merge([make_article(other, "https://theguardian.com/politics/1", source_key="guardian",
+                                     source="The Guardian")]) == {"added": 1, "seen": 0, "duplicate": 0}
+
+def test_retitled_copy_with_same_summary_is_merged(store):
+    """Test a reworded headline over a near-identical summary is recorded on the original"""
+    summary = "<p>The Chancellor confirmed fuel duty will rise by 5p a litre from April, ending the freeze.</p>"
+    store.merge([dict(make_article("Fuel duty to rise by 5p, Chancellor confirms", "https://bbc.co.uk/news/1"),
+                      original_summary=summary)])
+    copy = dict(make_article("Chancellor confirms 5p fuel duty rise", "https://theguardian.com/politics/1",
+                             source_key="guardian", source="The Guardian"),
+                original_summary=summary.replace("<p>", "").replace("</p>", ""))
+    assert store.merge([copy])["duplicate"] == 1
+
+def test_mp_history_and_export(store, tmp_path):
+    """Test MP-tagged articles are kept across runs and the JSON is materialised from the store"""
+    store.merge([dict(make_article("Lucy Powell speaks", "https://bbc.co.uk/news/1"), relevance="direct")],
+                mp_name="Lucy Powell")
+    store.merge([dict(make_article("Manchester Central funding", "https://bbc.co.uk/news/2",
+                                   published="Wed, 08 Jan 2025 09:00:00 GMT"), relevance="constituency")],
+                mp_name="Lucy Powell")
+
+    history = store.articles_for_mp("Lucy Powell")
+    assert [(a["title"], a["relevance"]) for a in history] == [
+        ("Lucy Powell speaks", "direct"), ("Manchester Central funding", "constituency")]
+
+    path = tmp_path / "latest_news.json"
+    store.export_json(str(path), limit=1)
+    with open(path) as f:
+        exported = json.load(f)
+    assert exported["total_articles"] == 1 and exported["stored_articles"] == 2
+    assert exported["articles"][0]["title"] == "Manchester Central funding"
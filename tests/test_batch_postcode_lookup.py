@@ -0,0 +1,78 @@
+"""
+Test suite for batch postcode lookups
+"""
+import json
+from unittest.mock import MagicMock, patch
+from batch_postcode_lookup import BatchPostcodeLookup, dedupe_postcodes, postcodes_from_csv
+
+class FakeResolver:
+    def resolve(self, postcode):
+        return "Manchester Central" if postcode.startswith("M1") else None
+
+    def get_mp(self, constituency):
+        return {"name": "Lucy Powell"} if constituency == "Manchester Central" else None
+
+def bulk_response(postcodes):
+    response = MagicMock()
+    response.json.return_value = {"status": 200, "result": [
+        {"query": postcode, "result": {"parliamentary_constituency": "Bristol East"} if postcode.startswith("BS") else None}
+        for postcode in postcodes
+    ]}
+    return response
+
+def test_dedupe_and_csv_parsing():
+    """Test postcodes are normalised, de-duplicated and read from CSV columns"""
+    assert dedupe_postcodes(["m1 1aa", "M11AA", " ", "BS5 9AU"]) == ["M11AA", "BS59AU"]
+    assert postcodes_from_csv("name,Postcode\nAnn,M1 1AA\nBob,BS5 9AU\n") == ["M1 1AA", "BS5 9AU"]
+    assert postcodes_from_csv("M1 1AA\nBS5 9AU\n") == ["M1 1AA", "BS5 9AU"]
+
+def test_local_hits_and_bulk_misses():
+    """Test local hits skip the network and misses go out in groups of bulk_size"""
+    cache = {}
+    lookup = BatchPostcodeLookup(FakeResolver(), cache, bulk_size=2)
+    postcodes = ["M1 1AA", "m11aa", "BS5 9AU", "BS1 1AA", "ZZ9 9ZZ", "not a postcode"]
+
+    with patch('batch_postcode_lookup.http_client.post',
+               side_effect=lambda url, json, retries: bulk_response(json["postcodes"])) as post:
+        results, stats = lookup.resolve_all(postcodes)
+
+    assert post.call_count == 2
+    assert [call.kwargs["json"]["postcodes"] for call in post.call_args_list] == [["BS59AU", "BS11AA"], ["ZZ99ZZ"]]
+    assert results[0] == {"postcode": "M1 1AA", "found": True, "constituency": "Manchester Central",
+                          "source": "local", "mp": {"name": "Lucy Powell"}}
+    assert results[1]["error"] == "Invalid postcode format"
+    assert [r["found"] for r in results[2:]] == [True, True, False]
+    assert stats == {"unique": 5, "found": 3, "local": 1, "remote": 2, "invalid": 1, "errors": 0}
+    # Remote hits are cached so the next lookup is local
+    assert cache["BS5 9AU"]["constituency"] == "Bristol East"
+
+def test_bulk_failure_reports_each_postcode():
+    """Test a failed bulk request yields an error per postcode instead of raising"""
+    lookup = BatchPostcodeLookup(FakeResolver())
+    with patch('batch_postcode_lookup.http_client.post', side_effect=ConnectionError("down")):
+        results, stats = lookup.resolve_all(["BS5 9AU", "BS1 1AA"])
+
+    assert [r["error"] for r in results] == ["Lookup service unavailable"] * 2
+    assert stats["errors"] == 2
+
+def test_batch_endpoint_streams_ndjson():
+    """Test POST /api/mp/batch streams one JSON line per postcode plus a summary"""
+    import app as app_module
+
+    lookup = BatchPostcodeLookup(FakeResolver())
+    with patch.object(app_module, 'batch_lookup', lookup):
+        client = app_module.app.test_client()
+        response = client.post("/api/mp/batch", json=["M1 1AA", "M1 1AA", "bad"])
+        assert response.mimetype == "application/x-ndjson"
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+        csv_response = client.post("/api/mp/batch", data="postcode\nM1 1AA\n", content_type="text/csv")
+        csv_lines = csv_response.get_data(as_text=True).splitlines()
+
+        too_many = client.post("/api/mp/batch", json=["M1 1AA"] * 10001)
+
+    assert [line.get("postcode") for line in lines[:2]] == ["M1 1AA", "BAD"]
+    assert lines[-1]["summary"]["requested"] == 3
+    assert lines[-1]["summary"]["unique"] == 2
+    assert json.loads(csv_lines[0])["found"]
+    assert too_many.status_code == 413
@@ -0,0 +1,141 @@
+"""
+Test suite for the postcode district processor and its command-line interface
+"""
+import json
+import os
+from unittest.mock import MagicMock, patch
+from batch_postcode_processor import EXIT_INCOMPLETE, EXIT_OK, PostcodeDistrictProcessor, main
+from mp_dataset import MPDataset, write_dataset
+from postcode_resolver import PostcodeResolver
+
+OUTCODES = {
+    "M1": ["Manchester Central"],
+    "BS5": ["Bristol East", "Bristol West"]
+}
+
+def outcode_response(url, retries):
+    district = url.rsplit("/", 1)[-1]
+    response = MagicMock()
+    response.status_code = 200 if district in OUTCODES else 404
+    response.json.return_value = {"result": {"parliamentary_constituency": OUTCODES.get(district)}}
+    return response
+
+def bulk_response(url, json, retries):
+    response = MagicMock()
+    response.json.return_value = {"result": [
+        {"query": postcode, "result": {"parliamentary_constituency": "Leeds Central"} if postcode.startswith("LS1") else None}
+        for postcode in json["postcodes"]
+    ]}
+    return response
+
+def make_processor(tmp_path):
+    database_path = tmp_path / "mp_database.json"
+    database_path.write_text(json.dumps({"version": "2024.1", "last_updated": "2024-01-01",
+                                         "constituencies": {}, "postcode_map": {"E1": "Bethnal Green and Stepney"}}))
+    return PostcodeDistrictProcessor(str(database_path), workers=4, rate=1000)
+
+def test_parallel_sweep_uses_outcodes_then_bulk_samples(tmp_path):
+    """Test outcodes resolve first, misses are sampled in bulk and everything is saved once"""
+    processor = make_processor(tmp_path)
+
+    with patch('batch_postcode_processor.http_client.get', side_effect=outcode_response) as get, \
+         patch('batch_postcode_lookup.http_client.post', side_effect=bulk_response) as post:
+        results = processor.process_districts_parallel(["E1", "M1", "BS5", "LS1", "ZZ9"])
+
+    assert get.call_count == 4  # E1 is already mapped
+    assert post.call_count == 1
+    assert set(post.call_args.kwargs["json"]["postcodes"]) == {"LS11AA", "LS11AB", "LS11AD", "ZZ91AA", "ZZ91AB", "ZZ91AD"}
+    assert results["M1"] == {"Manchester Central"}
+
+    with open(processor.database_path) as f:
+        database = json.load(f)
+    assert database["postcode_map"]["M1"] == "Manchester Central"
+    assert database["postcode_map"]["LS1"] == "Leeds Central"
+    assert database["split_districts"] == ["BS5"]
+    assert processor.state["failed_districts"] == ["ZZ9"]
+    assert not os.path.exists(processor.results_path)
+
+def test_parallel_sweep_resumes_from_results_log(tmp_path):
+    """Test districts already in the results log are not looked up again"""
+    processor = make_processor(tmp_path)
+    results_log = processor.open_results_log()
+    results_log["M1"] = {"constituencies": ["Manchester Central"], "sectors": {}}
+    results_log.close()
+
+    with patch('batch_postcode_processor.http_client.get', side_effect=outcode_response) as get:
+        processor.process_districts_parallel(["M1", "BS5"])
+
+    assert [call.args[0] for call in get.call_args_list] == ["https://api.postcodes.io/outcodes/BS5"]
+    assert processor.database["postcode_map"]["M1"] == "Manchester Central"
+
+def test_restart_discards_results_log(tmp_path):
+    """Test a restarted sweep looks up districts left in an interrupted sweep's results log"""
+    processor = make_processor(tmp_path)
+    results_log = processor.open_results_log()
+    results_log["M1"] = {"constituencies": ["Somewhere Else"], "sectors": {}}
+    results_log.close()
+
+    processor.reset_state()
+    with patch('batch_postcode_processor.http_client.get', side_effect=outcode_response) as get:
+        processor.process_districts_parallel(["M1"])
+
+    assert get.call_count == 1
+    assert processor.database["postcode_map"]["M1"] == "Manchester Central"
+
+def test_parallel_sweep_clears_resolved_failures(tmp_path):
+    """Test districts that failed before are dropped from the failed list once they resolve"""
+    processor = make_processor(tmp_path)
+    processor.state["failed_districts"] = ["M1", "XX1"]
+
+    with patch('batch_postcode_processor.http_client.get', side_effect=outcode_response):
+        processor.process_districts_parallel(["M1"])
+
+    assert processor.state["failed_districts"] == ["XX1"]
+
+def test_cli_validate_and_stats_print_json(tmp_path, capsys):
+    """Test validate reports invalid mappings with a non-zero exit code and stats prints JSON"""
+    processor = make_processor(tmp_path)
+    database = ["--database", processor.database_path]
+
+    assert main(database + ["validate"]) == EXIT_INCOMPLETE
+    result = json.loads(capsys.readouterr().out)
+    assert result["invalid_mappings"] == {"E1": "Bethnal Green and Stepney"}
+
+    assert main(database + ["stats"]) == EXIT_OK
+    assert json.loads(capsys.readouterr().out)["total_districts"] == 1
+
+def test_cli_keeps_load_warnings_off_stdout(tmp_path, capsys):
+    """Test a missing database is reported on stderr and stdout stays valid JSON"""
+    assert main(["--database", str(tmp_path / "missing.json"), "stats"]) == EXIT_OK
+    captured = capsys.readouterr()
+    assert json.loads(captured.out)["total_districts"] == 0
+    assert "Error loading database" in captured.err
+
+def test_cli_retry_failed_runs_parallel_sweep(tmp_path, capsys):
+    """Test retry-failed looks up the failed districts and keeps stdout to the JSON result"""
+    processor = make_processor(tmp_path)
+    processor.state["failed_districts"] = ["M1"]
+    processor.save_state()
+
+    with patch('batch_postcode_processor.http_client.get', side_effect=outcode_response):
+        exit_code = main(["--database", processor.database_path, "--workers", "2", "retry-failed"])
+
+    result = json.loads(capsys.readouterr().out)
+    assert exit_code == EXIT_OK
+    assert result["status"] == "ok"
+    assert result["resolved"] == 1
+    assert result["failed_districts"] == []
+
+def test_saving_rebuilds_compiled_dataset(tmp_path):
+    """Test a saved sweep refreshes the dataset beside the database so the resolver keeps using it"""
+    processor = make_processor(tmp_path)
+    write_dataset(str(tmp_path / "mp_dataset.bin"), [], postcode_map={"E1": "Bethnal Green and Stepney"})
+    processor.database["postcode_map"]["M1"] = "Manchester Central"
+    processor.save_database()
+
+    dataset = MPDataset(str(tmp_path / "mp_dataset.bin"))
+    assert dataset.lookup_district("M1") == "Manchester Central"
+    dataset.close()
+    resolver = PostcodeResolver(processor.database_path, str(tmp_path / "missing.json"), index_path=None,
+                                hierarchy_path=None)
+    assert resolver.dataset_version is not None
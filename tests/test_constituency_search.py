@@ -0,0 +1,46 @@
+"""
+Test suite for the constituency search index
+"""
+from constituency_search import ConstituencySearchIndex, normalise_name
+
+NAMES = [
+    "Hackney North and Stoke Newington", "Hackney South and Shoreditch", "Ynys Môn",
+    "Richmond and Northallerton", "Manchester Central", "Manchester Withington", "St Albans"
+]
+
+def make_index():
+    mps = {"Manchester Central": {"name": "Lucy Powell", "party": "Labour", "email": "x@parliament.uk"}}
+    return ConstituencySearchIndex(NAMES, mps.get)
+
+def test_normalise_name():
+    """Test accents, ampersands and punctuation are normalised"""
+    assert normalise_name("Ynys Môn") == "ynys mon"
+    assert normalise_name("Richmond & Northallerton") == "richmond and northallerton"
+    assert normalise_name("St. Helens, South") == "st helens south"
+
+def test_ranks_exact_then_prefix_then_token_matches():
+    """Test results are ordered by match quality"""
+    index = make_index()
+    assert [r["constituency"] for r in index.search("hackney")] == [
+        "Hackney South and Shoreditch", "Hackney North and Stoke Newington"]
+    assert index.search("ynys mon")[0]["match"] == "exact"
+    assert index.search("richmond & northallerton")[0]["match"] == "exact"
+    assert index.search("northall")[0] == {"constituency": "Richmond and Northallerton",
+                                            "match": "token", "score": 2.0}
+
+def test_fuzzy_matches_and_mp_summaries():
+    """Test misspellings still match and results carry an MP summary"""
+    results = make_index().search("manchster central", limit=1)
+    assert results[0]["constituency"] == "Manchester Central"
+    assert results[0]["match"] == "fuzzy"
+    assert results[0]["mp"] == {"name": "Lucy Powell", "party": "Labour", "profile_url": None}
+    assert make_index().search("the") == []
+    assert make_index().search("zzzz") == []
+
+def test_unlimited_search_returns_every_prefix_match():
+    """Test no limit returns all prefix matches and skips near misses"""
+    index = ConstituencySearchIndex(NAMES + [f"Manchester Ward {n}" for n in range(20)])
+    results = index.search("manchester")
+    assert len(results) == 22
+    assert all(r["match"] != "fuzzy" for r in results)
+    assert len(index.search("manchester", limit=5)) == 5
@@ -0,0 +1,72 @@
+"""
+Test suite for the streaming CSV enrichment CLI
+"""
+import csv
+import json
+import pytest
+from unittest.mock import patch
+from batch_postcode_lookup import BatchPostcodeLookup
+from scripts.enrich_postcodes_csv import enrich_csv
+
+class FakeResolver:
+    def resolve(self, postcode):
+        return "Manchester Central" if postcode.startswith("M1") else None
+
+    def get_mp(self, constituency):
+        return {"name": "Lucy Powell", "party": "Labour"}
+
+@pytest.fixture
+def input_csv(tmp_path):
+    path = tmp_path / "supporters.csv"
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "Postcode"])
+        for i in range(5):
+            writer.writerow([f"Supporter {i}", "M1 1AA" if i % 2 == 0 else "ZZ9 9ZZ"])
+    return str(path)
+
+def read_rows(path):
+    with open(path, newline='') as f:
+        return list(csv.DictReader(f))
+
+def test_enrich_streams_in_chunks(input_csv, tmp_path):
+    """Test rows are enriched chunk by chunk and the checkpoint is removed on success"""
+    output = str(tmp_path / "out.csv")
+    lookup = BatchPostcodeLookup(FakeResolver(), remote=False)
+
+    with patch.object(lookup, 'resolve', wraps=lookup.resolve) as resolve:
+        stats = enrich_csv(input_csv, output, lookup, chunk_size=2)
+
+    assert resolve.call_count == 3
+    assert stats == {"rows": 5, "found": 3, "not_found": 2}
+    rows = read_rows(output)
+    assert [row["mp_name"] for row in rows] == ["Lucy Powell", "", "Lucy Powell", "", "Lucy Powell"]
+    assert rows[0]["name"] == "Supporter 0" and rows[0]["lookup_source"] == "local"
+    assert not (tmp_path / "out.csv.checkpoint.json").exists()
+
+def test_resume_from_checkpoint(input_csv, tmp_path):
+    """Test an interrupted run resumes after its last checkpoint without duplicating rows"""
+    output = str(tmp_path / "out.csv")
+    lookup = BatchPostcodeLookup(FakeResolver(), remote=False)
+    chunks = {"count": 0}
+    original_resolve = lookup.resolve
+
+    def interrupt_after_two_chunks(postcodes, stats=None):
+        chunks["count"] += 1
+        if chunks["count"] == 3:
+            raise KeyboardInterrupt
+        return original_resolve(postcodes, stats)
+
+    with patch.object(lookup, 'resolve', side_effect=interrupt_after_two_chunks):
+        with pytest.raises(KeyboardInterrupt):
+            enrich_csv(input_csv, output, lookup, chunk_size=2)
+
+    with open(tmp_path / "out.csv.checkpoint.json") as f:
+        assert json.load(f)["rows_done"] == 4
+    # Simulate a torn write after the checkpoint
+    with open(output, 'a') as f:
+        f.write("Supporter 4,M1 1A")
+
+    stats = enrich_csv(input_csv, output, lookup, chunk_size=2, resume=True)
+    assert stats["rows"] == 5
+    assert [row["name"] for row in read_rows(output)] == [f"Supporter {i}" for i in range(5)]
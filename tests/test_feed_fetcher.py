@@ -0,0 +1,55 @@
+"""
+Test suite for the concurrent conditional feed fetcher
+"""
+import time
+import pytest
+from unittest.mock import MagicMock
+
+pytest.importorskip("feedparser")
+from feed_fetcher import FeedFetcher
+
+RSS = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>Politics</title>
+<item><title>Budget vote tonight</title><link>https://example.com/budget</link>
+<description>MPs vote on the budget.</description><pubDate>Mon, 06 Jan 2025 10:00:00 GMT</pubDate></item>
+</channel></rss>"""
+
+def make_response(status_code=200, content=b"", headers=None):
+    response = MagicMock(status_code=status_code, content=content, headers=headers or {})
+    response.raise_for_status.return_value = None
+    return response
+
+def test_unchanged_feed_reuses_stored_entries(tmp_path):
+    """Test the second run sends the stored validators and reuses entries on a 304"""
+    state_path = str(tmp_path / "feed_state.json")
+    fetcher = FeedFetcher(state_path=state_path)
+    fetcher.session.get = MagicMock(return_value=make_response(200, RSS, {"ETag": '"v1"'}))
+    first = fetcher.fetch_all({"bbc": "https://example.com/rss"})["bbc"]
+
+    reloaded = FeedFetcher(state_path=state_path)
+    reloaded.session.get = MagicMock(return_value=make_response(304))
+    second = reloaded.fetch_all({"bbc": "https://example.com/rss"})["bbc"]
+
+    assert first["status"] == "updated"
+    assert first["entries"][0]["title"] == "Budget vote tonight"
+    assert second["status"] == "not_modified"
+    assert second["entries"] == first["entries"]
+    assert reloaded.session.get.call_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
+
+def test_slow_feed_does_not_hold_up_the_run(tmp_path):
+    """Test feeds are fetched concurrently and a feed past the deadline is reported as timed out"""
+    fetcher = FeedFetcher(state_path=str(tmp_path / "feed_state.json"))
+
+    def get(url, **kwargs):
+        time.sleep(2 if "slow" in url else 0.1)
+        return make_response(200, RSS)
+    fetcher.session.get = MagicMock(side_effect=get)
+
+    start = time.monotonic()
+    results = fetcher.fetch_all({"a": "https://a.example/rss", "b": "https://b.example/rss",
+                                 "slow": "https://slow.example/rss"}, deadline=0.5)
+
+    assert time.monotonic() - start < 1.5
+    assert results["a"]["status"] == results["b"]["status"] == "updated"
+    assert results["slow"]["status"] == "timeout"
+    assert results["slow"]["entries"] == []
@@ -0,0 +1,116 @@
+"""
+Test suite for the shared HTTP client
+"""
+import pytest
+import json
+import requests
+from unittest.mock import MagicMock, patch
+from http_client import HTTPClient, CircuitBreaker, CircuitOpenError, load_settings
+
+SETTINGS = {"timeout": (5.0, 10.0), "host_timeouts": {"members-api.parliament.uk": (5.0, 20.0)},
+            "retries": 2, "backoff": 0.0}
+
+def make_response(status_code):
+    return MagicMock(status_code=status_code, headers={})
+
+def test_load_settings(tmp_path):
+    """Test timeouts and retries are read from both config files"""
+    config_path = tmp_path / "config.json"
+    update_config_path = tmp_path / "update-config.json"
+    config_path.write_text(json.dumps({"api": {"timeout": {"request": 8, "connect": 3, "total": 12}},
+                                       "errorHandling": {"retryAttempts": 4, "retryDelay": 500}}))
+    update_config_path.write_text(json.dumps({"dataSources": {
+        "members": {"baseUrl": "https://members-api.parliament.uk/api", "timeout": 20000}}}))
+
+    settings = load_settings(str(config_path), str(update_config_path))
+    assert settings["timeout"] == (3.0, 8.0)
+    assert settings["host_timeouts"] == {"members-api.parliament.uk": (3.0, 20.0)}
+    assert settings["retries"] == 4 and settings["backoff"] == 0.5
+    assert settings["deadline"] == 12.0
+
+def test_retries_transient_failures():
+    """Test 5xx responses and connection errors are retried with per-host timeouts"""
+    client = HTTPClient(SETTINGS)
+    session = client.session("members-api.parliament.uk")
+    with patch.object(session, 'request', side_effect=[
+        make_response(503), requests.exceptions.ConnectionError("reset"), make_response(200)
+    ]) as request:
+        response = client.get("https://members-api.parliament.uk/api/Members/1")
+
+    assert response.status_code == 200
+    assert request.call_count == 3
+    assert request.call_args.kwargs["timeout"] == (5.0, 20.0)
+    # One session is reused for every call to the host
+    assert client.session("members-api.parliament.uk") is session
+
+def test_deadline_bounds_retries():
+    """Test timeouts are cut to the deadline and no retry starts after it"""
+    client = HTTPClient(dict(SETTINGS, retries=5))
+    session = client.session("api.postcodes.io")
+    now = [100.0]
+
+    def slow_request(*args, **kwargs):
+        now[0] += 3.0
+        raise requests.exceptions.Timeout("slow")
+
+    with patch('http_client.time.monotonic', side_effect=lambda: now[0]), \
+            patch('http_client.time.sleep'), \
+            patch.object(session, 'request', side_effect=slow_request) as request:
+        with pytest.raises(requests.exceptions.Timeout):
+            client.get("https://api.postcodes.io/postcodes/SW1A1AA", deadline=5.0)
+
+    assert request.call_count == 2
+    assert request.call_args_list[0].kwargs["timeout"] == (5.0, 5.0)
+    assert request.call_args_list[1].kwargs["timeout"] == (2.0, 2.0)
+
+def test_post_not_retried_by_default():
+    """Test non-idempotent requests are sent once unless retries are requested"""
+    client = HTTPClient(SETTINGS)
+    session = client.session("api.postcodes.io")
+    with patch.object(session, 'request', return_value=make_response(502)) as request:
+        assert client.post("https://api.postcodes.io/postcodes", json={}).status_code == 502
+    assert request.call_count == 1
+
+def test_circuit_breaker_opens_and_recovers():
+    """Test a failing host is short-circuited until the reset timeout passes"""
+    client = HTTPClient(dict(SETTINGS, retries=0), failure_threshold=2, reset_timeout=60)
+    session = client.session("mapit.mysociety.org")
+    with patch.object(session, 'request', side_effect=requests.exceptions.Timeout("slow")) as request:
+        for _ in range(2):
+            with pytest.raises(requests.exceptions.Timeout):
+                client.get("https://mapit.mysociety.org/postcode/SW1A1AA")
+        with pytest.raises(CircuitOpenError):
+            client.get("https://mapit.mysociety.org/postcode/SW1A1AA")
+    assert request.call_count == 2
+
+    breaker = client.breaker("mapit.mysociety.org")
+    breaker.opened_at -= 60
+    assert breaker.state == "half-open"
+    with patch.object(session, 'request', return_value=make_response(200)):
+        assert client.get("https://mapit.mysociety.org/postcode/SW1A1AA").status_code == 200
+    assert breaker.state == "closed"
+
+def test_breaker_allows_single_trial():
+    """Test only one trial call is let through while half-open"""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.allow()
+    assert not breaker.allow()
+
+def test_failed_trial_with_other_error_reopens_breaker():
+    """Test a non-connection error during the half-open trial still lets a later trial through"""
+    client = HTTPClient(dict(SETTINGS, retries=0), failure_threshold=1, reset_timeout=60)
+    session = client.session("api.postcodes.io")
+    breaker = client.breaker("api.postcodes.io")
+    breaker.record_failure()
+    breaker.opened_at -= 60
+
+    with patch.object(session, 'request', side_effect=requests.exceptions.ChunkedEncodingError("cut off")):
+        with pytest.raises(requests.exceptions.ChunkedEncodingError):
+            client.get("https://api.postcodes.io/postcodes/SW1A1AA")
+    assert breaker.state == "open"
+
+    breaker.opened_at -= 60
+    with patch.object(session, 'request', return_value=make_response(200)):
+        assert client.get("https://api.postcodes.io/postcodes/SW1A1AA").status_code == 200
+    assert breaker.state == "closed"
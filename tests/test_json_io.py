@@ -0,0 +1,45 @@
+"""
+Test suite for the JSON serialisation helpers
+"""
+import json
+from datetime import datetime
+from unittest.mock import patch
+from flask import Flask, jsonify
+import json_io
+
+def test_dumps_compact_and_extended_types():
+    """Test output is compact, keeps unicode and handles sets and datetimes"""
+    value = {"name": "Ynys Môn", "ids": {3, 1}, "at": datetime(2024, 7, 4, 22, 0)}
+    assert json_io.dumps(value) == '{"name":"Ynys Môn","ids":[1,3],"at":"2024-07-04T22:00:00"}'
+    assert json_io.loads(json_io.dumps_bytes(value, indent=True))["ids"] == [1, 3]
+
+def test_stdlib_fallback_matches():
+    """Test the standard library path produces the same documents"""
+    value = {"constituency": "Manchester Central", "count": 2, "tags": {"b", "a"}}
+    with patch.object(json_io, 'orjson', None):
+        fallback = json_io.dumps(value)
+    assert json.loads(fallback) == json.loads(json_io.dumps(value))
+
+def test_file_round_trip(tmp_path):
+    """Test files are written atomically and unreadable files give the default"""
+    path = str(tmp_path / "state.json")
+    json_io.dump_file(path, {"failed_districts": ["ZZ9"]})
+    assert json_io.load_file(path) == {"failed_districts": ["ZZ9"]}
+
+    with open(path, 'w') as f:
+        f.write("{not json")
+    assert json_io.load_file(path, {}) == {}
+    assert json_io.load_file(str(tmp_path / "missing.json")) is None
+
+def test_flask_provider():
+    """Test jsonify responses go through the fast provider"""
+    app = Flask(__name__)
+    json_io.init_app(app)
+
+    @app.route("/constituencies")
+    def constituencies():
+        return jsonify({"constituencies": ["Bristol Central"]})
+
+    response = app.test_client().get("/constituencies")
+    assert response.mimetype == "application/json"
+    assert response.get_data(as_text=True) == '{"constituencies":["Bristol Central"]}'
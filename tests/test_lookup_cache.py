@@ -0,0 +1,92 @@
+"""
+Test suite for the two-tier lookup cache
+"""
+import time
+from lookup_cache import LookupCache, SQLiteCacheTier, make_cache, cache_stats
+from constituency_lookup import ConstituencyLookup
+
+def test_local_tier_ttl_and_lru():
+    """Test entries expire after the TTL and the least recently used entry is evicted"""
+    cache = LookupCache("test", maxsize=2, ttl=0.05)
+    cache.set("SW1A1AA", {"constituency": "Cities of London and Westminster"})
+    cache.set("M11AA", {"constituency": "Manchester Central"})
+    assert cache.get("SW1A1AA")["constituency"] == "Cities of London and Westminster"
+    cache.set("BS59AU", {"constituency": "Bristol East"})
+    assert cache.get("M11AA") is None
+    assert cache.get("SW1A1AA") is not None
+
+    time.sleep(0.06)
+    assert cache.get("SW1A1AA") is None
+
+def test_negative_entries_and_metrics():
+    """Test failed lookups are cached separately and counted"""
+    cache = LookupCache("test", negative_ttl=60)
+    assert cache.lookup("ZZ99ZZ") is None
+    cache.set_negative("ZZ99ZZ", {"error": "Postcode not found"})
+
+    entry = cache.lookup("ZZ99ZZ")
+    assert entry.negative and entry.value == {"error": "Postcode not found"}
+    assert cache.get("ZZ99ZZ", "default") == "default"
+
+    cache.set("ZZ99ZZ", {"constituency": "Somewhere"})
+    assert cache.lookup("ZZ99ZZ").negative is False
+    stats = cache.stats()
+    assert stats["misses"] == 1
+    assert stats["negative_hits"] == 2
+    assert stats["local_hits"] == 1
+    assert stats["hit_rate"] == 0.75
+
+def test_shared_tier_between_workers(tmp_path):
+    """Test a second cache on the same SQLite tier sees the first one's entries"""
+    path = str(tmp_path / "cache.db")
+    writer = LookupCache("mp", shared=SQLiteCacheTier(path))
+    reader = LookupCache("mp", shared=SQLiteCacheTier(path))
+    other = LookupCache("news", shared=SQLiteCacheTier(path))
+
+    writer.set("postcode_M11AA", {"constituency": "Manchester Central"})
+    writer.set_negative("postcode_ZZ99ZZ", {"error": "Postcode not found"})
+
+    assert reader.get("postcode_M11AA") == {"constituency": "Manchester Central"}
+    assert reader.lookup("postcode_ZZ99ZZ").negative
+    assert other.get("postcode_M11AA") is None
+    assert reader.stats()["shared_hits"] == 1
+
+    writer.clear()
+    assert LookupCache("mp", shared=SQLiteCacheTier(path)).get("postcode_M11AA") is None
+
+def test_shared_tier_purges_expired_entries(tmp_path):
+    """Test expired rows are deleted on open and every purge_interval writes"""
+    path = str(tmp_path / "cache.db")
+    tier = SQLiteCacheTier(path, purge_interval=3)
+    tier.set("mp", "old", "value", False, ttl=-1)
+    tier.set("mp", "fresh", "value", False, ttl=60)
+
+    def rows():
+        return tier._conn().execute("SELECT key FROM cache_entries ORDER BY key").fetchall()
+
+    assert len(rows()) == 2
+    tier.set("mp", "stale", "value", False, ttl=-1)
+    assert rows() == [("fresh",)]
+
+    tier.set("mp", "stale", "value", False, ttl=-1)
+    SQLiteCacheTier(path)
+    assert rows() == [("fresh",)]
+
+def test_make_cache_uses_configured_shared_tier(tmp_path, monkeypatch):
+    """Test GOVWHIZ_CACHE_DB enables the shared tier and caches are registered for stats"""
+    monkeypatch.setenv("GOVWHIZ_CACHE_DB", str(tmp_path / "shared.db"))
+    cache = make_cache("registered_test", ttl=60)
+    cache.set("key", "value")
+
+    assert cache.stats()["shared"] is True
+    assert cache_stats()["registered_test"]["sets"] == 1
+
+def test_cli_caches_default_to_disk(tmp_path, monkeypatch):
+    """Test CLI caches persist to the default file when GOVWHIZ_CACHE_DB is unset"""
+    monkeypatch.delenv("GOVWHIZ_CACHE_DB", raising=False)
+    monkeypatch.chdir(tmp_path)
+    ConstituencyLookup().cache.set("M11AA", "Manchester Central")
+
+    assert (tmp_path / "data" / "lookup_cache.db").exists()
+    assert ConstituencyLookup().cache.get("M11AA") == "Manchester Central"
+    assert make_cache("in_process_test").shared is None
@@ -0,0 +1,109 @@
+"""
+Test suite for the compiled MP dataset
+"""
+import os
+import json
+import pytest
+from mp_dataset import MPDataset, district_key, sector_key, write_dataset
+from postcode_resolver import PostcodeResolver
+
+MPS = [
+    {"constituency": "Manchester Central", "name": "Lucy Powell", "party": "Labour", "id": 4263},
+    {"constituency": "Ynys Môn", "name": "Llinos Medi", "party": "Plaid Cymru", "id": 5174},
+    {"constituency": "Bristol Central", "name": "Carla Denyer", "party": "Green Party", "id": 5030,
+     "twitter": "@carla_denyer", "committees": ["Environmental Audit"]},
+    {"constituency": "Speaker's Seat", "name": "Test Member", "party": "Speaker", "id": "speaker-1"}
+]
+
+def build(path):
+    return write_dataset(str(path), MPS,
+                         postcode_map={"M1": "Manchester Central", "LL77": "Ynys Môn"},
+                         exact_map={"BS1 5TR": "Bristol Central"},
+                         sector_map={"BS1 4": "Bristol Central"},
+                         split_districts=["BS1"])
+
+def test_keys():
+    """Test districts and sectors pack into fixed-width keys"""
+    assert district_key("m1") == b"M1  "
+    assert district_key("TOOLONG") is None
+    assert sector_key("SW1A 1") == b"SW1A1"
+    assert sector_key("SW1A") is None
+
+def test_round_trip(tmp_path):
+    """Test records and tables read back from the mapped file with shared strings"""
+    meta = build(tmp_path / "mp_dataset.bin")
+    dataset = MPDataset(str(tmp_path / "mp_dataset.bin"))
+
+    assert dataset.version == meta["version"]
+    mps = list(dataset.mps())
+    assert [mp["constituency"] for mp in mps] == ["Bristol Central", "Manchester Central", "Speaker's Seat",
+                                                 "Ynys Môn"]
+    assert mps[3]["name"] == "Llinos Medi" and mps[3]["id"] == 5174
+    assert mps[1]["party"] == "Labour" and mps[1]["thumbnail_url"] == ""
+
+    assert dict(dataset.districts()) == {"LL77": "Ynys Môn", "M1": "Manchester Central"}
+    assert dict(dataset.exact_postcodes()) == {"BS1 5TR": "Bristol Central"}
+    assert dict(dataset.sectors()) == {"BS1 4": "Bristol Central"}
+    assert dataset.split_districts() == ["BS1"]
+    assert dataset.lookup_district("ll77") == "Ynys Môn"
+    assert dataset.lookup_district("M2") is None
+    assert dataset.lookup_exact("bs15tr") == "Bristol Central"
+    assert dataset.lookup_exact("BS1 5TS") is None
+    # The constituency name is interned once for the MP record and every table row
+    assert dataset.string(0) is mps[0]["constituency"]
+    dataset.close()
+
+def test_mp_lookup_keeps_every_field(tmp_path):
+    """Test MPs are found by binary search with fields outside the fixed record and odd ids intact"""
+    build(tmp_path / "mp_dataset.bin")
+    dataset = MPDataset(str(tmp_path / "mp_dataset.bin"))
+
+    bristol = dataset.get_mp("Bristol Central")
+    assert bristol["twitter"] == "@carla_denyer"
+    assert bristol["committees"] == ["Environmental Audit"]
+    assert bristol["id"] == 5030
+    assert dataset.get_mp("Speaker's Seat")["id"] == "speaker-1"
+    assert dataset.get_mp("Ynys Môn")["name"] == "Llinos Medi"
+    assert dataset.get_mp("Nowhere") is None
+    assert dataset.constituencies() == [mp["constituency"] for mp in dataset.mps()]
+    dataset.close()
+
+def test_truncated_dataset_is_rejected(tmp_path):
+    """Test partial files raise ValueError and the resolver falls back to the JSON database"""
+    path = tmp_path / "mp_dataset.bin"
+    build(path)
+    data = path.read_bytes()
+    for size in (4, 40, len(data) - 1):
+        path.write_bytes(data[:size])
+        with pytest.raises(ValueError):
+            MPDataset(str(path))
+
+    database_path = tmp_path / "mp_database.json"
+    database_path.write_text(json.dumps({"postcode_map": {"M1": "Manchester Central"}}))
+    os.utime(database_path, (0, 0))
+    resolver = PostcodeResolver(str(database_path), str(tmp_path / "missing.json"), index_path=None,
+                                hierarchy_path=None)
+    assert resolver.dataset_version is None
+    assert resolver.resolve("M1 1AA") == "Manchester Central"
+
+def test_resolver_loads_dataset_unless_sources_are_newer(tmp_path):
+    """Test the resolver maps the dataset beside its database and falls back to newer JSON"""
+    database_path = tmp_path / "mp_database.json"
+    database_path.write_text(json.dumps({"postcode_map": {"M1": "Somewhere Else"}}))
+    os.utime(database_path, (0, 0))
+    build(tmp_path / "mp_dataset.bin")
+
+    resolver = PostcodeResolver(str(database_path), str(tmp_path / "missing.json"), index_path=None,
+                                hierarchy_path=None)
+    assert resolver.dataset_version is not None
+    # Lookups are served from the mapping rather than copied tables
+    assert isinstance(resolver._snapshot.tables, MPDataset)
+    assert resolver.resolve("M1 1AA") == "Manchester Central"
+    assert resolver.resolve("BS1 5TR") == "Bristol Central"
+    assert resolver.get_mp("Ynys Môn")["name"] == "Llinos Medi"
+
+    later = os.path.getmtime(tmp_path / "mp_dataset.bin") + 60
+    os.utime(database_path, (later, later))
+    resolver.reload()
+    assert resolver.dataset_version is None
+    assert resolver.resolve("M1 1AA") == "Somewhere Else"
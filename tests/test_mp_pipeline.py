@@ -0,0 +1,112 @@
+"""
+Test suite for the asynchronous MP lookup pipeline
+"""
+import asyncio
+import time
+from unittest.mock import patch
+from mp_pipeline import MPLookupPipeline
+
+class FakeResolver:
+    def resolve(self, postcode):
+        return "Manchester Central" if postcode.upper().startswith("M1") else None
+
+    def get_mp(self, constituency):
+        return ({"name": "Lucy Powell", "party": "Labour", "email": "lucy.powell.mp@parliament.uk"}
+                if constituency == "Manchester Central" else None)
+
+class FakeNews:
+    def __init__(self, delay=0.2, bbc_delay=None):
+        self.delay = delay
+        self.bbc_delay = bbc_delay if bbc_delay is not None else delay
+
+    async def fetch_guardian_news(self, query, session=None):
+        await asyncio.sleep(self.delay)
+        return [{"title": f"Guardian: {query}"}]
+
+    async def fetch_bbc_news(self, query, session=None):
+        await asyncio.sleep(self.bbc_delay)
+        return [{"title": f"BBC: {query}"}]
+
+async def slow_mp_details(session, constituency):
+    await asyncio.sleep(0.2)
+    return {"name": "Lucy Powell", "party": "Labour (Co-op)", "constituency": constituency}
+
+def test_steps_run_concurrently():
+    """Test MP refresh and both news fetches overlap instead of adding up"""
+    pipeline = MPLookupPipeline(resolver=FakeResolver(), news=FakeNews())
+    with patch.object(pipeline, 'fetch_mp_details', side_effect=slow_mp_details):
+        start = time.monotonic()
+        result = pipeline.lookup_sync("M1 1AA")
+        elapsed = time.monotonic() - start
+
+    assert result["found"]
+    assert result["mp"]["party"] == "Labour (Co-op)"
+    assert result["mp"]["news"]["bbc"] == [{"title": "BBC: Lucy Powell Manchester Central"}]
+    assert result["partial"] == []
+    assert elapsed < 0.45
+    pipeline.close()
+
+def test_live_details_merged_over_local_record():
+    """Test local-only fields survive the live refresh"""
+    pipeline = MPLookupPipeline(resolver=FakeResolver(), news=FakeNews(delay=0))
+    with patch.object(pipeline, 'fetch_mp_details', side_effect=slow_mp_details):
+        mp = pipeline.lookup_sync("M1 1AA")["mp"]
+    pipeline.close()
+
+    assert mp["party"] == "Labour (Co-op)"
+    assert mp["email"] == "lucy.powell.mp@parliament.uk"
+
+def test_sync_lookups_share_one_session():
+    """Test synchronous lookups reuse the background loop's session"""
+    sessions = []
+
+    async def record_session(session, constituency):
+        sessions.append(session)
+        return None
+
+    pipeline = MPLookupPipeline(resolver=FakeResolver(), news=FakeNews(delay=0))
+    with patch.object(pipeline, 'fetch_mp_details', side_effect=record_session):
+        pipeline.lookup_sync("M1 1AA")
+        pipeline.lookup_sync("M1 2AA")
+    pipeline.close()
+
+    assert len(sessions) == 2 and sessions[0] is sessions[1]
+    assert sessions[0].closed
+
+def test_deadline_returns_partial_result():
+    """Test a step that misses its deadline is dropped and reported"""
+    pipeline = MPLookupPipeline(resolver=FakeResolver(), news=FakeNews(delay=0.01, bbc_delay=1.0),
+                                deadlines={"bbc": 0.05})
+    with patch.object(pipeline, 'fetch_mp_details', side_effect=slow_mp_details):
+        result = pipeline.lookup_sync("M1 1AA")
+    pipeline.close()
+
+    assert result["found"]
+    assert result["partial"] == ["bbc"]
+    assert result["mp"]["news"]["bbc"] == []
+    assert result["mp"]["news"]["guardian"]
+
+def test_local_mp_used_when_live_fetch_fails():
+    """Test the local MP record is served if the live refresh fails"""
+    async def failing_details(session, constituency):
+        raise ConnectionError("members API down")
+
+    pipeline = MPLookupPipeline(resolver=FakeResolver(), news=FakeNews(delay=0))
+    with patch.object(pipeline, 'fetch_mp_details', side_effect=failing_details):
+        result = pipeline.lookup_sync("M1 1AA")
+    pipeline.close()
+
+    assert result["mp"]["name"] == "Lucy Powell"
+    assert result["partial"] == ["mp"]
+
+def test_unknown_postcode():
+    """Test a postcode that cannot be resolved is reported as not found"""
+    async def no_constituency(session, postcode):
+        return None
+
+    pipeline = MPLookupPipeline(resolver=FakeResolver(), news=FakeNews())
+    with patch.object(pipeline, 'resolve_constituency', side_effect=no_constituency):
+        result = pipeline.lookup_sync("ZZ9 9ZZ")
+    pipeline.close()
+
+    assert not result["found"]
@@ -0,0 +1,235 @@
+"""
+Test suite for the SQLite-backed MP updater store
+"""
+import pytest
+import json
+from unittest.mock import MagicMock, patch
+from mp_store import MPDatabaseStore
+
+def make_response(data, status_code=200, headers=None):
+    response = MagicMock(ok=status_code < 400, status_code=status_code, headers=headers or {})
+    response.json.return_value = data
+    return response
+
+@pytest.fixture
+def store(tmp_path):
+    return MPDatabaseStore(str(tmp_path / "mp_database.db"))
+
+def test_store_uses_wal(store):
+    """Test the store opens its database in WAL mode"""
+    assert store.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+def test_constituency_upsert(store):
+    """Test constituency records are inserted and replaced in place"""
+    store.upsert_constituency("Manchester Central", {"name": "Lucy Powell", "last_updated": "2025-01-01T00:00:00"})
+    store.upsert_constituency("Manchester Central", {"name": "Lucy Powell", "party": "Labour"})
+
+    assert store.get_constituency("Manchester Central") == {"name": "Lucy Powell", "party": "Labour"}
+    assert store.get_constituency("Unknown") is None
+    assert store.constituency_count() == 1
+
+def test_patterns_and_status(store):
+    """Test pattern rows are de-duplicated and status fields merge with defaults"""
+    assert store.add_pattern("M1", "Manchester Central")
+    assert not store.add_pattern("M1", "Manchester Central")
+    store.add_pattern("M1", "Manchester Rusholme")
+
+    assert store.patterns() == {"M1": {"Manchester Central", "Manchester Rusholme"}}
+    assert store.pattern_count() == 1
+
+    store.set_status(failed_constituencies=["Bristol East"])
+    status = store.get_status()
+    assert status["failed_constituencies"] == ["Bristol East"]
+    assert status["last_full_update"] is None
+
+def test_json_round_trip(store):
+    """Test legacy JSON imports and exports with pattern sets as lists"""
+    store.import_json({
+        "version": "2025.1",
+        "constituencies": {"Bristol East": {"name": "Kerry McCarthy"}},
+        "postcode_patterns": {"BS5": ["Bristol East"]}
+    })
+
+    exported = store.export_json()
+    assert not store.is_empty()
+    assert exported["postcode_patterns"] == {"BS5": ["Bristol East"]}
+    assert json.loads(json.dumps(exported))["constituencies"]["Bristol East"]["name"] == "Kerry McCarthy"
+
+def test_updater_persists_patterns(tmp_path, monkeypatch):
+    """Test process_postcode pattern updates survive a save and reload"""
+    monkeypatch.chdir(tmp_path)
+    from scripts.automated_mp_updater import AutomatedMPUpdater
+
+    database_path = tmp_path / "mp_database.json"
+    with open(database_path, 'w') as f:
+        json.dump({"postcode_map": {"M1": "Manchester Central"}}, f)
+
+    updater = AutomatedMPUpdater(str(database_path))
+    with patch.object(updater, 'get_constituency_from_postcode',
+                      return_value={"constituency": "Manchester Central", "postcode": "M11AA", "pattern": "M1"}), \
+         patch.object(updater, 'get_mp_details', return_value={"name": "Lucy Powell"}):
+        assert updater.process_postcode("M1 1AA")["success"]
+    updater.save_database()
+
+    with open(database_path) as f:
+        saved = json.load(f)
+    assert saved["postcode_patterns"] == {"M1": ["Manchester Central"]}
+    assert saved["postcode_map"] == {"M1": "Manchester Central"}
+
+    reloaded = AutomatedMPUpdater(str(database_path))
+    assert reloaded.find_mp_by_pattern("M") == [{"constituency": "Manchester Central", "mp": {"name": "Lucy Powell"}}]
+
+def test_updater_get_goes_through_session(tmp_path, monkeypatch):
+    """Test rate-limited GETs are sent with the pooled session"""
+    monkeypatch.chdir(tmp_path)
+    from scripts.automated_mp_updater import AutomatedMPUpdater
+    updater = AutomatedMPUpdater(str(tmp_path / "mp_database.json"), rate=1000)
+
+    with patch.object(updater.session, 'get', return_value=MagicMock(status_code=200)) as get:
+        updater._get("https://members-api.parliament.uk/api/Members/1", timeout=10)
+
+    get.assert_called_once_with("https://members-api.parliament.uk/api/Members/1", timeout=10)
+
+def test_concurrent_refresh_resumes_checkpoint(tmp_path, monkeypatch):
+    """Test the concurrent refresh skips constituencies done by an interrupted run"""
+    monkeypatch.chdir(tmp_path)
+    from scripts.automated_mp_updater import AutomatedMPUpdater
+
+    updater = AutomatedMPUpdater(str(tmp_path / "mp_database.json"), workers=4, rate=1000)
+    names = [f"Constituency {i}" for i in range(10)]
+    updater.store.set_status(refresh_checkpoint={"started": "2025-01-01T00:00:00", "total": 10,
+                                                  "completed": names[:4], "failed": []})
+
+    members = {name: {"id": i} for i, name in enumerate(names)}
+    with patch.object(updater, 'fetch_current_members', return_value=members), \
+         patch.object(updater, '_refresh_constituency',
+                      side_effect=lambda name, member: {"name": f"MP for {name}"}) as details:
+        result = updater.update_all_constituencies(checkpoint_every=2)
+
+    assert result["updated"] == 6
+    assert details.call_count == 6
+    assert updater.store.constituency_count() == 6
+    assert updater.store.get_status()["refresh_checkpoint"] is None
+
+def test_resumed_refresh_retries_earlier_failures(tmp_path, monkeypatch):
+    """Test constituencies that failed before an interruption are retried, not skipped as done"""
+    monkeypatch.chdir(tmp_path)
+    from scripts.automated_mp_updater import AutomatedMPUpdater
+
+    updater = AutomatedMPUpdater(str(tmp_path / "mp_database.json"), workers=2, rate=1000)
+    names = [f"Constituency {i}" for i in range(4)]
+    # A checkpoint written before failures were kept out of the completed list
+    updater.store.set_status(refresh_checkpoint={"started": "2025-01-01T00:00:00", "total": 4,
+                                                  "completed": names[:2], "failed": [names[1]]})
+
+    members = {name: {"id": i} for i, name in enumerate(names)}
+    with patch.object(updater, 'fetch_current_members', return_value=members), \
+         patch.object(updater, '_refresh_constituency',
+                      side_effect=lambda name, member: None if name == names[3] else {"name": f"MP for {name}"}) \
+            as details:
+        result = updater.update_all_constituencies(checkpoint_every=1)
+
+    assert sorted(call.args[0] for call in details.call_args_list) == names[1:]
+    assert result["updated"] == 2 and result["failed"] == 1
+    assert updater.store.get_status()["failed_constituencies"] == [names[3]]
+
+def test_refresh_from_bulk_members(tmp_path, monkeypatch):
+    """Test a refresh pages Members/Search and only calls the per-member endpoints"""
+    monkeypatch.chdir(tmp_path)
+    from scripts.automated_mp_updater import AutomatedMPUpdater
+
+    updater = AutomatedMPUpdater(str(tmp_path / "mp_database.json"), workers=4, rate=1000)
+    members = [
+        {"value": {"id": i, "nameDisplayAs": f"MP {i}", "latestParty": {"name": "Labour"},
+                   "latestHouseMembership": {"membershipFrom": f"Constituency {i}"}}}
+        for i in range(5)
+    ]
+
+    def fake_get(url, params=None, **kwargs):
+        if url.endswith("/Members/Search"):
+            # The API caps the page size at two results
+            skip = params["skip"]
+            return make_response({"totalResults": 5, "items": members[skip:skip + 2]})
+        if url.endswith("/Contact"):
+            return make_response({"value": [{"email": "mp@parliament.uk", "line1": "House of Commons"}]})
+        return make_response({"value": [{"type": "Twitter", "value": "https://x.com/mp"}]})
+
+    with patch.object(updater, '_get', side_effect=fake_get) as get:
+        result = updater.update_all_constituencies()
+
+    assert result["updated"] == 5
+    urls = [call.args[0] for call in get.call_args_list]
+    assert sum(url.endswith("/Members/Search") for url in urls) == 3
+    assert not any("Constituency/Search" in url for url in urls)
+    mp = updater.store.get_constituency("Constituency 3")
+    assert mp["email"] == "mp@parliament.uk"
+    assert mp["address"] == "House of Commons"
+    assert mp["social_media"] == {"twitter": "https://x.com/mp"}
+
+def test_sync_constituency_diff(store):
+    """Test unchanged records are skipped and changed fields are reported"""
+    assert store.sync_constituency("Bristol East", {"name": "Kerry McCarthy", "party": "Labour"})["change"] == "added"
+    assert store.sync_constituency("Bristol East", {"name": "Kerry McCarthy", "party": "Labour",
+                                                    "last_updated": "2025-06-01T00:00:00"}) is None
+
+    change = store.sync_constituency("Bristol East", {"name": "Kerry McCarthy", "party": "Independent"})
+    assert change == {"constituency": "Bristol East", "change": "updated", "fields": ["party"]}
+
+def test_incremental_refresh_uses_validators(tmp_path, monkeypatch):
+    """Test a second refresh sends conditional requests and skips unchanged MPs"""
+    monkeypatch.chdir(tmp_path)
+    from scripts.automated_mp_updater import AutomatedMPUpdater
+
+    updater = AutomatedMPUpdater(str(tmp_path / "mp_database.json"), workers=2, rate=1000)
+    member = {"id": 7, "nameDisplayAs": "Lucy Powell", "latestParty": {"name": "Labour"},
+              "latestHouseMembership": {"membershipFrom": "Manchester Central"}}
+    sent_headers = []
+
+    def fake_get(url, params=None, headers=None, **kwargs):
+        sent_headers.append(headers or {})
+        if headers and headers.get("If-None-Match") == '"v1"':
+            return make_response(None, status_code=304)
+        if url.endswith("/Members/Search"):
+            return make_response({"totalResults": 1, "items": [{"value": member}]}, headers={"ETag": '"v1"'})
+        return make_response({"value": []}, headers={"ETag": '"v1"'})
+
+    with patch.object(updater, '_get', side_effect=fake_get):
+        first = updater.update_all_constituencies()
+        second = updater.update_all_constituencies()
+
+    assert [change["constituency"] for change in first["changes"]] == ["Manchester Central"]
+    assert second["updated"] == 0 and second["unchanged"] == 1
+    assert second["not_modified_responses"] == 3
+    assert all(headers.get("If-None-Match") == '"v1"' for headers in sent_headers[3:])
+
+def test_stale_record_served_while_revalidating(tmp_path, monkeypatch):
+    """Test a stale MP record is returned at once and refreshed once in the background"""
+    monkeypatch.chdir(tmp_path)
+    import threading
+    from scripts.automated_mp_updater import AutomatedMPUpdater
+    updater = AutomatedMPUpdater(str(tmp_path / "mp_database.json"), rate=1000)
+    updater.store.upsert_constituency("Manchester Central", {"name": "Old MP"})
+    with updater.store.transaction() as conn:
+        conn.execute("UPDATE constituencies SET checked_at = '2020-01-01T00:00:00'")
+
+    release = threading.Event()
+    def slow_details(constituency):
+        release.wait(5)
+        return {"name": "New MP"}
+
+    info = {"constituency": "Manchester Central", "postcode": "M11AA", "pattern": "M1"}
+    with patch.object(updater, 'get_constituency_from_postcode', return_value=info), \
+         patch.object(updater, 'get_mp_details', side_effect=slow_details) as details:
+        first = updater.process_postcode("M1 1AA")
+        second = updater.process_postcode("M1 1AA")
+        release.set()
+        updater.wait_for_revalidation(timeout=5)
+        refreshed = updater.process_postcode("M1 1AA")
+
+    assert first["mp"] == {"name": "Old MP"}
+    assert first["freshness"]["status"] == "stale" and first["freshness"]["revalidating"]
+    assert second["mp"] == {"name": "Old MP"}
+    assert details.call_count == 1
+    assert refreshed["mp"] == {"name": "New MP"}
+    assert refreshed["freshness"]["status"] == "fresh" and not refreshed["freshness"]["revalidating"]
+    assert updater.find_mp_by_pattern("M1") == [{"constituency": "Manchester Central", "mp": {"name": "New MP"}}]
@@ -0,0 +1,70 @@
+"""
+Test suite for article description extraction in the news scraper
+"""
+import asyncio
+import pytest
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+pytest.importorskip("bs4")
+from news_service import DescriptionParser, NewsScraperService
+
+GUARDIAN_RESULTS = "".join(
+    f'<div class="fc-item"><a href="{{base}}/article/{i}"><span class="fc-item__title">Story {i}</span></a></div>'
+    for i in range(8)
+)
+
+def run_with_server(handlers, test):
+    """Run test(service, base_url, session) against a local server with handlers routed by path"""
+    async def main():
+        app = web.Application()
+        for path, handler in handlers.items():
+            app.router.add_get(path, handler)
+        server = TestServer(app)
+        await server.start_server()
+        try:
+            async with aiohttp.ClientSession() as session:
+                return await test(NewsScraperService(), str(server.make_url("")).rstrip("/"), session)
+        finally:
+            await server.close()
+    return asyncio.run(main())
+
+def test_parser_stops_at_meta_description():
+    """Test the streaming parser finishes at the meta description or the first paragraph"""
+    parser = DescriptionParser()
+    parser.feed('<html><head><title>x</title><meta name="Description" content="MPs vote on the budget">')
+    assert parser.done and parser.description == "MPs vote on the budget"
+
+    fallback = DescriptionParser()
+    fallback.feed('<html><head></head><body><p>First <b>paragraph</b>\n text</p><p>Second</p>')
+    assert fallback.description == "First paragraph text"
+
+def test_descriptions_fetched_only_for_returned_items():
+    """Test only the returned results are described, concurrently, with slow pages timing out"""
+    requested = []
+
+    async def article(request):
+        requested.append(request.match_info["id"])
+        if request.match_info["id"] == "1":
+            await asyncio.sleep(2)
+        body = f'<html><head><meta name="description" content="About story {request.match_info["id"]}">'
+        return web.Response(text=body + "<p>x</p>" * 50000, content_type="text/html")
+
+    async def test(service, base, session):
+        html = GUARDIAN_RESULTS.replace("{base}", base)
+        articles = service.parse_guardian_results(html)
+        start = asyncio.get_running_loop().time()
+        await service.add_descriptions(articles, session, timeout=0.5)
+        elapsed = asyncio.get_running_loop().time() - start
+        again = await service.add_descriptions([dict(a) for a in articles], session, timeout=0.5)
+        return articles, again, elapsed
+
+    articles, again, elapsed = run_with_server({"/article/{id}": article}, test)
+
+    assert len(articles) == 5
+    assert sorted(requested) == ["0", "1", "2", "3", "4"]
+    assert elapsed < 1.5
+    assert articles[0]["description"] == "About story 0"
+    assert articles[1]["description"] == ""
+    assert [a["description"] for a in again] == [a["description"] for a in articles]
@@ -0,0 +1,91 @@
+"""
+Test suite for the batched, cached summarisation worker
+"""
+from unittest.mock import MagicMock
+from news_summarizer import SummaryWorker
+
+TEXTS = [f"<p>Article {i} about the budget vote in the House of Commons and what it means for taxes.</p>"
+         for i in range(5)]
+
+def fake_pipeline():
+    return MagicMock(side_effect=lambda batch, **kwargs: [{"summary_text": f"summary of {text[:9]}"}
+                                                          for text in batch])
+
+def test_articles_are_summarised_in_batches(tmp_path):
+    """Test one job sends its texts through the pipeline in batched calls and de-duplicates repeats"""
+    pipeline = fake_pipeline()
+    worker = SummaryWorker(cache_path=str(tmp_path / "summaries.json"), batch_size=4, summarizer=pipeline)
+
+    summaries = worker.summarize(TEXTS + [TEXTS[0], "Too short"], timeout=5)
+    worker.close()
+
+    assert summaries[:5] == [f"summary of Article {i}" for i in range(5)]
+    assert summaries[5] == summaries[0]
+    assert summaries[6] is None
+    assert pipeline.call_count == 2
+    assert [len(call.args[0]) for call in pipeline.call_args_list] == [4, 1]
+
+def test_cached_summaries_are_not_recomputed(tmp_path):
+    """Test unchanged articles are served from the content-hash cache across workers"""
+    cache_path = str(tmp_path / "summaries.json")
+    first = SummaryWorker(cache_path=cache_path, summarizer=fake_pipeline())
+    first.summarize(TEXTS[:3], timeout=5)
+    first.close()
+
+    pipeline = fake_pipeline()
+    second = SummaryWorker(cache_path=cache_path, summarizer=pipeline)
+    summaries = second.summarize(TEXTS[:4], timeout=5)
+    second.close()
+
+    assert summaries[3] == "summary of Article 3"
+    assert pipeline.call_count == 1
+    assert pipeline.call_args.args[0] == [TEXTS[3][3:-4]]
+    assert second.stats["cached"] == 3
+
+ARTICLE = ("The Chancellor set out the budget on Wednesday. Taxes on fuel will rise by 5p a litre. "
+           "Labour MPs said the budget would hurt families. The Conservatives said the budget was fair. "
+           "Analysts expect the fuel tax rise to raise two billion pounds.")
+
+def test_extractive_summary_keeps_central_sentences_in_order():
+    """Test the extractive summary picks top-ranked sentences within the word limit"""
+    from news_summarizer import extractive_summary, split_sentences, textrank
+
+    scores = textrank(split_sentences(ARTICLE))
+    summary = extractive_summary(ARTICLE, max_words=25)
+
+    assert len(scores) == 5 and abs(sum(scores) - 1) < 1e-3
+    assert len(summary.split()) <= 25
+    assert summary.startswith("The Chancellor set out the budget on Wednesday.")
+    assert extractive_summary("Too short to summarise") is None
+    assert extractive_summary(" ".join(["word"] * 60), max_words=10).endswith("…")
+
+def test_auto_engine_falls_back_to_extractive(tmp_path):
+    """Test extractive summaries fill in when the model is unavailable or over the latency budget"""
+    unavailable = SummaryWorker(cache_path=str(tmp_path / "a.json"))
+    unavailable._loaded = True  # as if transformers were not installed
+    assert unavailable.summarize([ARTICLE], timeout=5)[0].startswith("The Chancellor")
+    unavailable.close()
+
+    pipeline = fake_pipeline()
+    worker = SummaryWorker(cache_path=str(tmp_path / "b.json"), batch_size=2, summarizer=pipeline)
+    worker._seconds_per_text = 10.0
+    summaries = worker.summarize(TEXTS, timeout=5, latency_budget=1.0)
+    bart_only = worker.summarize([ARTICLE], timeout=5, engine="bart", latency_budget=0)
+    extractive = worker.summarize([ARTICLE], timeout=5, engine="extractive")
+    worker.close()
+
+    assert pipeline.call_count == 0
+    assert summaries == [text[3:-4] for text in TEXTS]
+    assert bart_only == [None]
+    assert extractive[0].startswith("The Chancellor")
+    assert worker.stats["extractive"] == 6
+
+def test_budgeted_job_times_one_text_before_batching(tmp_path):
+    """Test the first model call under a budget is a single text when no timing is known"""
+    pipeline = fake_pipeline()
+    worker = SummaryWorker(cache_path=str(tmp_path / "summaries.json"), batch_size=4, summarizer=pipeline)
+    summaries = worker.summarize(TEXTS, timeout=5, latency_budget=60.0)
+    worker.close()
+
+    assert summaries == [f"summary of Article {i}" for i in range(5)]
+    assert [len(call.args[0]) for call in pipeline.call_args_list] == [1, 4]
@@ -0,0 +1,92 @@
+"""
+Test suite for the ONSPD binary postcode index
+"""
+import pytest
+import csv
+import json
+from postcode_index import PostcodeIndex, postcode_key
+from postcode_resolver import PostcodeResolver
+from scripts.build_postcode_index import build_index
+
+@pytest.fixture
+def onspd_csv(tmp_path):
+    path = tmp_path / "onspd.csv"
+    rows = [
+        ("SW1A 1AA", "E14001172", ""),
+        ("M1 1AA", "E14001353", ""),
+        ("M1 1AD", "E14001353", ""),
+        ("B1 1AA", "E14001097", ""),
+        ("B1 9ZZ", "E14001097", "201001"),   # Terminated
+        ("GY1 1AA", "L99999999", ""),        # Channel Islands pseudo code
+    ]
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["pcd", "pcds", "doterm", "pcon"])
+        for pcds, pcon, doterm in rows:
+            writer.writerow([pcds.replace(" ", ""), pcds, doterm, pcon])
+    return str(path)
+
+@pytest.fixture
+def index_path(tmp_path, onspd_csv):
+    path = str(tmp_path / "postcode_index.bin")
+    names = {
+        "E14001172": "Cities of London and Westminster",
+        "E14001353": "Manchester Central",
+        "E14001097": "Birmingham Ladywood",
+    }
+    build_index(onspd_csv, path, names)
+    return path
+
+def test_postcode_key():
+    """Test keys use the fixed-width ONSPD layout"""
+    assert postcode_key("sw1a 1aa") == b"SW1A1AA"
+    assert postcode_key("M11AA") == b"M1  1AA"
+    assert postcode_key("SW1") is None
+
+def test_build_and_lookup(index_path):
+    """Test live postcodes are indexed and looked up exactly"""
+    index = PostcodeIndex(index_path)
+
+    assert len(index) == 4
+    assert index.lookup("SW1A 1AA") == "Cities of London and Westminster"
+    assert index.lookup("m1 1ad") == "Manchester Central"
+    assert index.lookup("B11AA") == "Birmingham Ladywood"
+    assert index.lookup("B1 9ZZ") is None
+    assert index.lookup("GY1 1AA") is None
+    assert index.lookup("M1 1AB") is None
+
+    keys = [key for key, _ in index]
+    assert keys == sorted(keys)
+    index.close()
+
+def test_invalid_file(tmp_path):
+    """Test files without the index header are rejected"""
+    path = tmp_path / "bad.bin"
+    path.write_bytes(b"not an index at all, really")
+    with pytest.raises(ValueError):
+        PostcodeIndex(str(path))
+
+def test_truncated_file(tmp_path, index_path):
+    """Test a partly written index is rejected and the resolver starts without it"""
+    with open(index_path, 'rb') as f:
+        data = f.read()
+    for size in (2, len(data) // 2, len(data) - 3):
+        path = tmp_path / f"truncated_{size}.bin"
+        path.write_bytes(data[:size])
+        with pytest.raises(ValueError):
+            PostcodeIndex(str(path))
+
+    resolver = PostcodeResolver(str(tmp_path / "missing.json"), str(tmp_path / "missing.json"),
+                                str(tmp_path / "truncated_2.bin"))
+    assert resolver.resolve("M1 1AA") is None
+
+def test_resolver_uses_index(tmp_path, index_path):
+    """Test the resolver answers from the index before district mappings"""
+    database_path = tmp_path / "mp_database.json"
+    with open(database_path, 'w') as f:
+        json.dump({"postcode_map": {"M1": "Somewhere Else"}}, f)
+
+    resolver = PostcodeResolver(str(database_path), str(tmp_path / "missing.json"), index_path)
+    assert resolver.resolve("M1 1AA") == "Manchester Central"
+    # Postcodes missing from the index still fall back to the district map
+    assert resolver.resolve("M1 7ZZ") == "Somewhere Else"
@@ -0,0 +1,107 @@
+"""
+Test suite for the compiled postcode resolver
+"""
+import pytest
+import json
+from postcode_resolver import PostcodeResolver, normalise_postcode, outward_code
+from postcode_hierarchy import PostcodeHierarchy
+
+@pytest.fixture
+def data_files(tmp_path):
+    database_path = tmp_path / "mp_database.json"
+    constituencies_path = tmp_path / "constituency_lookup.json"
+
+    with open(database_path, 'w') as f:
+        json.dump({
+            "postcode_map": {"SW1A": "Cities of London and Westminster", "M1": "Manchester Central"},
+            "postcode_exact_map": {"W1A 0AX": "Islington South and Finsbury"}
+        }, f)
+    with open(constituencies_path, 'w') as f:
+        json.dump({
+            "constituencies": {
+                "Cities of London and Westminster": {"name": "Rachel Blake", "party": "Labour"},
+                "Manchester Central": {"name": "Lucy Powell", "party": "Labour"}
+            }
+        }, f)
+
+    return str(database_path), str(constituencies_path)
+
+def test_postcode_normalisation():
+    """Test postcode normalisation helpers"""
+    assert normalise_postcode(" sw1a  1aa ") == "SW1A1AA"
+    assert outward_code("SW1A 1AA") == "SW1A"
+    assert outward_code("M11AA") == "M1"
+    assert outward_code("SW1") == "SW1"
+
+def test_resolve_exact_and_district(data_files):
+    """Test exact postcodes take precedence over district mappings"""
+    resolver = PostcodeResolver(*data_files)
+
+    assert resolver.resolve("SW1A 1AA") == "Cities of London and Westminster"
+    assert resolver.resolve("m11aa") == "Manchester Central"
+    assert resolver.resolve("W1A0AX") == "Islington South and Finsbury"
+    assert resolver.resolve("ZZ9 9ZZ") is None
+
+def test_mp_records(data_files):
+    """Test MP records are served by constituency name"""
+    resolver = PostcodeResolver(*data_files)
+
+    assert resolver.get_mp("Manchester Central")["name"] == "Lucy Powell"
+    # Constituencies only known from the postcode maps have no MP record
+    assert resolver.get_mp("Islington South and Finsbury") is None
+    assert sorted(resolver.constituencies()) == ["Cities of London and Westminster", "Manchester Central"]
+
+def test_reload_picks_up_changes(data_files):
+    """Test reload rebuilds the tables from disk"""
+    database_path, constituencies_path = data_files
+    resolver = PostcodeResolver(database_path, constituencies_path)
+    assert resolver.resolve("B1 1AA") is None
+
+    with open(database_path, 'w') as f:
+        json.dump({"postcode_map": {"B1": "Birmingham Ladywood"}}, f)
+    resolver.reload()
+
+    assert resolver.resolve("B1 1AA") == "Birmingham Ladywood"
+    assert resolver.resolve("SW1A 1AA") is None
+
+def test_missing_files(tmp_path):
+    """Test the resolver starts empty when data files are missing"""
+    resolver = PostcodeResolver(str(tmp_path / "missing.json"), str(tmp_path / "missing2.json"))
+    assert resolver.resolve("SW1A 1AA") is None
+    assert resolver.constituencies() == []
+
+def test_hierarchy_resolves_coarsest_level():
+    """Test the hierarchy only expands split areas, districts and sectors"""
+    pairs = [
+        ("BS1 1AA", "Bristol Central"), ("BS1 2AB", "Bristol Central"),
+        ("BS5 1AA", "Bristol East"), ("BS5 1AB", "Bristol Central"), ("BS5 9AU", "Bristol East"),
+        ("TR1 1AA", "Truro and Falmouth"), ("TR2 4AA", "Truro and Falmouth"),
+    ]
+    hierarchy = PostcodeHierarchy.build(pairs)
+
+    assert hierarchy.resolve("TR9 9ZZ") == ("Truro and Falmouth", "area")
+    assert hierarchy.resolve("BS1 9ZZ") == ("Bristol Central", "district")
+    assert hierarchy.resolve("BS5 9ZZ") == ("Bristol East", "sector")
+    assert hierarchy.resolve("BS5 1AB") == ("Bristol Central", "unit")
+    assert hierarchy.resolve("BS5 1ZZ") == (None, "split")
+    assert hierarchy.resolve("ZZ1 1AA") == (None, "unknown")
+    # Only the split sector keeps unit entries
+    assert set(hierarchy.entries["unit"]) == {"BS51AA", "BS51AB"}
+
+    restored = PostcodeHierarchy.from_dict(json.loads(json.dumps(hierarchy.to_dict())))
+    assert restored.resolve("BS5 1AB") == ("Bristol Central", "unit")
+
+def test_split_district_skips_district_map(tmp_path):
+    """Test known split districts are not answered from the single-constituency map"""
+    database_path = tmp_path / "mp_database.json"
+    with open(database_path, 'w') as f:
+        json.dump({
+            "postcode_map": {"BS5": "Bristol East", "BS1": "Bristol Central"},
+            "split_districts": ["BS5"],
+            "postcode_sector_map": {"BS5 9": "Bristol East"}
+        }, f)
+
+    resolver = PostcodeResolver(str(database_path), str(tmp_path / "missing.json"))
+    assert resolver.resolve("BS1 1AA") == "Bristol Central"
+    assert resolver.resolve("BS5 9AU") == "Bristol East"
+    assert resolver.resolve("BS5 1AA") is None
@@ -0,0 +1,38 @@
+"""
+Test suite for the shared rate limiter
+"""
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from rate_limiter import TokenBucket, HostRateLimiter
+
+def test_token_bucket_rate():
+    """Test the bucket allows a burst then waits for refills"""
+    bucket = TokenBucket(rate=100, capacity=2)
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() > 0
+
+    start = time.monotonic()
+    bucket.acquire()
+    assert time.monotonic() - start > 0.005
+
+def test_host_concurrency_cap():
+    """Test no more than max_concurrent requests run per host"""
+    limiter = HostRateLimiter(rate=1000, max_concurrent=2, burst=1000)
+    lock = threading.Lock()
+    active = {"now": 0, "peak": 0}
+
+    def request(_):
+        with limiter.slot("https://members-api.parliament.uk/api/Members/1"):
+            with lock:
+                active["now"] += 1
+                active["peak"] = max(active["peak"], active["now"])
+            time.sleep(0.01)
+            with lock:
+                active["now"] -= 1
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(request, range(16)))
+
+    assert active["peak"] == 2
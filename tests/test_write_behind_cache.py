@@ -0,0 +1,91 @@
+"""
+Test suite for the append-only write-behind cache
+"""
+import pytest
+import json
+from write_behind_cache import WriteBehindCache
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "constituency_cache.json")
+
+def make_cache(path, **kwargs):
+    options = {"flush_interval": 0, "flush_size": 100, "compact_threshold": 1000}
+    options.update(kwargs)
+    return WriteBehindCache(path, **options)
+
+def test_entries_survive_restart(cache_path):
+    """Test flushed entries are recovered from the log"""
+    cache = make_cache(cache_path)
+    cache["SW1A 1AA"] = {"constituency": "Cities of London and Westminster"}
+    cache.set("M1 1AA", {"constituency": "Manchester Central"})
+    cache.close()
+
+    reopened = make_cache(cache_path)
+    assert len(reopened) == 2
+    assert reopened["M1 1AA"]["constituency"] == "Manchester Central"
+    assert "SW1A 1AA" in reopened
+
+def test_batches_writes_until_flush_size(cache_path):
+    """Test entries are only appended once the batch fills"""
+    cache = make_cache(cache_path, flush_size=3)
+    cache.set("A", 1)
+    cache.set("B", 2)
+    with pytest.raises(FileNotFoundError):
+        open(cache.log_path).read()
+
+    cache.set("C", 3)
+    with open(cache.log_path) as f:
+        assert len(f.readlines()) == 3
+
+def test_compaction_writes_snapshot(cache_path):
+    """Test the log is folded into the snapshot past the threshold"""
+    cache = make_cache(cache_path, flush_size=1, compact_threshold=2)
+    cache.set("A", 1)
+    cache.set("B", 2)
+
+    with open(cache_path) as f:
+        assert json.load(f) == {"A": 1, "B": 2}
+    with open(cache.log_path) as f:
+        assert f.read() == ""
+
+def test_recovers_from_torn_write(cache_path):
+    """Test a partial trailing record is discarded on startup"""
+    cache = make_cache(cache_path, flush_size=1)
+    cache.set("A", 1)
+    cache.close()
+    with open(cache.log_path, 'a') as f:
+        f.write('{"k":"B","v":')
+
+    reopened = make_cache(cache_path, flush_size=1)
+    assert reopened.get("A") == 1
+    assert "B" not in reopened
+
+    # Appends after recovery remain readable
+    reopened.set("C", 3)
+    reopened.close()
+    assert make_cache(cache_path).get("C") == 3
+
+def test_existing_json_snapshot_is_loaded(cache_path):
+    """Test a legacy JSON cache file is used as the initial snapshot"""
+    with open(cache_path, 'w') as f:
+        json.dump({"B11AA": {"constituency": "Birmingham Ladywood"}}, f)
+
+    cache = make_cache(cache_path)
+    assert cache["B11AA"]["constituency"] == "Birmingham Ladywood"
+
+def test_workers_compacting_one_file_keep_each_others_entries(cache_path):
+    """Test a compaction keeps entries another worker already compacted into the snapshot"""
+    first = make_cache(cache_path)
+    second = make_cache(cache_path)
+    first["k1"] = "one"
+    first.compact()
+    second["k2"] = "two"
+    second.compact()
+
+    reopened = make_cache(cache_path)
+    assert reopened.get("k1") == "one"
+    assert reopened.get("k2") == "two"
+    assert second.get("k1") == "one"
+    for cache in (first, second, reopened):
+        cache.close()
@@ -0,0 +1,177 @@
+"""
+Append-only write-behind key/value store.
+New entries are kept in memory, appended to a JSON-lines log in batches and
+periodically compacted into a JSON snapshot, so each write costs O(entry)
+instead of rewriting the whole file.
+"""
+import os
+import atexit
+import logging
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import json_io
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process use only
+    fcntl = None
+
+class WriteBehindCache:
+    def __init__(self, snapshot_path: str, log_path: Optional[str] = None,
+                 flush_interval: float = 2.0, flush_size: int = 50,
+                 compact_threshold: int = 1000):
+        self.snapshot_path = snapshot_path
+        self.log_path = log_path or os.path.splitext(snapshot_path)[0] + ".jsonl"
+        self.lock_path = self.log_path + ".lock"
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self.compact_threshold = compact_threshold
+
+        self._data: Dict[str, Any] = {}
+        self._pending: List[str] = []
+        self._log_entries = 0
+        self._lock = threading.RLock()
+        self._closed = threading.Event()
+
+        directory = os.path.dirname(self.snapshot_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._recover()
+
+        self._flusher = None
+        if flush_interval > 0:
+            self._flusher = threading.Thread(target=self._flush_loop, name="write-behind-flush", daemon=True)
+            self._flusher.start()
+        atexit.register(self.close)
+
+    # Mapping interface
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._data
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self.set(key, value)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._data.get(key, default)
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        with self._lock:
+            return iter(list(self._data.items()))
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a value and queue it for the log"""
+        line = json_io.dumps({"k": key, "v": value})
+        with self._lock:
+            self._data[key] = value
+            self._pending.append(line)
+            if len(self._pending) >= self.flush_size:
+                self.flush()
+
+    # Persistence
+
+    def _file_lock(self, exclusive: bool = True):
+        """Open and lock the shared lock file (no-op without fcntl)"""
+        handle = open(self.lock_path, 'a')
+        if fcntl:
+            fcntl.flock(handle, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        return handle
+
+    def _replay_log(self) -> int:
+        """Apply log entries on top of the in-memory data, dropping a torn tail"""
+        applied = 0
+        good_offset = 0
+        try:
+            with open(self.log_path, 'rb') as f:
+                for raw in f:
+                    try:
+                        if not raw.endswith(b"\n"):
+                            raise ValueError("incomplete record")
+                        entry = json_io.loads(raw)
+                        self._data[entry["k"]] = entry["v"]
+                    except (ValueError, KeyError, TypeError):
+                        logging.warning(f"Discarding torn record in {self.log_path} at byte {good_offset}")
+                        break
+                    good_offset += len(raw)
+                    applied += 1
+                else:
+                    return applied
+            # A crash mid-append left a partial line; cut it off so later appends stay parseable
+            with open(self.log_path, 'r+b') as f:
+                f.truncate(good_offset)
+        except FileNotFoundError:
+            pass
+        return applied
+
+    def _load_files(self) -> int:
+        """Replace the in-memory data with the snapshot plus the log; call under the file lock"""
+        snapshot = json_io.load_file(self.snapshot_path, {})
+        self._data = snapshot if isinstance(snapshot, dict) else {}
+        return self._replay_log()
+
+    def _recover(self) -> None:
+        """Rebuild state from the last snapshot plus the append log"""
+        with self._file_lock():
+            self._log_entries = self._load_files()
+        if self._log_entries:
+            logging.info(f"Recovered {self._log_entries} entries from {self.log_path}")
+
+    def _append_pending(self) -> None:
+        """Append pending entries to the log with a single write and fsync"""
+        if not self._pending:
+            return
+        payload = ("\n".join(self._pending) + "\n").encode('utf-8')
+        with self._file_lock():
+            fd = os.open(self.log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, payload)
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        self._log_entries += len(self._pending)
+        self._pending = []
+
+    def flush(self) -> None:
+        """Persist pending entries, compacting once the log grows past the threshold"""
+        with self._lock:
+            self._append_pending()
+            if self._log_entries >= self.compact_threshold:
+                self.compact()
+
+    def compact(self) -> None:
+        """Fold the log into a fresh snapshot and truncate the log"""
+        with self._lock:
+            self._append_pending()
+            with self._file_lock():
+                # Rebuild from disk: other workers may have appended to the log, or already
+                # compacted their entries into the snapshot and cut them from the log.
+                # Everything of ours is on disk after the append above.
+                self._load_files()
+                json_io.dump_file(self.snapshot_path, self._data, fsync=True)
+                # Replaying the log again after a crash here is harmless: entries are idempotent
+                open(self.log_path, 'w').close()
+            self._log_entries = 0
+
+    def _flush_loop(self) -> None:
+        while not self._closed.wait(self.flush_interval):
+            try:
+                self.flush()
+            except OSError as e:
+                logging.error(f"Error flushing {self.log_path}: {e}")
+
+    def close(self) -> None:
+        """Stop the background flusher and persist anything still pending"""
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        try:
+            self.flush()
+        except OSError as e:
+            logging.error(f"Error flushing {self.log_path} on close: {e}")